@@ -34,6 +34,63 @@
 export TZ=America/Toronto
 QTLOG_REPO_DIR="${QTLOG_REPO_DIR:-$(cd "$(dirname "$0")" && pwd -P)}"
 
+### QTLOG_DAEMON_CLIENT ###
+# Resident daemon (tools/qtlog_daemon.py, --daemon-start): when its socket exists the
+# run is handed to it before anything below is parsed. Exit 75 from the client means
+# "not served" (or no daemon) and the run continues in-process. QTLOG_DAEMON=0 skips it.
+if [ "${QTLOG_DAEMON:-1}" != "0" ] && \
+   [ -S "${QTLOG_DAEMON_SOCKET:-${QTLOG_STATE_DIR:-${XDG_STATE_HOME:-$HOME/.local/state}/qt}/qtlog.sock}" ]; then
+  python -S "$QTLOG_REPO_DIR/tools/qtlog_client.py" "$@"
+  qtlog_daemon_rc=$?
+  [ "$qtlog_daemon_rc" -eq 75 ] || exit "$qtlog_daemon_rc"
+fi
+
+### QTLOG_TRACE ###
+# Opt-in tracing (QTLOG_TRACE=1, also honoured from .env): timed spans of this run
+# (run, env.load, sop_env_check, log.append, notion.write, git.pull/commit/push)
+# are appended to $QTLOG_STATE_DIR/trace.jsonl (QTLOG_TRACE_FILE). Python tools
+# started from here join the run through QTLOG_TRACE_RUN and add one
+# notion.request span per Notion request. Format, rotation and the p50/p95
+# summary printed by --status: tools/qt_trace.py.
+qt_now_ms() {
+  # qt_now_ms VAR: set VAR to milliseconds since the epoch (no subshell with bash 5).
+  if [ -n "${EPOCHREALTIME:-}" ]; then
+    local t="${EPOCHREALTIME/[.,]/}"
+    printf -v "$1" '%s' "${t:0:${#t}-3}"
+  else
+    printf -v "$1" '%s' "$(( $(date +%s%N) / 1000000 ))"
+  fi
+}
+
+qt_ms() { local t; qt_now_ms t; echo "$t"; }
+
+qt_trace() {
+  # qt_trace SPAN START_MS [key=value ...]: append one span ending now. No-op unless tracing.
+  [ "${QTLOG_TRACE:-0}" = "1" ] || return 0
+  local span="$1" start="$2" end kv k v attrs=""
+  shift 2
+  qt_now_ms end
+  for kv in "$@"; do
+    k="${kv%%=*}"
+    v="${kv#*=}"
+    if [[ "$v" =~ ^-?[0-9]+$ ]]; then
+      attrs+=",\"$k\":$v"
+    else
+      v="${v//\\/\\\\}"
+      attrs+=",\"$k\":\"${v//\"/\\\"}\""
+    fi
+  done
+  printf '{"run":"%s","span":"%s","ts":%s.%03d,"ms":%s,"pid":%s%s}\n' \
+    "$QTLOG_TRACE_RUN" "$span" "$((start / 1000))" "$((start % 1000))" "$((end - start))" "$$" "$attrs" \
+    >> "$QTLOG_TRACE_FILE" 2>/dev/null || true
+}
+
+qt_now_ms QTLOG_T0
+case "${1:-}" in
+  -*) QTLOG_TRACE_OP="$1" ;;
+  *) QTLOG_TRACE_OP=log ;;
+esac
+
 ### QTLOG_ENV_BOOTSTRAP ###
 # Load env early so NOTION_* and QTLOG_* vars exist before any checks/actions.
 # Safe: if missing, continue; SOP verification will flag it where required.
@@ -43,13 +100,533 @@ if [ -f "$HOME/.config/qt/.env" ]; then
   set +a
 fi
 
+if [ "${QTLOG_TRACE:-0}" = "1" ]; then
+  QTLOG_TRACE_FILE="${QTLOG_TRACE_FILE:-${QTLOG_STATE_DIR:-${XDG_STATE_HOME:-$HOME/.local/state}/qt}/trace.jsonl}"
+  QTLOG_TRACE_RUN="${QTLOG_TRACE_RUN:-$$-$QTLOG_T0}"
+  export QTLOG_TRACE QTLOG_TRACE_FILE QTLOG_TRACE_RUN
+  mkdir -p "$(dirname "$QTLOG_TRACE_FILE")"
+  if [ -f "$QTLOG_TRACE_FILE" ] && [ "$(wc -c < "$QTLOG_TRACE_FILE")" -gt "${QTLOG_TRACE_MAX_BYTES:-2000000}" ]; then
+    mv -f "$QTLOG_TRACE_FILE" "$QTLOG_TRACE_FILE.1"
+  fi
+  trap 'qt_trace run "$QTLOG_T0" op="$QTLOG_TRACE_OP" rc=$?' EXIT
+  qt_trace env.load "$QTLOG_T0"
+fi
+
 # Ensure log dir is never empty (prevents mkdir -p "" crash)
 QTLOG_LOG_DIR="${QTLOG_LOG_DIR:-$QTLOG_REPO_DIR/Log}"
+# Local log format: text (Log/<day>.log, one line per entry) or jsonl
+# (Log/<day>.jsonl, one object per entry; see tools/log_format.py).
+QTLOG_LOG_FORMAT="${QTLOG_LOG_FORMAT:-text}"
 
 
 VERSION="1.3.5"
 
 
+### QTLOG_NOTION_ID_CACHE ###
+# Persistent (parent id, title) -> block id cache for the Notion Log structure
+# (H1 "Log", __TOP__ anchors, day toggles). Entries expire after
+# QTLOG_NOTION_CACHE_TTL seconds and are dropped as soon as a read against a
+# cached id disagrees (404 / archived / reordered). QTLOG_NOTION_CACHE=0 disables it.
+QTLOG_CACHE_DIR="${QTLOG_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/qt}"
+QTLOG_NOTION_CACHE_FILE="${QTLOG_NOTION_CACHE_FILE:-$QTLOG_CACHE_DIR/notion_ids.tsv}"
+QTLOG_NOTION_CACHE_TTL="${QTLOG_NOTION_CACHE_TTL:-86400}"
+QTLOG_NOTION_API="$QTLOG_REPO_DIR/tools/notion_api.py"
+
+notion_cache_get() {
+  # $1 parent id, $2 title -> prints cached block id; non-zero if absent/expired
+  [ "${QTLOG_NOTION_CACHE:-1}" = "1" ] || return 1
+  [ -f "$QTLOG_NOTION_CACHE_FILE" ] || return 1
+  local now
+  printf -v now '%(%s)T' -1
+  awk -F '\t' -v p="$1" -v t="$2" -v now="$now" -v ttl="$QTLOG_NOTION_CACHE_TTL" '
+    $1==p && $2==t && (now-$4)<=ttl {id=$3}
+    END {if (id=="") exit 1; print id}
+  ' "$QTLOG_NOTION_CACHE_FILE"
+}
+
+notion_cache_put() {
+  # $1 parent id, $2 title, $3 block id (replaces any previous mapping; prunes expired rows)
+  [ "${QTLOG_NOTION_CACHE:-1}" = "1" ] || return 0
+  [ -n "${1:-}" ] && [ -n "${3:-}" ] || return 0
+  mkdir -p "$(dirname "$QTLOG_NOTION_CACHE_FILE")" 2>/dev/null || return 0
+  local now tmp
+  printf -v now '%(%s)T' -1
+  tmp="${QTLOG_NOTION_CACHE_FILE}.$$"
+  {
+    if [ -f "$QTLOG_NOTION_CACHE_FILE" ]; then
+      awk -F '\t' -v p="$1" -v t="$2" -v now="$now" -v ttl="$QTLOG_NOTION_CACHE_TTL" '
+        !($1==p && $2==t) && (now-$4)<=ttl
+      ' "$QTLOG_NOTION_CACHE_FILE"
+    fi
+    printf '%s\t%s\t%s\t%s\n' "$1" "$2" "$3" "$now"
+  } > "$tmp" && mv -f "$tmp" "$QTLOG_NOTION_CACHE_FILE"
+}
+
+notion_cache_drop() {
+  # $@ block ids: forget every entry that maps to, or hangs under, any of them
+  [ -f "$QTLOG_NOTION_CACHE_FILE" ] || return 0
+  local tmp ids
+  ids="$(printf '%s\n' "$@" | awk 'NF' | paste -sd ' ' -)"
+  [ -n "$ids" ] || return 0
+  tmp="${QTLOG_NOTION_CACHE_FILE}.$$"
+  awk -F '\t' -v ids="$ids" '
+    BEGIN {n=split(ids, a, " "); for (i=1; i<=n; i++) drop[a[i]]=1}
+    !($1 in drop) && !($3 in drop)
+  ' "$QTLOG_NOTION_CACHE_FILE" > "$tmp" && mv -f "$tmp" "$QTLOG_NOTION_CACHE_FILE"
+}
+
+notion_session_start() {
+  # One tools/notion_session.py process for the Notion work that follows: every notion_py
+  # (notion_http, big-payload uploads) runs in it, over one keep-alive connection, instead of
+  # one Python process + TLS handshake per call. Call from the main shell (not inside $(...)),
+  # before any lock fd is open; QTLOG_NOTION_SESSION=0 keeps one process per call.
+  [ -z "${QTLOG_NOTION_SESSION_IN:-}" ] || return 0
+  [ "${QTLOG_NOTION_SESSION:-1}" = "1" ] && [ -n "${NOTION_API_KEY:-}" ] || return 0
+  command -v python >/dev/null 2>&1 && command -v jq >/dev/null 2>&1 || return 0
+  coproc QTLOG_NOTION_SESSION_CO {
+    NOTION_API_KEY="${NOTION_API_KEY:-}" exec python "$QTLOG_REPO_DIR/tools/notion_session.py"
+  }
+  # Coprocess fds are not inherited by subshells; these copies are (notion_http runs in $(...)).
+  exec {QTLOG_NOTION_SESSION_IN}>&"${QTLOG_NOTION_SESSION_CO[1]}" \
+       {QTLOG_NOTION_SESSION_OUT}<&"${QTLOG_NOTION_SESSION_CO[0]}"
+}
+
+notion_session_stop() {
+  # EOF ends the session; later children (git, the push worker) never hold its pipes.
+  [ -n "${QTLOG_NOTION_SESSION_IN:-}" ] || return 0
+  exec {QTLOG_NOTION_SESSION_IN}>&- {QTLOG_NOTION_SESSION_OUT}<&-
+  eval "exec ${QTLOG_NOTION_SESSION_CO[1]}>&- ${QTLOG_NOTION_SESSION_CO[0]}<&-"
+  QTLOG_NOTION_SESSION_IN=""; QTLOG_NOTION_SESSION_OUT=""
+}
+
+notion_py() {
+  # $1 notion_api | notion_upload, then that tool's arguments; stdin is the tool's stdin.
+  # Runs in the session when one is open, else as its own process. Prints the tool's stdout.
+  local tool="$1" rc len a n=0 named=()
+  shift
+  if [ -z "${QTLOG_NOTION_SESSION_IN:-}" ]; then
+    NOTION_API_KEY="$NOTION_API_KEY" python "$QTLOG_REPO_DIR/tools/${tool}.py" "$@"
+    return
+  fi
+  # Named (not --args) so arguments like --state are never taken for jq options.
+  for a in "$tool" "$@"; do
+    printf -v n '%04d' "$((10#$n + 1))"
+    named+=(--arg "$n" "$a")
+  done
+  jq -Rsc "${named[@]}" '{argv: ($ARGS.named | to_entries | sort_by(.key) | map(.value)), stdin: .}' \
+    >&"$QTLOG_NOTION_SESSION_IN" || return 1
+  if ! read -r rc len <&"$QTLOG_NOTION_SESSION_OUT"; then
+    echo "qtlog: Notion session ended unexpectedly" >&2
+    return 1
+  fi
+  head -c "$len" <&"$QTLOG_NOTION_SESSION_OUT"
+  return "$rc"
+}
+
+notion_http() {
+  # $1 method, $2 path under /v1/ (e.g. blocks/<id>/children?page_size=1), $3 optional JSON body ("-" = stdin).
+  # Prints the response body followed by a final "HTTP_CODE=<code>" line (0: no answer, like offline).
+  # Transport is tools/notion_api.py (pagination + 429 backoff; see its docstring), via notion_py.
+  local method="$1" path="$2" data="${3:-}"
+  if [ "$data" = "-" ]; then
+    notion_py notion_api request "$method" "$path"
+  else
+    printf '%s' "$data" | notion_py notion_api request "$method" "$path"
+  fi || printf '\nHTTP_CODE=0\n'
+}
+
+notion_http_code() { sed -n 's/^HTTP_CODE=//p' | tail -n 1; }
+notion_http_body() { sed '/^HTTP_CODE=/d'; }
+
+# Notion Log entry: "YYYY-MM-DD HHMM ET — first line of the message" with Log/Notes/Next steps sub-toggles.
+# jq: "$NOTION_ENTRY_JQ"'... entry($title) ...'
+NOTION_ENTRY_JQ='def entry($t): {
+  object:"block", type:"toggle",
+  toggle:{
+    rich_text:[{type:"text", text:{content:$t}}],
+    children:[
+      {object:"block", type:"toggle", toggle:{rich_text:[{type:"text", text:{content:"Log"}}], children:[]}},
+      {object:"block", type:"toggle", toggle:{rich_text:[{type:"text", text:{content:"Notes"}}], children:[]}},
+      {object:"block", type:"toggle", toggle:{rich_text:[{type:"text", text:{content:"Next steps"}}], children:[]}}
+    ]
+  }
+};'
+
+notion_entry_title() {
+  # $1 raw message, $2 "YYYY-MM-DD HHMM" (ET)
+  # QTLOG_TITLE_SAFETY
+  # Use ONLY first line and hard-cap length for Notion (<=2000)
+  local desc
+  desc="$(printf "%s" "$1" | awk 'NR==1{print; exit}')"
+  # Strip trailing timestamps like " — 2025-12-18 221141" or " — 2025-12-18 2211"
+  desc="$(printf "%s" "$desc" | sed -E 's/[[:space:]]+—[[:space:]]+[0-9]{4}-[0-9]{2}-[0-9]{2}[[:space:]]+[0-9]{4,6}$//')"
+  desc="${desc:0:1800}"
+  printf '%s ET — %s' "$2" "$desc"
+}
+
+notion_entry_is_big() {
+  # $1 raw message -> 0 when its body goes under the entry's "Log" toggle as code blocks
+  [ "${QTLOG_FORCE_BIGPAYLOAD:-0}" = "1" ] || [ "$(printf "%s" "$1" | wc -l | tr -d " ")" -gt 1 ]
+}
+
+### QTLOG_SPOOL ###
+# Spool / outbox. With --spool (or QTLOG_SPOOL=1, or the default QTLOG_SPOOL=auto
+# while the sync worker runs) the entry is written to the local log file and
+# appended to a durable queue (one JSON object per line); Notion and git are
+# deferred to `qtlog.sh --flush`, which writes every queued entry in multi-child
+# PATCHes (<=100 per call) and makes one git commit/push. A failed direct Notion
+# write or git push is queued the same way.
+#
+# Idempotency: every entry carries a key. Keys are journalled in spool.sent as
+# "S <key>" before their PATCH and "A <key>" once Notion acknowledged it; an
+# entry sent but never acknowledged (crash, timeout, 5xx) is only re-sent after
+# its title was not found under its day toggle.
+#
+# `qtlog.sh --sync` drains once; `--sync-start` runs the drain loop in the
+# background (retry backoff QTLOG_SYNC_RETRY doubling to QTLOG_SYNC_MAX_BACKOFF).
+QTLOG_STATE_DIR="${QTLOG_STATE_DIR:-${XDG_STATE_HOME:-$HOME/.local/state}/qt}"
+QTLOG_SPOOL_FILE="${QTLOG_SPOOL_FILE:-$QTLOG_STATE_DIR/spool.jsonl}"
+QTLOG_PUSH_PENDING_FILE="$QTLOG_STATE_DIR/push.pending"
+QTLOG_SYNC_PID_FILE="$QTLOG_STATE_DIR/sync.pid"
+QTLOG_SYNC_LOG="$QTLOG_STATE_DIR/sync.log"
+QTLOG_SYNC_INTERVAL="${QTLOG_SYNC_INTERVAL:-30}"
+QTLOG_SYNC_RETRY="${QTLOG_SYNC_RETRY:-15}"
+QTLOG_SYNC_MAX_BACKOFF="${QTLOG_SYNC_MAX_BACKOFF:-1800}"
+QTLOG_DAEMON_SOCKET="${QTLOG_DAEMON_SOCKET:-$QTLOG_STATE_DIR/qtlog.sock}"
+QTLOG_DAEMON_PID_FILE="$QTLOG_STATE_DIR/qtlog_daemon.pid"
+QTLOG_DAEMON_LOG="$QTLOG_STATE_DIR/daemon.log"
+
+spool_locked() {
+  # Run "$@" holding the spool lock (flock when available; Termux ships it in util-linux).
+  mkdir -p "$(dirname "$QTLOG_SPOOL_FILE")" || return 1
+  if command -v flock >/dev/null 2>&1; then
+    ( flock 9 && "$@" ) 9>>"${QTLOG_SPOOL_FILE}.lock"
+  else
+    "$@"
+  fi
+}
+
+spool_append_line() { printf '%s\n' "$1" >> "$QTLOG_SPOOL_FILE"; }
+
+spool_count() {
+  local n=0
+  [ -s "$QTLOG_SPOOL_FILE" ] && n="$(wc -l < "$QTLOG_SPOOL_FILE" | tr -d ' ')"
+  [ -s "${QTLOG_SPOOL_FILE}.flushing" ] && n=$((n + $(wc -l < "${QTLOG_SPOOL_FILE}.flushing" | tr -d ' ')))
+  echo "$n"
+}
+
+spool_new_key() {
+  cat /proc/sys/kernel/random/uuid 2>/dev/null || printf '%s-%s-%s\n' "$(date +%s%N)" "$$" "$RANDOM"
+}
+
+spool_entry() {
+  # $1 raw message, $2 log file, $3 log mode, $4 optional "HHMM" title stamp,
+  # $5 "sent" when a direct write may already have reached Notion -> queue one entry
+  local ts_min line key big=false
+  mkdir -p "$(dirname "$QTLOG_SPOOL_FILE")" || return 1
+  ts_min="${4:-$(TZ=America/Toronto date '+%Y-%m-%d %H%M')}"
+  notion_entry_is_big "$1" && big=true
+  key="$(spool_new_key)"
+  line="$(jq -nc --arg key "$key" --arg ts "$ts_min" --arg title "$(notion_entry_title "$1" "$ts_min")" \
+    --arg msg "$1" --arg file "$2" --arg mode "${3:-}" --argjson big "$big" \
+    '{key:$key, day:($ts|.[0:10]), ts:$ts, title:$title, message:$msg, big:$big, log_file:$file, mode:$mode}')" || return 1
+  if [ "${5:-}" = "sent" ]; then
+    printf 'S %s\n' "$key" >> "${QTLOG_SPOOL_FILE}.sent"
+  fi
+  spool_locked spool_append_line "$line"
+}
+
+spool_claim_unlocked() {
+  # Move queued entries into the .flushing file (kept across a crashed flush).
+  [ -s "$QTLOG_SPOOL_FILE" ] || return 0
+  cat "$QTLOG_SPOOL_FILE" >> "${QTLOG_SPOOL_FILE}.flushing" && : > "$QTLOG_SPOOL_FILE"
+}
+
+sync_worker_running() {
+  local pid
+  pid="$(cat "$QTLOG_SYNC_PID_FILE" 2>/dev/null)" || return 1
+  [ -n "$pid" ] && kill -0 "$pid" 2>/dev/null
+}
+
+sync_once() {
+  # One outbox pass: flush queued entries, then retry a push that failed earlier.
+  # Returns 0 when nothing is left pending.
+  local rc=0
+  if [ "$(spool_count)" -gt 0 ]; then
+    QTLOG_SPOOL=0 QTLOG_GIT_PUSH=sync bash "$QTLOG_REPO_DIR/qtlog.sh" --flush || rc=1
+    [ "$(spool_count)" -eq 0 ] || rc=1
+  fi
+  if [ -f "$QTLOG_PUSH_PENDING_FILE" ] && ! git_push_worker_running; then
+    if ( cd "$QTLOG_REPO_DIR" && git_push_pass >/dev/null ); then
+      rm -f "$QTLOG_PUSH_PENDING_FILE"
+      echo "qtlog: sync: pending push delivered"
+    else
+      rc=1
+    fi
+  fi
+  return "$rc"
+}
+
+sync_daemon() {
+  # Foreground drain loop; one worker per state dir.
+  local delay pause
+  mkdir -p "$QTLOG_STATE_DIR" || return 1
+  if sync_worker_running; then
+    echo "qtlog: sync worker already running (pid $(cat "$QTLOG_SYNC_PID_FILE"))"
+    return 0
+  fi
+  echo "$$" > "$QTLOG_SYNC_PID_FILE"
+  trap 'rm -f "$QTLOG_SYNC_PID_FILE"; exit 0' INT TERM
+  echo "qtlog: sync worker up (pid $$) $(TZ=America/Toronto date '+%Y-%m-%d %H%M ET')"
+  delay="$QTLOG_SYNC_RETRY"
+  while :; do
+    if sync_once; then
+      delay="$QTLOG_SYNC_RETRY"
+      pause="$QTLOG_SYNC_INTERVAL"
+    else
+      pause="$delay"
+      echo "qtlog: sync: $(spool_count) queued$([ -f "$QTLOG_PUSH_PENDING_FILE" ] && echo ', push pending'); retry in ${delay}s"
+      delay=$((delay * 2))
+      [ "$delay" -gt "$QTLOG_SYNC_MAX_BACKOFF" ] && delay="$QTLOG_SYNC_MAX_BACKOFF"
+    fi
+    sleep "$pause" & wait $!
+  done
+}
+
+sync_start() {
+  if sync_worker_running; then
+    echo "qtlog: sync worker already running (pid $(cat "$QTLOG_SYNC_PID_FILE"))"
+    return 0
+  fi
+  mkdir -p "$QTLOG_STATE_DIR" || return 1
+  nohup bash "$QTLOG_REPO_DIR/qtlog.sh" --sync-daemon >> "$QTLOG_SYNC_LOG" 2>&1 < /dev/null &
+  echo "qtlog: sync worker started (pid $!; log $QTLOG_SYNC_LOG)"
+}
+
+daemon_running() {
+  local pid
+  pid="$(cat "$QTLOG_DAEMON_PID_FILE" 2>/dev/null)" || return 1
+  [ -n "$pid" ] && kill -0 "$pid" 2>/dev/null
+}
+
+daemon_start() {
+  # Resident service (tools/qtlog_daemon.py); it also drains the outbox when no sync worker runs.
+  if daemon_running; then
+    echo "qtlog: daemon already running (pid $(cat "$QTLOG_DAEMON_PID_FILE"))"
+    return 0
+  fi
+  mkdir -p "$QTLOG_STATE_DIR" || return 1
+  QTLOG_DAEMON=0 nohup python "$QTLOG_REPO_DIR/tools/qtlog_daemon.py" serve >> "$QTLOG_DAEMON_LOG" 2>&1 < /dev/null &
+  local i
+  for i in 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20; do
+    [ -S "$QTLOG_DAEMON_SOCKET" ] && { echo "qtlog: daemon started (pid $!; socket $QTLOG_DAEMON_SOCKET; log $QTLOG_DAEMON_LOG)"; return 0; }
+    kill -0 "$!" 2>/dev/null || break
+    sleep 0.25
+  done
+  echo "qtlog: daemon failed to start; see $QTLOG_DAEMON_LOG" >&2
+  return 1
+}
+
+### QTLOG_GIT_SYNC ###
+# Git step of a log write. Cheap in the common case:
+#   - pull only when `git ls-remote` shows the upstream branch moved past our
+#     remote-tracking ref (no upstream configured -> no pull);
+#   - stage, check and commit only the touched log files (no worktree-wide status);
+#   - QTLOG_GIT_COALESCE=N (seconds, default 0 = off): a write within N seconds of
+#     the previous qtlog commit, while that commit is unpushed, amends it, so a
+#     burst becomes one commit;
+#   - QTLOG_GIT_PUSH=async (default) pushes in the background once the coalescing
+#     window is over (QTLOG_GIT_PUSH_RETRIES tries, 2s doubling); push.pending is
+#     written first and cleared on success, so a push that never lands is retried
+#     by --sync. QTLOG_GIT_PUSH=sync pushes before returning.
+# Every step holds $QTLOG_STATE_DIR/git.lock. Phase timings are printed as
+# "qtlog: git timings: remote=..ms pull=.. commit=..ms push=..".
+QTLOG_GIT_COALESCE="${QTLOG_GIT_COALESCE:-0}"
+QTLOG_GIT_PUSH="${QTLOG_GIT_PUSH:-async}"
+QTLOG_GIT_PUSH_RETRIES="${QTLOG_GIT_PUSH_RETRIES:-3}"
+QTLOG_GIT_LAST_FILE="$QTLOG_STATE_DIR/git.last"
+QTLOG_GIT_PUSH_PID_FILE="$QTLOG_STATE_DIR/git_push.pid"
+QTLOG_GIT_PUSH_LOG="$QTLOG_STATE_DIR/git_push.log"
+
+git_lock() {
+  # Take git.lock on fd 8 (released by git_unlock or on exit).
+  mkdir -p "$QTLOG_STATE_DIR" || return 1
+  exec 8>>"$QTLOG_STATE_DIR/git.lock"
+  if command -v flock >/dev/null 2>&1; then
+    flock 8
+  fi
+}
+
+git_unlock() { exec 8>&-; }
+
+notion_tree_lock() {
+  # $1 page id: take the create-once lock of that Notion tree on fd 7
+  # ($QTLOG_STATE_DIR/notion-<page>.lock, shared with tools/notion_api.py tree_lock).
+  # Whoever holds it lists a parent and creates a missing day/__TOP__ before the next
+  # writer lists, so parallel writers never create the same node twice.
+  mkdir -p "$QTLOG_STATE_DIR" || return 1
+  exec 7>>"$QTLOG_STATE_DIR/notion-$1.lock"
+  if command -v flock >/dev/null 2>&1; then
+    flock 7
+  fi
+}
+
+notion_tree_unlock() { exec 7>&-; }
+
+git_pull_if_moved() {
+  # Sets GIT_T_REMOTE (ms) and GIT_PULL (skipped|done|failed|no-upstream|unreachable).
+  local t0 branch remote merge tracking theirs
+  t0="$(qt_ms)"
+  GIT_PULL=no-upstream
+  branch="$(git symbolic-ref -q --short HEAD 2>/dev/null)" \
+    && remote="$(git config "branch.$branch.remote" 2>/dev/null)" \
+    && merge="$(git config "branch.$branch.merge" 2>/dev/null)" \
+    || { GIT_T_REMOTE=0; return 0; }
+  tracking="$(git rev-parse -q --verify '@{u}' 2>/dev/null || true)"
+  if ! theirs="$(git ls-remote "$remote" "$merge" 2>/dev/null)"; then
+    GIT_T_REMOTE=$(( $(qt_ms) - t0 ))
+    GIT_PULL=unreachable
+    qt_trace git.remote "$t0" result=unreachable
+    echo "qtlog: warning: $remote unreachable; continuing with local copy"
+    return 0
+  fi
+  GIT_T_REMOTE=$(( $(qt_ms) - t0 ))
+  theirs="${theirs%%[[:space:]]*}"
+  if [ -z "$theirs" ] || [ "$theirs" = "$tracking" ]; then
+    GIT_PULL=skipped
+    qt_trace git.remote "$t0" result=unchanged
+    return 0
+  fi
+  qt_trace git.remote "$t0" result=moved
+  t0="$(qt_ms)"
+  echo "qtlog: upstream moved; pulling..."
+  if git pull --rebase --autostash -q; then
+    GIT_PULL=done
+  else
+    GIT_PULL=failed
+    echo "qtlog: warning: pull failed; continuing with local copy"
+  fi
+  qt_trace git.pull "$t0" result="$GIT_PULL"
+}
+
+git_head_pushed() { git merge-base --is-ancestor HEAD '@{u}' 2>/dev/null; }
+
+git_commit_logs() {
+  # $1 commit message; commits GIT_FILES only. Sets GIT_T_COMMIT and GIT_COMMIT (new|amend).
+  # Returns 1 when those files have no change, 2 when git commit failed.
+  local t0 now head last_sha="" last_t=0 rc=0
+  t0="$(qt_ms)"
+  git add -- "${GIT_FILES[@]}" || return 2
+  if git diff --cached --quiet -- "${GIT_FILES[@]}"; then
+    GIT_T_COMMIT=$(( $(qt_ms) - t0 ))
+    return 1
+  fi
+  now="$(date +%s)"
+  head="$(git rev-parse -q --verify HEAD 2>/dev/null || true)"
+  [ -f "$QTLOG_GIT_LAST_FILE" ] && read -r last_sha last_t < "$QTLOG_GIT_LAST_FILE"
+  if [ "$QTLOG_GIT_COALESCE" -gt 0 ] && [ -n "$head" ] && [ "$head" = "$last_sha" ] \
+     && [ $((now - ${last_t:-0})) -lt "$QTLOG_GIT_COALESCE" ] && ! git_head_pushed; then
+    GIT_COMMIT=amend
+    git commit -q --amend -m "$(git log -1 --format=%B HEAD)" -m "$1" -- "${GIT_FILES[@]}" >/dev/null 2>&1 || rc=2
+  else
+    GIT_COMMIT=new
+    last_t="$now"
+    git commit -q -m "$1" -- "${GIT_FILES[@]}" >/dev/null 2>&1 || rc=2
+  fi
+  [ "$rc" -eq 0 ] && echo "$(git rev-parse HEAD) $last_t" > "$QTLOG_GIT_LAST_FILE"
+  GIT_T_COMMIT=$(( $(qt_ms) - t0 ))
+  qt_trace git.commit "$t0" kind="$GIT_COMMIT" rc="$rc"
+  return "$rc"
+}
+
+git_push_now() {
+  # Push HEAD (caller holds git.lock); clears push.pending on success. Sets GIT_T_PUSH.
+  local t0
+  t0="$(qt_ms)"
+  if git push -q 2>&1; then
+    rm -f "$QTLOG_PUSH_PENDING_FILE"
+    GIT_T_PUSH=$(( $(qt_ms) - t0 ))
+    qt_trace git.push "$t0" ok=1
+    return 0
+  fi
+  GIT_T_PUSH=$(( $(qt_ms) - t0 ))
+  qt_trace git.push "$t0" ok=0
+  return 1
+}
+
+git_push_pass() {
+  # One locked pass used by --sync: pull if the upstream moved, then push.
+  local rc=0
+  git_lock || return 1
+  git_pull_if_moved
+  git_push_now || rc=1
+  git_unlock
+  return "$rc"
+}
+
+git_push_worker_running() {
+  local pid
+  pid="$(cat "$QTLOG_GIT_PUSH_PID_FILE" 2>/dev/null)" || return 1
+  [ -n "$pid" ] && kill -0 "$pid" 2>/dev/null
+}
+
+git_push_worker() {
+  # Background push (--git-push-worker): wait out the coalescing window, push, and
+  # repeat while commits keep arriving; gives up after QTLOG_GIT_PUSH_RETRIES
+  # failures (push.pending stays for --sync).
+  local fails=0 delay=2 last_sha last_t wait
+  echo "$$" > "$QTLOG_GIT_PUSH_PID_FILE"
+  cd "$QTLOG_REPO_DIR" || return 1
+  while :; do
+    last_t=0
+    [ -f "$QTLOG_GIT_LAST_FILE" ] && read -r last_sha last_t < "$QTLOG_GIT_LAST_FILE"
+    wait=$(( ${last_t:-0} + QTLOG_GIT_COALESCE - $(date +%s) ))
+    if [ "$wait" -gt 0 ]; then
+      sleep "$wait"
+      continue
+    fi
+    git_lock || return 1
+    # Checked under the lock: a writer that saw this worker alive relies on it to push its commit.
+    if [ ! -f "$QTLOG_PUSH_PENDING_FILE" ] || git_head_pushed; then
+      rm -f "$QTLOG_PUSH_PENDING_FILE" "$QTLOG_GIT_PUSH_PID_FILE"
+      git_unlock
+      return 0
+    fi
+    if git_push_now; then
+      echo "qtlog: git: pushed $(git rev-parse --short HEAD) in ${GIT_T_PUSH}ms"
+      fails=0
+      git_unlock
+      continue
+    fi
+    fails=$((fails + 1))
+    if [ "$fails" -ge "$QTLOG_GIT_PUSH_RETRIES" ]; then
+      rm -f "$QTLOG_GIT_PUSH_PID_FILE"
+      git_unlock
+      echo "qtlog: git: push failed $fails times; left for qtlog.sh --sync"
+      return 1
+    fi
+    git_unlock
+    sleep "$delay"
+    delay=$((delay * 2))
+  done
+}
+
+spool_requeue_unlocked() {
+  # $1 file of entries that were not written: put them back ahead of anything queued meanwhile.
+  local tmp="${QTLOG_SPOOL_FILE}.$$"
+  cat "$1" "$QTLOG_SPOOL_FILE" 2>/dev/null > "$tmp" && mv -f "$tmp" "$QTLOG_SPOOL_FILE"
+  rm -f "${QTLOG_SPOOL_FILE}.flushing"
+}
+
+sop_hash_state() {
+  # "current" when .sop_hash matches qtlog.sh (tools/sop_hash.py, stat-cached), else "stale".
+  # Read-only (--status, --sop-version): the stat cache is read, never written.
+  if python "$QTLOG_REPO_DIR/tools/sop_hash.py" check --no-cache-write --root "$QTLOG_REPO_DIR" >/dev/null 2>&1; then
+    echo current
+  else
+    echo stale
+  fi
+}
 
 ### QTLOG_STATUS ###
 # Read-only diagnostics. No writes to Notion, no file writes, no git writes.
@@ -68,11 +645,13 @@ status_report() {
 
   log_dir="${QTLOG_LOG_DIR:-$repo_dir/Log}"
   log_file="$log_dir/${today}.log"
+  [ -f "$log_file" ] || [ ! -f "$log_dir/${today}.jsonl" ] || log_file="$log_dir/${today}.jsonl"
 
   echo "QTLOG_STATUS: ts=$ts"
   echo "QTLOG_STATUS: repo_dir=$repo_dir"
   echo "QTLOG_STATUS: version=${VERSION:-UNKNOWN}"
   echo "QTLOG_STATUS: sop_version=$(tr -d ' \t\r\n' < .sop_hash 2>/dev/null || echo UNKNOWN)"
+  echo "QTLOG_STATUS: sop_hash=$(sop_hash_state)"
 
   # Git info (read-only)
   if command -v git >/dev/null 2>&1 && git -C "$repo_dir" rev-parse --is-inside-work-tree >/dev/null 2>&1; then
@@ -91,16 +670,21 @@ status_report() {
     echo "QTLOG_STATUS: envfile=MISSING ($envfile)"
   fi
 
-  # Local log
+  # Local log (last line: newest day, live file or monthly archive; tools/log_format.py)
+  last_line="$(python "$QTLOG_REPO_DIR/tools/log_format.py" tail --log-dir "$log_dir" -n 1 2>/dev/null || true)"
   if [ -f "$log_file" ]; then
-    last_line="$(tail -n 1 "$log_file" 2>/dev/null || true)"
     echo "QTLOG_STATUS: local_log=OK ($log_file)"
-    echo "QTLOG_STATUS: local_log_last_line=${last_line}"
   else
     echo "QTLOG_STATUS: local_log=MISSING ($log_file)"
   fi
+  [ -z "$last_line" ] || echo "QTLOG_STATUS: local_log_last_line=${last_line}"
 
   echo "QTLOG_STATUS: notion_creds=$([ -n "${NOTION_API_KEY:-}" ] && [ -n "${NOTION_LOG_PAGE_ID:-}" ] && echo OK || echo MISSING)"
+  echo "QTLOG_STATUS: outbox=$(spool_count) push_pending=$([ -f "$QTLOG_PUSH_PENDING_FILE" ] && echo YES || echo NO) sync_worker=$(sync_worker_running && echo RUNNING || echo STOPPED) daemon=$(daemon_running && echo RUNNING || echo STOPPED)"
+  if [ -s "${QTLOG_TRACE_FILE:-$QTLOG_STATE_DIR/trace.jsonl}" ]; then
+    python "$QTLOG_REPO_DIR/tools/qt_trace.py" summary --runs "${QTLOG_TRACE_RUNS:-20}" \
+      --file "${QTLOG_TRACE_FILE:-$QTLOG_STATE_DIR/trace.jsonl}" | sed 's/^/QTLOG_STATUS: /'
+  fi
   return 0
 }
 
@@ -131,82 +715,145 @@ ensure_today_top() {
     return 0
   fi
 
-  command -v curl >/dev/null 2>&1 || { echo "ENSURE_TODAY_TOP_FAIL=curl_missing" >&2; return 1; }
+  command -v python >/dev/null 2>&1 || { echo "ENSURE_TODAY_TOP_FAIL=python_missing" >&2; return 1; }
   command -v jq   >/dev/null 2>&1 || { echo "ENSURE_TODAY_TOP_FAIL=jq_missing" >&2; return 1; }
 
-  local today log_h1_id h1_top_id h1_first_id day_id day_first_id day_top_id payload resp
+  local today note
   today="$(TZ=America/Toronto date '+%Y-%m-%d')"
 
-  # 1) Find H1 "Log"
-  log_h1_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${NOTION_LOG_PAGE_ID}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
-      | select(.type=="heading_1")
-      | select((.heading_1.rich_text|map(.plain_text)|join(""))=="Log")
-      | .id' | head -n1
-  )"
-  if [ -z "${log_h1_id:-}" ]; then
-    echo "ENSURE_TODAY_TOP_FAIL=missing_h1_log" >&2
+  # 1-5) H1 "Log" -> H1 "__TOP__" -> day toggle -> day "__TOP__" (first child), see notion_log_resolve_day
+  if ! notion_log_resolve_day "$today"; then
+    echo "ENSURE_TODAY_TOP_FAIL=${NOTION_RESOLVE_FAIL}" >&2
+    if [ "$NOTION_RESOLVE_FAIL" = "day_top_not_first" ]; then
+      echo "ACTION: In Notion, open QT ▸ Log ▸ ${today} and drag the '__TOP__' toggle to the very TOP (first child), then retry." >&2
+    fi
     return 1
   fi
+  for note in $NOTION_RESOLVE_NOTES; do
+    echo "ENSURE_TODAY_TOP_NOTE=$note" >&2
+  done
 
-  # 2) Ensure H1 "__TOP__" exists (cannot guarantee it is first; warn/require manual if not)
-  h1_first_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | jq -r '.results[0].id // empty'
-  )"
+  echo "ENSURE_TODAY_TOP_OK=$today"
+  return 0
+}
 
-  h1_top_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
-      | select(.type=="toggle")
-      | select((.toggle.rich_text|map(.plain_text)|join(""))=="__TOP__")
-      | .id' | head -n1
-  )"
+### QTLOG_NOTION_LOG_RESOLVE ###
+notion_log_resolve_day() {
+  # Resolve (creating where missing) the Log-day structure for $1 (YYYY-MM-DD) and set:
+  #   NOTION_LOG_H1_ID  NOTION_H1_TOP_ID  NOTION_DAY_ID  NOTION_DAY_TOP_ID
+  # Fast path: with H1/day/day-__TOP__ cached, ONE read confirms the day "__TOP__" is
+  # still the first child; any disagreement drops the cached ids and rediscovers.
+  # Slow path: one children listing per parent (page, H1, day) instead of one per question.
+  # A past day older than every day left under H1 is where --rollover moved it: under
+  # Archive > YYYY > YYYY-MM (three more listings); NOTION_DAY_ID is then the archived copy.
+  # On failure NOTION_RESOLVE_FAIL=<reason>; NOTION_RESOLVE_NOTES lists anchors created.
+  # Call directly (not inside $(...)) so the globals survive.
+  local today="$1"
+  local resp code h1_children day_children h1_first_id day_first_id day_first_title payload
+  local day_parent day_listing day_after title
+
+  NOTION_LOG_H1_ID=""; NOTION_H1_TOP_ID=""; NOTION_DAY_ID=""; NOTION_DAY_TOP_ID=""
+  NOTION_RESOLVE_FAIL=""; NOTION_RESOLVE_NOTES=""; NOTION_RESOLVE_CACHED=0
+
+  # 0) Cache fast path
+  NOTION_LOG_H1_ID="$(notion_cache_get "$NOTION_LOG_PAGE_ID" "Log")" || NOTION_LOG_H1_ID=""
+  if [ -n "$NOTION_LOG_H1_ID" ]; then
+    NOTION_DAY_ID="$(notion_cache_get "$NOTION_LOG_H1_ID" "$today")" || NOTION_DAY_ID=""
+  fi
+  if [ -n "$NOTION_DAY_ID" ]; then
+    NOTION_DAY_TOP_ID="$(notion_cache_get "$NOTION_DAY_ID" "__TOP__")" || NOTION_DAY_TOP_ID=""
+  fi
+  if [ -n "$NOTION_DAY_TOP_ID" ]; then
+    resp="$(notion_http GET "blocks/${NOTION_DAY_ID}/children?page_size=1")"
+    code="$(printf '%s' "$resp" | notion_http_code)"
+    if [ "$code" = "200" ] && \
+       [ "$(printf '%s' "$resp" | notion_http_body | jq -r '.results[0].id // empty')" = "$NOTION_DAY_TOP_ID" ]; then
+      NOTION_RESOLVE_CACHED=1
+      return 0
+    fi
+    # Offline / Notion down says nothing about the cached ids: keep them.
+    if [ "${code:-0}" -eq 0 ] || [ "${code:-0}" -ge 500 ]; then
+      NOTION_RESOLVE_FAIL="notion_unreachable"
+      return 1
+    fi
+    notion_cache_drop "$NOTION_DAY_ID" "$NOTION_DAY_TOP_ID"
+    NOTION_DAY_ID=""; NOTION_DAY_TOP_ID=""
+  fi
 
-  if [ -z "${h1_top_id:-}" ]; then
-    payload="$(
-      jq -nc --arg after "${h1_first_id:-}" '{
-        after: ($after|select(length>0)),
-        children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]
-      }'
-    )"
-    resp="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${log_h1_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload"
+  # Slow path under the Log tree's create-once lock (released on every return below):
+  # a parallel writer creating the day or an anchor finishes first, and the listings
+  # below then see it instead of creating a second one.
+  notion_tree_lock "$NOTION_LOG_PAGE_ID" || { NOTION_RESOLVE_FAIL="lock_failed"; return 1; }
+
+  # 1) H1 "Log" children (a cached H1 that no longer lists is forgotten and re-looked-up)
+  if [ -n "$NOTION_LOG_H1_ID" ]; then
+    resp="$(notion_http GET "blocks/${NOTION_LOG_H1_ID}/children?page_size=100")"
+    if [ "$(printf '%s' "$resp" | notion_http_code)" != "200" ]; then
+      notion_cache_drop "$NOTION_LOG_H1_ID"
+      NOTION_LOG_H1_ID=""
+    fi
+  fi
+  if [ -z "$NOTION_LOG_H1_ID" ]; then
+    NOTION_LOG_H1_ID="$(
+      notion_http GET "blocks/${NOTION_LOG_PAGE_ID}/children?page_size=100" | notion_http_body | \
+      jq -r '.results[]?
+        | select(.type=="heading_1")
+        | select((.heading_1.rich_text|map(.plain_text)|join(""))=="Log")
+        | .id' | head -n1
     )"
-    h1_top_id="$(printf '%s' "$resp" | jq -r '.results[0].id // empty')"
-    echo "ENSURE_TODAY_TOP_NOTE=created_h1_top_anchor" >&2
+    if [ -z "${NOTION_LOG_H1_ID:-}" ]; then
+      NOTION_RESOLVE_FAIL="missing_h1_log"
+      notion_tree_unlock
+      return 1
+    fi
+    notion_cache_put "$NOTION_LOG_PAGE_ID" "Log" "$NOTION_LOG_H1_ID"
+    resp="$(notion_http GET "blocks/${NOTION_LOG_H1_ID}/children?page_size=100")"
   fi
+  h1_children="$(printf '%s' "$resp" | notion_http_body)"
 
-  if [ -z "${h1_top_id:-}" ]; then
-    echo "ENSURE_TODAY_TOP_FAIL=h1_top_create_failed" >&2
+  # 2) H1 "__TOP__" (cannot guarantee it is first; created after the current first child)
+  h1_first_id="$(printf '%s' "$h1_children" | jq -r '.results[0].id // empty')"
+  NOTION_H1_TOP_ID="$(notion_toggle_id_in "$h1_children" "__TOP__")"
+  if [ -z "${NOTION_H1_TOP_ID:-}" ]; then
+    payload="$(
+      jq -nc --arg after "${h1_first_id:-}" '
+        (if $after == "" then {} else {after: $after} end)
+        + {children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]}'
+    )"
+    NOTION_H1_TOP_ID="$(notion_http PATCH "blocks/${NOTION_LOG_H1_ID}/children" "$payload" | notion_http_body | jq -r '.results[0].id // empty')"
+    NOTION_RESOLVE_NOTES="$NOTION_RESOLVE_NOTES created_h1_top_anchor"
+  fi
+  if [ -z "${NOTION_H1_TOP_ID:-}" ]; then
+    NOTION_RESOLVE_FAIL="h1_top_create_failed"
+    notion_tree_unlock
     return 1
   fi
 
-  # 3) Ensure today's day toggle exists under H1 (inserted after H1 __TOP__ when created)
-  day_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r --arg d "$today" '.results[]?
-      | select(.type=="toggle")
-      | select((.toggle.rich_text|map(.plain_text)|join(""))==$d)
-      | .id' | head -n1
-  )"
-
-  if [ -z "${day_id:-}" ]; then
+  # 3) The day toggle: under H1, else (days older than H1's) in its archive month. A missing day is
+  #    created, with its own "__TOP__", where newest-at-top puts it: after the last newer
+  #    day, else after the container's "__TOP__" -- never above today, and never a second
+  #    copy of an archived day.
+  day_parent="$NOTION_LOG_H1_ID"; day_listing="$h1_children"; day_after="$NOTION_H1_TOP_ID"
+  NOTION_DAY_ID="$(notion_toggle_id_in "$h1_children" "$today")"
+  if [ -z "${NOTION_DAY_ID:-}" ] && [ "$today" != "$(TZ=America/Toronto date '+%Y-%m-%d')" ] && \
+     [ -z "$(notion_older_day_in "$h1_children" "$today")" ]; then
+    for title in Archive "${today:0:4}" "${today:0:7}"; do
+      day_parent="$(notion_toggle_id_in "$day_listing" "$title")"
+      [ -n "$day_parent" ] || break
+      day_listing="$(notion_http GET "blocks/${day_parent}/children?page_size=100" | notion_http_body)"
+    done
+    if [ -n "$day_parent" ]; then
+      NOTION_DAY_ID="$(notion_toggle_id_in "$day_listing" "$today")"
+      day_after=""
+    else
+      day_parent="$NOTION_LOG_H1_ID"; day_listing="$h1_children"
+    fi
+  fi
+  if [ -z "${NOTION_DAY_ID:-}" ]; then
+    day_after="$(notion_day_after_in "$day_listing" "$today" "$day_after")"
     payload="$(
-      jq -nc --arg after "$h1_top_id" --arg d "$today" '{
-        after: $after,
+      jq -nc --arg after "$day_after" --arg d "$today" '
+        (if $after == "" then {} else {after: $after} end) + {
         children:[{
           object:"block",type:"toggle",
           toggle:{
@@ -219,84 +866,81 @@ ensure_today_top() {
         }]
       }'
     )"
-    resp="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${log_h1_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload"
-    )"
-    day_id="$(printf '%s' "$resp" | jq -r '.results[0].id // empty')"
-    echo "ENSURE_TODAY_TOP_NOTE=created_day_toggle_${today}" >&2
+    NOTION_DAY_ID="$(notion_http PATCH "blocks/${day_parent}/children" "$payload" | notion_http_body | jq -r '.results[0].id // empty')"
+    NOTION_RESOLVE_NOTES="$NOTION_RESOLVE_NOTES created_day_toggle_${today}"
   fi
-
-  if [ -z "${day_id:-}" ]; then
-    echo "ENSURE_TODAY_TOP_FAIL=day_create_failed" >&2
+  if [ -z "${NOTION_DAY_ID:-}" ]; then
+    NOTION_RESOLVE_FAIL="day_create_failed"
+    notion_tree_unlock
     return 1
   fi
 
-  # 4) Ensure day "__TOP__" exists
-  day_top_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
+  # 4) Day "__TOP__" (one listing answers: does it exist, and is it first?)
+  day_children="$(notion_http GET "blocks/${NOTION_DAY_ID}/children?page_size=100" | notion_http_body)"
+  day_first_id="$(printf '%s' "$day_children" | jq -r '.results[0].id // empty')"
+  day_first_title="$(
+    printf '%s' "$day_children" | jq -r '(
+      .results[0]
       | select(.type=="toggle")
-      | select((.toggle.rich_text|map(.plain_text)|join(""))=="__TOP__")
-      | .id' | head -n1
+      | (.toggle.rich_text|map(.plain_text)|join(""))
+    ) // ""'
   )"
-
-  if [ -z "${day_top_id:-}" ]; then
-    day_first_id="$(
-      curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=1" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" | jq -r '.results[0].id // empty'
-    )"
+  NOTION_DAY_TOP_ID="$(notion_toggle_id_in "$day_children" "__TOP__")"
+  if [ -z "${NOTION_DAY_TOP_ID:-}" ]; then
     payload="$(
-      jq -nc --arg after "${day_first_id:-}" '{
-        after: ($after|select(length>0)),
-        children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]
-      }'
-    )"
-    resp="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${day_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload"
+      jq -nc --arg after "${day_first_id:-}" '
+        (if $after == "" then {} else {after: $after} end)
+        + {children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]}'
     )"
-    day_top_id="$(printf '%s' "$resp" | jq -r '.results[0].id // empty')"
-    echo "ENSURE_TODAY_TOP_NOTE=created_day_top_anchor" >&2
+    NOTION_DAY_TOP_ID="$(notion_http PATCH "blocks/${NOTION_DAY_ID}/children" "$payload" | notion_http_body | jq -r '.results[0].id // empty')"
+    NOTION_RESOLVE_NOTES="$NOTION_RESOLVE_NOTES created_day_top_anchor"
+    [ -z "${day_first_id:-}" ] && day_first_title="__TOP__"
   fi
-
-  if [ -z "${day_top_id:-}" ]; then
-    echo "ENSURE_TODAY_TOP_FAIL=day_top_create_failed" >&2
+  if [ -z "${NOTION_DAY_TOP_ID:-}" ]; then
+    NOTION_RESOLVE_FAIL="day_top_create_failed"
+    notion_tree_unlock
     return 1
   fi
 
   # 5) Hard invariant: day "__TOP__" must be FIRST child (for newest-at-top inserts)
-  local day_first_title
-  day_first_title="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '(
-      .results[0]
-      | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join(""))
-    ) // ""'
-  )"
-
   if [ "$day_first_title" != "__TOP__" ]; then
-    echo "ENSURE_TODAY_TOP_FAIL=day_top_not_first" >&2
-    echo "ACTION: In Notion, open QT ▸ Log ▸ ${today} and drag the '__TOP__' toggle to the very TOP (first child), then retry." >&2
+    NOTION_RESOLVE_FAIL="day_top_not_first"
+    notion_tree_unlock
     return 1
   fi
 
-  echo "ENSURE_TODAY_TOP_OK=$today"
+  notion_cache_put "$NOTION_LOG_H1_ID" "$today" "$NOTION_DAY_ID"
+  notion_cache_put "$NOTION_DAY_ID" "__TOP__" "$NOTION_DAY_TOP_ID"
+  notion_tree_unlock
   return 0
 }
 
+notion_toggle_id_in() {
+  # $1 children listing JSON, $2 title -> id of the first toggle with that exact title
+  printf '%s' "$1" | jq -r --arg t "$2" '.results[]?
+    | select(.type=="toggle")
+    | select((.toggle.rich_text|map(.plain_text)|join(""))==$t)
+    | .id' | head -n1
+}
+
+notion_day_after_in() {
+  # $1 children listing JSON (newest-at-top days), $2 YYYY-MM-DD, $3 default -> id a new day
+  # toggle goes after: the last toggle titled with a later day, else "__TOP__", else $3
+  # (empty: append at the end)
+  printf '%s' "$1" | jq -r --arg d "$2" --arg dflt "${3:-}" '
+    [.results[]? | select(.type=="toggle") | {id, t: (.toggle.rich_text|map(.plain_text)|join(""))}] as $k
+    | ([$k[] | select((.t|test("^[0-9]{4}-[0-9]{2}-[0-9]{2}$")) and .t > $d) | .id] | last)
+      // ([$k[] | select(.t=="__TOP__") | .id] | first) // $dflt'
+}
+
+notion_older_day_in() {
+  # $1 children listing JSON, $2 YYYY-MM-DD -> id of the first day toggle before $2 (none: empty)
+  printf '%s' "$1" | jq -r --arg d "$2" '.results[]?
+    | select(.type=="toggle")
+    | select((.toggle.rich_text|map(.plain_text)|join("")) as $t | ($t|test("^[0-9]{4}-[0-9]{2}-[0-9]{2}$")) and $t < $d)
+    | .id' | head -n1
+}
+
 
 
 ### QTLOG_SOP_FAIL_NOTION_LOG ###
@@ -307,7 +951,7 @@ sop_fail_notion_log() {
   if [ -z "${NOTION_API_KEY:-}" ] || [ -z "${NOTION_LOG_PAGE_ID:-}" ]; then
     return 0
   fi
-  command -v curl >/dev/null 2>&1 || return 0
+  command -v python >/dev/null 2>&1 || return 0
   command -v jq   >/dev/null 2>&1 || return 0
 
   # Placeholder: keep side effects minimal until a full Notion failure-note writer is reintroduced.
@@ -321,6 +965,9 @@ sop_env_check() {
   local fail=0
   local ci=0
   local repo_dir envfile
+  local trace_t0 trace_need="${1:-}"
+  qt_now_ms trace_t0
+  trap 'qt_trace sop_env_check "$trace_t0" need="$trace_need" fail="$fail"; trap - RETURN' RETURN
 
   # CI detection (GitHub Actions sets both; keep generic too)
   if [ -n "${GITHUB_ACTIONS:-}" ] || [ -n "${CI:-}" ]; then
@@ -364,7 +1011,7 @@ sop_env_check() {
       echo "SOP_FAIL: NOTION_API_KEY / NOTION_LOG_PAGE_ID missing" >&2
       fail=1
     fi
-    command -v curl >/dev/null 2>&1 || { echo "SOP_FAIL: curl missing" >&2; fail=1; }
+    command -v python >/dev/null 2>&1 || { echo "SOP_FAIL: python missing" >&2; fail=1; }
     command -v jq   >/dev/null 2>&1 || { echo "SOP_FAIL: jq missing" >&2; fail=1; }
   fi
 
@@ -395,9 +1042,34 @@ Usage:
 Options:
   --log <msg>       (Default) Log message to Filesystem/Notion
   --todo <item>     Add item to Notion ToDo Vault
+  --todo-file F     Add every line of F (- = stdin; plain text or JSON lines with
+                    text/status_emoji/device) in one discovery + one PATCH per 100 items
   --stamp-now       Print authoritative ET timestamp
   --reconcile       Audit system, git, and qtlog clocks
   --verify-all      Read-only check of Notion anchors
+  --bootstrap [msg] Day bootstrap (qtday): ensure today's Log and ToDo days, then --verify-all,
+                    in one process; the "sop <msg>" entry is queued for the outbox
+  --rollover        Move Log/ToDo days older than the newest QTLOG_ROLLOVER_KEEP (14) into
+                    Archive > YYYY > YYYY-MM toggles (with --dry-run: list them only)
+  --compact         Fold closed months of Log/ into Log/archive/YYYY-MM.log.gz (one gzip
+                    frame per file + offset index; readers see archived days as before)
+                    and commit the result (with --dry-run: sizes only; --no-git: no commit)
+  --query [TEXT] [--since D] [--until D] [--device X] [--limit N] [--json] [--fts]
+                    Search local logs (full-text + date/device filters; exit 1 if no match)
+  --spool           Queue the entry locally (log file + spool); Notion/git wait for --flush
+  --flush           Write all queued entries: batched Notion PATCHes, one git commit/push
+  --sync            One outbox pass: --flush, then retry a failed git push
+  --sync-start      Start the background sync worker (entries are queued while it runs)
+  --sync-stop       Stop the background sync worker
+  --daemon-start    Start the resident daemon (tools/qtlog_daemon.py): log/todo/verify
+                    runs are served over its Unix socket; it also drains the outbox
+  --daemon-stop     Stop the resident daemon
+  --daemon          Run the daemon in the foreground
+  --snapshot-out F  Record the Notion listings this run reads into snapshot F
+  --from-snapshot F Replay Notion reads from snapshot F (offline; e.g. --verify-all)
+  --mirror sync [--full] | search TEXT [--limit N] [--json] | status
+                    Local mirror of the Log/ToDo/Big Picture pages (incremental sync)
+  --from-mirror     Replay Notion reads from the mirror (same as --from-snapshot <mirror>)
   --sop-verify [need_notion]  Read-only SOP env check; optional Notion prereq check; then exit
   --dry-run         Preview actions without execution
   --offline         Disable all git operations
@@ -451,9 +1123,18 @@ VERIFY_ONLY=0
 VERIFY_ALL_ONLY=0
 
 VERIFY_TODO_ONLY=0
+BOOTSTRAP_MODE=0
+ROLLOVER_MODE=0
+COMPACT_MODE=0
+SNAPSHOT_OUT=""
+FROM_SNAPSHOT=""
+SPOOL_MODE="${QTLOG_SPOOL:-auto}"
+FLUSH_MODE=0
 ARGS=()
 TODO_MODE=0
 TODO_ITEM=""
+TODO_HAVE_ITEM=0
+TODO_FILE=""
 
 BRAG_MODE=0
 RELEASE_LOG_MODE=0
@@ -481,6 +1162,17 @@ while [ $# -gt 0 ]; do
       fi
       TODO_MODE=1
       TODO_ITEM="$1"
+      TODO_HAVE_ITEM=1
+      shift
+      ;;
+    --todo-file)
+      shift
+      if [ $# -eq 0 ]; then
+        echo "qtlog: --todo-file requires a FILE (- for stdin)" >&2
+        exit 1
+      fi
+      TODO_MODE=1
+      TODO_FILE="$1"
       shift
       ;;
     --mode)
@@ -528,11 +1220,94 @@ while [ $# -gt 0 ]; do
       VERIFY_ALL_ONLY=1
       shift
       ;;
+    --bootstrap)
+      BOOTSTRAP_MODE=1
+      shift
+      ;;
+    --rollover)
+      ROLLOVER_MODE=1
+      shift
+      ;;
+    --compact)
+      COMPACT_MODE=1
+      shift
+      ;;
+    --snapshot-out|--from-snapshot)
+      if [ $# -lt 2 ]; then
+        echo "qtlog: $1 requires a FILE" >&2
+        exit 1
+      fi
+      if [ "$1" = "--snapshot-out" ]; then SNAPSHOT_OUT="$2"; else FROM_SNAPSHOT="$2"; fi
+      shift 2
+      ;;
+    --from-mirror)
+      FROM_SNAPSHOT="${QT_NOTION_MIRROR:-$QTLOG_CACHE_DIR/notion_mirror.json}"
+      shift
+      ;;
+    --mirror)
+      # Incremental local copy of the Notion pages (tools/notion_mirror.py; a snapshot file).
+      shift
+      python "$QTLOG_REPO_DIR/tools/notion_mirror.py" "$@"
+      exit $?
+      ;;
 
     --lkg)
       LKG_MODE=1
       shift
       ;;
+    --spool)
+      SPOOL_MODE=1
+      shift
+      ;;
+    --flush)
+      FLUSH_MODE=1
+      shift
+      ;;
+    --sync)
+      sync_once
+      exit $?
+      ;;
+    --query)
+      # Indexed search over $QTLOG_LOG_DIR (tools/log_index.py; index refreshed incrementally).
+      shift
+      python "$QTLOG_REPO_DIR/tools/log_index.py" --log-dir "$QTLOG_LOG_DIR" query "$@"
+      exit $?
+      ;;
+    --sync-daemon)
+      sync_daemon
+      exit $?
+      ;;
+    --git-push-worker)
+      git_push_worker
+      exit $?
+      ;;
+    --sync-start)
+      sync_start
+      exit $?
+      ;;
+    --daemon)
+      QTLOG_DAEMON=0 exec python "$QTLOG_REPO_DIR/tools/qtlog_daemon.py" serve
+      ;;
+    --daemon-start)
+      daemon_start
+      exit $?
+      ;;
+    --daemon-stop)
+      if daemon_running; then
+        kill "$(cat "$QTLOG_DAEMON_PID_FILE")" && echo "qtlog: daemon stopped"
+      else
+        echo "qtlog: daemon not running"
+      fi
+      exit 0
+      ;;
+    --sync-stop)
+      if sync_worker_running; then
+        kill "$(cat "$QTLOG_SYNC_PID_FILE")" && echo "qtlog: sync worker stopped"
+      else
+        echo "qtlog: sync worker not running"
+      fi
+      exit 0
+      ;;
     --notion)
       LOG_MODE=notion
         LOG_MODE_EXPLICIT=1
@@ -588,6 +1363,10 @@ while [ $# -gt 0 ]; do
         if ! sop_env_check "${1:-}"; then
           rc=1
         fi
+        # .sop_hash must match qtlog.sh's SOP regions (stat-cached; drifted regions are named).
+        if ! python "$QTLOG_REPO_DIR/tools/sop_hash.py" check --root "$QTLOG_REPO_DIR"; then
+          rc=1
+        fi
         if [ "$rc" -eq 0 ]; then
           echo "SOP_VERIFY_OK"
         else
@@ -600,11 +1379,13 @@ while [ $# -gt 0 ]; do
         SOP_VERSION="$(tr -d " \t\r\n" < .sop_hash 2>/dev/null || echo UNKNOWN)"
         echo "VERSION=${VERSION:-UNKNOWN}"
         echo "SOP_VERSION=${SOP_VERSION:-UNKNOWN}"
+        echo "SOP_HASH_STATE=$(sop_hash_state)"
         exit 0
         ;;
 
       --sync-sop-timeline)
         sop_env_check need_notion || exit 1
+        notion_session_start
         ensure_today_top || exit 1
         sop_sync_notion_timeline || exit 1
         exit 0
@@ -624,6 +1405,27 @@ done
 
 
 
+### QTLOG_NOTION_SNAPSHOT ###
+# --snapshot-out FILE: record every Notion listing this run fetches into FILE (tools/notion_api.py).
+# --from-snapshot FILE: serve Notion reads from FILE (zero network I/O; writes are refused);
+#   page ids missing from the env and the recorded ET day come from the snapshot.
+if [ -n "$FROM_SNAPSHOT" ]; then
+  if [ ! -f "$FROM_SNAPSHOT" ]; then
+    echo "qtlog: snapshot not found: $FROM_SNAPSHOT" >&2
+    exit 1
+  fi
+  export QT_NOTION_SNAPSHOT="$FROM_SNAPSHOT"
+  while IFS='=' read -r snap_key snap_val; do
+    case "$snap_key" in
+      NOTION_LOG_PAGE_ID|NOTION_TODO_PAGE_ID|QTLOG_VERIFY_DAY)
+        [ -n "${!snap_key:-}" ] || export "$snap_key=$snap_val" ;;
+    esac
+  done < <(python "$QTLOG_NOTION_API" snapshot-env "$FROM_SNAPSHOT")
+  export NOTION_API_KEY="${NOTION_API_KEY:-snapshot}"
+elif [ -n "$SNAPSHOT_OUT" ]; then
+  export QT_NOTION_RECORD="$SNAPSHOT_OUT"
+fi
+
 ### QTLOG_BRAG_AND_RELEASE ###
 # Convenience generators. They only set MESSAGE; normal logging flow handles local/Notion/git modes.
 if [ "${BRAG_MODE:-0}" -eq 1 ]; then
@@ -695,166 +1497,18 @@ if [ "${TODO_MODE:-0}" -eq 1 ]; then
     exit 1
   fi
 
-  TS_ET="$(TZ=America/Toronto date '+%Y-%m-%d %H%M')"
-
-# --- CEI TITLE (authoritative format) ---
-# Format: YYYY-MM-DD HHMM 🟩 Your text [DEVICE]
-STATUS_EMOJI="${STATUS_EMOJI:-🟦}"
-
-CEI_TITLE="$TS_ET $STATUS_EMOJI $TODO_ITEM [$DEVICE]"
-
-# --- END CEI TITLE ---
-  DATE_ONLY="$(TZ=America/Toronto date '+%Y-%m-%d')"
-
   # Ensure DEVICE is set (nounset-safe). Device is ALWAYS appended after your text.
   if [ -z "${DEVICE:-}" ]; then
     DEVICE="$(getprop ro.product.model 2>/dev/null | tr ' ' '_' )"
     [ -n "$DEVICE" ] || DEVICE="Device"
   fi
 
-  # Status emoji (override with STATUS_EMOJI=... in env)
-  STATUS_EMOJI="${STATUS_EMOJI:-🟦}"
-
-  # If the item already starts with an ET timestamp, do not double-prefix it.
-  if [[ "$TODO_ITEM" =~ ^[0-9]{4}-[0-9]{2}-[0-9]{2}[[:space:]]?[0-9]{4}[[:space:]] ]]; then
-    CONTENT="$TODO_ITEM"
-    USER_TEXT="$TODO_ITEM"
-  else
-    CONTENT="$TS_ET $TODO_ITEM"
-    USER_TEXT="$TODO_ITEM"
-  fi
-
-  # CEI title: YYYY-MM-DD HHMM <emoji> <your text> [DEVICE]
-  if [[ "$USER_TEXT" =~ ^([0-9]{4}-[0-9]{2}-[0-9]{2})[[:space:]]?([0-9]{4})[[:space:]]+(.*)$ ]]; then
-    CEI_TITLE="${BASH_REMATCH[1]} ${BASH_REMATCH[2]} ${STATUS_EMOJI} ${BASH_REMATCH[3]} [$DEVICE]"
-  else
-    CEI_TITLE="$TS_ET ${STATUS_EMOJI} $USER_TEXT [$DEVICE]"
-  fi
-
-  if [ "${DRY_RUN:-0}" -ne 0 ]; then
-    echo "qtlog DRY-RUN (todo)"
-    echo "  Notion ToDo page id: ${NOTION_TODO_PAGE_ID}"
-    echo "  Content: $CONTENT"
-    echo "  CEI_TITLE: $CEI_TITLE"
-    echo "  DRY-RUN OK: Notion write skipped (dry-run confirmed)"
-    exit 0
-  fi
-
-  # Auto-discover the "ToDo" heading block id (must be a block id, not page id)
-  TODO_PARENT_ID="$(
-    python - "$NOTION_TODO_PAGE_ID" "$NOTION_API_KEY" <<'PYIN'
-import sys, json, urllib.request
-page_id, key = sys.argv[1], sys.argv[2]
-url = f"https://api.notion.com/v1/blocks/{page_id}/children?page_size=100"
-req = urllib.request.Request(url, headers={"Authorization": f"Bearer {key}", "Notion-Version": "2022-06-28"})
-data = json.loads(urllib.request.urlopen(req).read().decode("utf-8"))
-hid = ""
-for blk in data.get("results", []):
-    t = blk.get("type")
-    if t in ("heading_1","heading_2","heading_3"):
-        rt = blk.get(t, {}).get("rich_text", [])
-        if rt and (rt[0].get("plain_text","").strip().lower() == "todo"):
-            hid = blk.get("id","")
-            break
-print(hid)
-PYIN
-  )"
-
-  if [ -z "$TODO_PARENT_ID" ]; then
-    echo "qtlog: ERROR: Could not auto-discover ToDo heading block" >&2
-    exit 1
-  fi
-  echo "qtlog: Auto-discovered ToDo block id: $TODO_PARENT_ID" >&2
-    # --- NEWEST-AT-TOP CONTRACT (ToDo) ---------------------------------
-    # We enforce a hard "__TOP__" toggle under:
-    #   1) the ToDo heading (direct child) and
-    #   2) each YYYY-MM-DD day toggle (child)
-    #
-    # We always insert "after" the relevant "__TOP__" anchor.
-    # If we had to CREATE an anchor (because it was missing), operator may need to
-    # drag it to the top to satisfy verification (newest-at-top contract).
-
-    # Helper: find a toggle id by title under a parent block id (first match)
-    find_toggle_id() {
-      # $1 parent, $2 title
-      curl -sS \
-        -H "Authorization: Bearer ${NOTION_API_KEY}" \
-        -H "Notion-Version: 2022-06-28" \
-        "https://api.notion.com/v1/blocks/${1}/children?page_size=200" \
-      | jq -r --arg t "$2" '
-        (.results // [])[]
-        | select(.type=="toggle")
-        | select((.toggle.rich_text|map(.plain_text)|join(""))==$t)
-        | .id
-      ' | head -n1
-    }
-
-    # Helper: create a toggle under parent, optionally after an id, return new block id
-    create_toggle() {
-      # $1 parent, $2 title, $3 after_id (may be empty), $4 child_top (0/1) include internal __TOP__
-      local PARENT="$1" TITLE="$2" AFTER="$3" CHILD_TOP="${4:-0}"
-      local JSON RESP HTTP_CODE NEWID
-
-      if [ "$CHILD_TOP" -eq 1 ]; then
-        if [ -n "$AFTER" ]; then
-          JSON="$(jq -nc --arg after "$AFTER" --arg title "$TITLE" '
-            {after:$after, children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:$title}}],children:[
-              {object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}
-            ]}}]}')"
-        else
-          JSON="$(jq -nc --arg title "$TITLE" '
-            {children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:$title}}],children:[
-              {object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}
-            ]}}]}')"
-        fi
-      else
-        if [ -n "$AFTER" ]; then
-          JSON="$(jq -nc --arg after "$AFTER" --arg title "$TITLE" '
-            {after:$after, children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:$title}}],children:[]}}]}')"
-        else
-          JSON="$(jq -nc --arg title "$TITLE" '
-            {children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:$title}}],children:[]}}]}')"
-        fi
-      fi
-
-      RESP="$(curl -sS -w '\nHTTP_CODE=%{http_code}\n' \
-        -X PATCH "https://api.notion.com/v1/blocks/${PARENT}/children" \
-        -H "Authorization: Bearer ${NOTION_API_KEY}" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        --data "$JSON")"
-      HTTP_CODE="$(printf '%s' "$RESP" | sed -n 's/^HTTP_CODE=//p' | tail -n 1)"
-      if [ -z "$HTTP_CODE" ] || [ "$HTTP_CODE" -lt 200 ] || [ "$HTTP_CODE" -ge 300 ]; then
-        echo "qtlog: toggle create failed (HTTP $HTTP_CODE)" >&2
-        printf '%s\n' "$RESP" >&2
-        exit 1
-      fi
-      NEWID="$(printf '%s' "$RESP" | sed '/^HTTP_CODE=/d' | jq -r '.results[0].id // ""')"
-      echo "$NEWID"
-    }
-
-    # 1) Ensure __TOP__ exists under the ToDo heading
-    TODO_TOP_ID="$(find_toggle_id "$TODO_PARENT_ID" "__TOP__")"
-    if [ -z "${TODO_TOP_ID:-}" ]; then
-      TODO_TOP_ID="$(create_toggle "$TODO_PARENT_ID" "__TOP__" "" 0)"
-      echo "qtlog: created ToDo __TOP__ anchor (please drag it to FIRST under 'ToDo' if verify fails)" >&2
-    fi
-
-    # 2) Ensure today's YYYY-MM-DD toggle exists under ToDo heading, inserted after __TOP__
-    DATE_ID="$(find_toggle_id "$TODO_PARENT_ID" "$DATE_ONLY")"
-    if [ -z "${DATE_ID:-}" ]; then
-      DATE_ID="$(create_toggle "$TODO_PARENT_ID" "$DATE_ONLY" "$TODO_TOP_ID" 1)"
-    fi
-    echo "qtlog: Using date toggle id: $DATE_ID ($DATE_ONLY)" >&2
-
-    # 3) Ensure day-internal __TOP__ exists under DATE_ID (child)
-    DATE_TOP_ID="$(find_toggle_id "$DATE_ID" "__TOP__")"
-    if [ -z "${DATE_TOP_ID:-}" ]; then
-      DATE_TOP_ID="$(create_toggle "$DATE_ID" "__TOP__" "" 0)"
-      echo "qtlog: created day __TOP__ anchor (please drag it to FIRST inside $DATE_ONLY if verify fails)" >&2
-    fi
-
-    # ------------------------------------------------------------------
+  # --- NEWEST-AT-TOP CONTRACT (ToDo) ---------------------------------
+  # tools/notion_todo.py: CEI title "YYYY-MM-DD HHMM <STATUS_EMOJI> <text> [DEVICE]",
+  # inserted "after" today's day __TOP__ under the ToDo heading (__TOP__ under the
+  # heading, the day toggle and the day __TOP__ are created when missing; drag a
+  # created anchor to the top if verify fails). --todo-file batches 100 items per PATCH.
+  # ------------------------------------------------------------------
 # ==============================================================================
 # QTLOG — NOTION LOG INSERTION CONTRACT (GitHub-safe)
 # Timestamp: 2026-01-05 1425 ET
@@ -921,7 +1575,7 @@ PYIN
 #   - store in ~/.config/qt/.env (chmod 600) and do NOT commit it
 #   - never echo NOTION_API_KEY / tokens into logs
 # - Ensure dependencies exist before side effects:
-#   - command -v curl; command -v jq; command -v python
+#   - command -v python; command -v jq (Notion transport: tools/notion_api.py)
 # - Use PATCH inserts with stable anchors; do not rely on Notion reordering
 # - When something fails: capture HTTP_CODE + response body once, then stop
 # - Use git hygiene:
@@ -931,50 +1585,17 @@ PYIN
 # ==============================================================================
 
 
-  # Create CEI entry (toggle with 3 toggle children) after DATE pin so it appears at the top
-  URL="https://api.notion.com/v1/blocks/${DATE_ID}/children"
-  JSON="$(cat <<EOF
-{
-  "after": "$DATE_TOP_ID",
-  "children": [
-    {
-      "object": "block",
-      "type": "toggle",
-      "toggle": {
-        "rich_text": [
-          { "type": "text", "text": { "content": "$CEI_TITLE" } }
-        ],
-        "children": [
-          { "object": "block", "type": "toggle", "toggle": { "rich_text": [ { "type": "text", "text": { "content": "Work done" } } ], "children": [] } },
-          { "object": "block", "type": "toggle", "toggle": { "rich_text": [ { "type": "text", "text": { "content": "Notes" } } ], "children": [] } },
-          { "object": "block", "type": "toggle", "toggle": { "rich_text": [ { "type": "text", "text": { "content": "Next steps" } } ], "children": [] } }
-        ]
-      }
-    }
-  ]
-}
-EOF
-)"
-  RESP="$(curl -sS -w '\nHTTP_CODE=%{http_code}\n' \
-    -X PATCH "$URL" \
-    -H "Authorization: Bearer ${NOTION_API_KEY}" \
-    -H "Notion-Version: 2022-06-28" \
-    -H "Content-Type: application/json" \
-    --data "$JSON")"
-
-  HTTP_CODE="$(printf '%s' "$RESP" | sed -n 's/^HTTP_CODE=//p' | tail -n 1)"
-  if [ -z "$HTTP_CODE" ]; then
-    echo "qtlog: TODO write failed (no HTTP code captured)" >&2
-    printf '%s\n' "$RESP" >&2
-    exit 1
-  fi
-  if [ "$HTTP_CODE" -lt 200 ] || [ "$HTTP_CODE" -ge 300 ]; then
-    echo "qtlog: TODO write failed (HTTP $HTTP_CODE)" >&2
-    printf '%s\n' "$RESP" >&2
-    exit 1
+  todo_args=(--device "$DEVICE" --emoji "${STATUS_EMOJI:-🟦}")
+  [ -z "$TODO_FILE" ] || todo_args+=(--file "$TODO_FILE")
+  [ "${DRY_RUN:-0}" -eq 0 ] || todo_args+=(--dry-run)
+  [ "$TODO_HAVE_ITEM" -eq 0 ] || todo_args+=(-- "$TODO_ITEM")
+  NOTION_API_KEY="$NOTION_API_KEY" python "$QTLOG_REPO_DIR/tools/notion_todo.py" "${todo_args[@]}"
+  TODO_RC=$?
+  if [ "$TODO_RC" -ne 0 ]; then
+    echo "qtlog: TODO write failed" >&2
+    exit "$TODO_RC"
   fi
-
-  echo "qtlog: TODO written to Notion"
+  [ "${DRY_RUN:-0}" -ne 0 ] || echo "qtlog: TODO written to Notion"
   exit 0
 fi
 # --- END TODO DISPATCH (early exit) ---
@@ -983,7 +1604,7 @@ fi
 # --- Export check helper (must run before message-required guard) ---
 if [ "${EXPORT_CHECK:-0}" -eq 1 ]; then
   echo "Export check: scanning for non-/public references...";
-  BAD=$(git grep -n -I -E "(^|[^A-Za-z0-9])(~\/|\/home\/|\/data\/|\/storage\/|\/sdcard\/|\/projects\/|api\.notion\.com)" -- "public/**" "README.md" 2>/dev/null || true);
+  BAD=$(python "$QTLOG_REPO_DIR/tools/content_scan.py" --root "$QTLOG_REPO_DIR" export-check 2>/dev/null || true);
   if [ -n "$BAD" ]; then
     echo "Export blocked: references outside /public detected:";
     echo "$BAD";
@@ -994,166 +1615,20 @@ if [ "${EXPORT_CHECK:-0}" -eq 1 ]; then
 fi
 
 
-verify_log_structure() {
-  local verify_now
-  verify_now="$(TZ=America/Toronto date '+%Y-%m-%d %H%M ET')"
-  printf "VERIFY_TIME=%s\n" "$verify_now"
-  # CI-safe / operator-safe: if Notion env is missing, treat verify as a read-only clock proof
-  if [ -z "${NOTION_API_KEY:-}" ] || [ -z "${NOTION_LOG_PAGE_ID:-}" ]; then
-    echo "VERIFY_SKIP=missing_env"
-    return 0
-  fi
-
-  local today log_h1_id day_id h1_first day_first day_second
-
-  today="$(TZ=America/Toronto date '+%Y-%m-%d')"
-
-  log_h1_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${NOTION_LOG_PAGE_ID}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
-      | select(.type=="heading_1")
-      | select((.heading_1.rich_text|map(.plain_text)|join(""))=="Log")
-      | .id' | head -n1
-  )"
-
-  [ -z "$log_h1_id" ] && { echo "VERIFY_FAIL: missing H1 Log"; return 1; }
-
-  h1_first="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '( .results[0] | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join("")) ) // "NOT_TOGGLE"'
-  )"
-
-  day_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r --arg d "$today" '.results[]?
-      | select(.type=="toggle")
-      | select((.toggle.rich_text[0].plain_text // "")==$d)
-      | .id' | head -n1
-  )"
-
-  [ -z "$day_id" ] && { echo "VERIFY_FAIL: missing day toggle"; return 1; }
-
-  day_first="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '( .results[0] | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join("")) ) // "NOT_TOGGLE"'
-  )"
-
-  day_second="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=3" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[1] | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join(""))'
-  )"
-
-  printf "H1_FIRST=%s\nDAY_FIRST=%s\nDAY_SECOND=%s\n" \
-    "$h1_first" "$day_first" "$day_second"
+### QTLOG_VERIFY_ENGINE ###
+# Read-only structure checks (tools/notion_verify.py): each parent's children are
+# listed once per run and the Log and ToDo checks run concurrently; the output is the
+# same VERIFY_* / H1_* / DAY_* / TODO_* lines, Log first.
+notion_verify() {
+  # $1 = log | todo | all
+  NOTION_API_KEY="${NOTION_API_KEY:-}" NOTION_LOG_PAGE_ID="${NOTION_LOG_PAGE_ID:-}" \
+    NOTION_TODO_PAGE_ID="${NOTION_TODO_PAGE_ID:-}" QTLOG_VERIFY_DAY="${QTLOG_VERIFY_DAY:-}" \
+    python "$QTLOG_REPO_DIR/tools/notion_verify.py" "$1"
 }
 
+verify_log_structure() { notion_verify log; }
 
-
-
-
-verify_todo_structure() {
-  local verify_now todo_h_id resp todo_first todo_second top_id top_children
-
-  verify_now="$(TZ=America/Toronto date '+%Y-%m-%d %H%M ET')"
-  printf "VERIFY_TIME=%s\n" "$verify_now"
-
-  # CI-safe / operator-safe: if Notion env is missing, treat verify as a read-only clock proof
-  if [ -z "${NOTION_API_KEY:-}" ] || [ -z "${NOTION_TODO_PAGE_ID:-}" ]; then
-    echo "VERIFY_SKIP=missing_env"
-    return 0
-  fi
-
-  # 1) Find the ToDo heading block under the ToDo page (accept heading_1/2/3)
-  resp="$(
-    curl -sS "https://api.notion.com/v1/blocks/${NOTION_TODO_PAGE_ID}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28"
-  )"
-
-  todo_h_id="$(
-    printf '%s' "$resp" | jq -r '
-      .results[]?
-      | select(.type=="heading_1" or .type=="heading_2" or .type=="heading_3")
-      | . as $b
-      | ( if $b.type=="heading_1" then ($b.heading_1.rich_text|map(.plain_text)|join(""))
-          elif $b.type=="heading_2" then ($b.heading_2.rich_text|map(.plain_text)|join(""))
-          else ($b.heading_3.rich_text|map(.plain_text)|join(""))
-        end
-        ) as $t
-      | select($t=="ToDo")
-      | .id
-    ' | head -n1
-  )"
-
-  printf "TODO_H_ID=%s\n" "${todo_h_id:-}"
-
-  if [ -z "${todo_h_id:-}" ]; then
-    echo "VERIFY_FAIL=todo_heading_missing"
-    return 1
-  fi
-
-  # 2) Check first/second children under the ToDo heading (newest-at-top anchor expected)
-  resp="$(
-    curl -sS "https://api.notion.com/v1/blocks/${todo_h_id}/children?page_size=3" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28"
-  )"
-
-  todo_first="$(
-    printf '%s' "$resp" | jq -r '( .results[0] | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join("")) ) // "NOT_TOGGLE"'
-  )"
-
-  todo_second="$(
-    printf '%s' "$resp" | jq -r '( .results[1] | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join("")) ) // "EMPTY"'
-  )"
-
-  printf "TODO_FIRST=%s\nTODO_SECOND=%s\n" "$todo_first" "$todo_second"
-
-  if [ "$todo_first" != "__TOP__" ]; then
-    echo "VERIFY_FAIL=todo_top_anchor_missing_or_not_first"
-    return 1
-  fi
-
-  # If there is a second item, it must be a toggle (unless EMPTY)
-  if [ "$todo_second" = "NOT_TOGGLE" ]; then
-    echo "VERIFY_FAIL=todo_second_not_toggle"
-    return 1
-  fi
-
-  # Optional: ensure __TOP__ anchor has zero children
-  top_id="$(
-    printf '%s' "$resp" | jq -r '.results[0].id // empty'
-  )"
-  if [ -n "$top_id" ]; then
-    top_children="$(
-      curl -sS "https://api.notion.com/v1/blocks/${top_id}/children?page_size=1" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" | jq -r '(.results|length) // 0'
-    )"
-    printf "TODO_TOP_CHILDREN=%s\n" "$top_children"
-    if [ "$top_children" != "0" ]; then
-      echo "VERIFY_FAIL=todo_top_anchor_not_empty"
-      return 1
-    fi
-  fi
-
-  return 0
-}
+verify_todo_structure() { notion_verify todo; }
 
 
 ensure_todo_day_toggle() {
@@ -1170,26 +1645,8 @@ ensure_todo_day_toggle() {
     return 0
   fi
 
-  # Find ToDo heading under ToDo page
-  resp="$(
-    curl -sS "https://api.notion.com/v1/blocks/${NOTION_TODO_PAGE_ID}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28"
-  )"
-
-  todo_h_id="$(
-    printf '%s' "$resp" | jq -r '
-      .results[]?
-      | select(.type=="heading_1" or .type=="heading_2" or .type=="heading_3")
-      | . as $b
-      | ( if $b.type=="heading_1" then ($b.heading_1.rich_text|map(.plain_text)|join(""))
-          elif $b.type=="heading_2" then ($b.heading_2.rich_text|map(.plain_text)|join(""))
-          else ($b.heading_3.rich_text|map(.plain_text)|join(""))
-        end ) as $t
-      | select($t=="ToDo")
-      | .id
-    ' | head -n1
-  )"
+  # Find ToDo heading under ToDo page (same lookup as the verify engine)
+  todo_h_id="$(NOTION_API_KEY="$NOTION_API_KEY" python "$QTLOG_NOTION_API" find-heading "$NOTION_TODO_PAGE_ID" "ToDo")"
 
   if [ -z "${todo_h_id:-}" ]; then
     echo "TODO_ENSURE_FAIL=todo_heading_missing"
@@ -1198,9 +1655,7 @@ ensure_todo_day_toggle() {
 
   # Load children of ToDo heading to find __TOP__ id and whether today's toggle exists
   resp="$(
-    curl -sS "https://api.notion.com/v1/blocks/${todo_h_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28"
+    notion_http GET "blocks/${todo_h_id}/children?page_size=200" | notion_http_body
   )"
 
   top_id="$(
@@ -1253,11 +1708,7 @@ ensure_todo_day_toggle() {
       }'
   )"
 
-  curl -sS -X PATCH "https://api.notion.com/v1/blocks/${todo_h_id}/children" \
-    -H "Authorization: Bearer $NOTION_API_KEY" \
-    -H "Notion-Version: 2022-06-28" \
-    -H "Content-Type: application/json" \
-    -d "$payload" >/dev/null
+  notion_http PATCH "blocks/${todo_h_id}/children" "$payload" >/dev/null
 
   echo "TODO_DAY_CREATED=$today"
   return 0
@@ -1269,18 +1720,10 @@ ensure_todo_day_toggle() {
 
 
 # --- VERIFY DISPATCH (early exit, read-only) ---
-# --verify-all: supercheck Log + ToDo (read-only) and exit nonzero if any fails
-if [ "${VERIFY_ALL_ONLY:-0}" -eq 1 ]; then
-  verify_log_structure || exit $?
-  verify_todo_structure || exit $?
-  exit 0
-fi
-
-# --verify: verify Log + ToDo (read-only) and exit nonzero if any fails
-if [ "${VERIFY_ONLY:-0}" -eq 1 ]; then
-  verify_log_structure || exit $?
-  verify_todo_structure || exit $?
-  exit 0
+# --verify-all / --verify: Log + ToDo (read-only, one engine run) and exit nonzero if any fails
+if [ "${VERIFY_ALL_ONLY:-0}" -eq 1 ] || [ "${VERIFY_ONLY:-0}" -eq 1 ]; then
+  notion_verify all
+  exit $?
 fi
 
 # --verify-todo: verify ToDo only (read-only)
@@ -1295,7 +1738,90 @@ if [ "${VERIFY_TODO_ONLY:-0}" -eq 1 ]; then
   exit $?
 fi
 
-if [ "${#ARGS[@]}" -eq 0 ]; then
+# --- ROLLOVER DISPATCH (early exit) ---
+# --rollover: keep the H1 "Log" / "ToDo" levels at __TOP__ + recent days + "Archive"
+# (tools/notion_rollover.py; docs/SOP_NOTION_LOG_ORDERING.md Q11). qtday runs it daily
+# (QTDAY_ROLLOVER=0 turns that off). Moved days leave the Log id cache; notion_log_resolve_day finds them in the Archive.
+if [ "$ROLLOVER_MODE" -eq 1 ]; then
+  sop_env_check need_notion || exit 1
+  ROLLOVER_OUT="$(NOTION_API_KEY="${NOTION_API_KEY:-}" NOTION_LOG_PAGE_ID="${NOTION_LOG_PAGE_ID:-}" \
+    NOTION_TODO_PAGE_ID="${NOTION_TODO_PAGE_ID:-}" QTLOG_STATE_DIR="$QTLOG_STATE_DIR" \
+    python "$QTLOG_REPO_DIR/tools/notion_rollover.py" all $( [ "$DRY_RUN" -ne 0 ] && echo --dry-run ))"
+  ROLLOVER_RC=$?
+  [ -n "$ROLLOVER_OUT" ] && printf '%s\n' "$ROLLOVER_OUT"
+  notion_cache_drop $(printf '%s\n' "$ROLLOVER_OUT" | sed -n 's/^ROLLOVER_MOVED=log:.* id=//p')
+  exit "$ROLLOVER_RC"
+fi
+
+# --- COMPACT DISPATCH (early exit) ---
+# --compact: months before the current ET month move into Log/archive/YYYY-MM.log.gz +
+# .index.json (tools/log_format.py compact), so Log/ holds one file pair per closed month
+# instead of one file per day/entry. The archived paths are committed as one commit;
+# the push goes through push.pending like a log write.
+if [ "$COMPACT_MODE" -eq 1 ]; then
+  python "$QTLOG_REPO_DIR/tools/log_format.py" compact --log-dir "$QTLOG_LOG_DIR" \
+    $( [ "$DRY_RUN" -ne 0 ] && echo --dry-run ) || exit 1
+  if [ "$DRY_RUN" -ne 0 ] || [ "$NO_GIT" -ne 0 ] || ! command -v git >/dev/null 2>&1 \
+     || ! git -C "$QTLOG_REPO_DIR" rev-parse --is-inside-work-tree >/dev/null 2>&1 \
+     || git -C "$QTLOG_REPO_DIR" check-ignore -q "$QTLOG_LOG_DIR" 2>/dev/null; then
+    exit 0
+  fi
+  cd "$QTLOG_REPO_DIR" || exit 1
+  GIT_FILES=("$QTLOG_LOG_DIR")
+  git_lock || exit 1
+  git_commit_logs "qtlog: compact Log into monthly archives"
+  case $? in
+    0)
+      mkdir -p "$QTLOG_STATE_DIR" && date '+%Y-%m-%d %H%M' > "$QTLOG_PUSH_PENDING_FILE"
+      echo "qtlog: compact committed $(git rev-parse --short HEAD); push pending (qtlog.sh --sync)"
+      ;;
+    1) echo "qtlog: compact: nothing to commit" ;;
+    *) echo "qtlog: compact: git commit failed" >&2; git_unlock; exit 1 ;;
+  esac
+  git_unlock
+  exit 0
+fi
+
+# --- BOOTSTRAP DISPATCH (qtday) ---
+# --bootstrap [MSG]: Log-day ensure, ToDo-day ensure and the --verify-all checks in one
+# process (tools/notion_bootstrap.py: shared listings, Log and ToDo branches concurrently),
+# one SOP gate; the "sop MSG" entry is written locally and queued for the outbox, so no
+# git or Notion write waits at the prompt. Exit code: the bootstrap's.
+BOOTSTRAP_RC=0
+if [ "$BOOTSTRAP_MODE" -eq 1 ]; then
+  if [ -n "${NOTION_API_KEY:-}" ] && [ -n "${NOTION_LOG_PAGE_ID:-}" ]; then
+    sop_env_check need_notion || exit 1
+  else
+    sop_env_check || exit 1
+  fi
+  qt_now_ms trace_t0
+  while IFS= read -r line; do
+    case "$line" in
+      NOTION_LOG_IDS=*)
+        read -r b_h1 b_day b_top <<<"${line#NOTION_LOG_IDS=}"
+        notion_cache_put "$NOTION_LOG_PAGE_ID" "Log" "$b_h1"
+        notion_cache_put "$b_h1" "$(TZ=America/Toronto date '+%Y-%m-%d')" "$b_day"
+        notion_cache_put "$b_day" "__TOP__" "$b_top"
+        ;;
+      BOOTSTRAP_RC=*) BOOTSTRAP_RC="${line#BOOTSTRAP_RC=}" ;;
+      *) printf '%s\n' "$line" ;;
+    esac
+  done < <(
+    NOTION_API_KEY="${NOTION_API_KEY:-}" NOTION_LOG_PAGE_ID="${NOTION_LOG_PAGE_ID:-}" \
+      NOTION_TODO_PAGE_ID="${NOTION_TODO_PAGE_ID:-}" python "$QTLOG_REPO_DIR/tools/notion_bootstrap.py"
+    echo "BOOTSTRAP_RC=$?"
+  )
+  qt_trace notion.bootstrap "$trace_t0" rc="$BOOTSTRAP_RC"
+  [ "${#ARGS[@]}" -gt 0 ] || ARGS=(bootstrap day)
+  ARGS=(sop "${ARGS[@]}")
+  if [ "$LOG_MODE_EXPLICIT" -eq 0 ]; then
+    LOG_MODE=both
+    [ -n "${NOTION_API_KEY:-}" ] && [ -n "${NOTION_LOG_PAGE_ID:-}" ] || LOG_MODE=local
+  fi
+  SPOOL_MODE=1
+fi
+
+if [ "${#ARGS[@]}" -eq 0 ] && [ "$FLUSH_MODE" -eq 0 ]; then
   echo "qtlog: message is required" >&2
   echo "Try: qtlog.sh --help" >&2
   exit 1
@@ -1316,17 +1842,34 @@ TODAY="$(date +%Y-%m-%d)"
 NOW_FMT="$(date +"$QTLOG_TIMESTAMP_FORMAT")"
 DEVICE="${OVERRIDE_DEVICE:-$QTLOG_DEVICE}"
 
-LOG_FILE="$QTLOG_LOG_DIR/$TODAY.log"
+if [ "$QTLOG_LOG_FORMAT" = "jsonl" ]; then
+  LOG_FILE="$QTLOG_LOG_DIR/$TODAY.jsonl"
+else
+  LOG_FILE="$QTLOG_LOG_DIR/$TODAY.log"
+fi
+
+log_append_text() {
+  # One text entry under an flock on the log file itself: parallel writers append whole
+  # entries, never interleaved pieces of a large one.
+  { if command -v flock >/dev/null 2>&1; then flock 6; fi; printf '%s\n' "$1" >&6; } 6>>"$LOG_FILE"
+}
+
+log_append_jsonl() {
+  # One structured record, one O_APPEND write. $1 = Notion block id (may be empty).
+  python "$QTLOG_REPO_DIR/tools/log_format.py" append --file "$LOG_FILE" \
+    --device "$DEVICE" --mode "${LOG_MODE:-git}" --version "$VERSION" --notion-id "${1:-}" -- "$ENTRY"
+}
 
 # --- Dry-run short-circuit ----------------------------------------
 if [ "$DRY_RUN" -ne 0 ]; then
   echo "qtlog DRY-RUN"
   echo "  Repo dir  : $QTLOG_REPO_DIR"
   echo "  Log dir   : $QTLOG_LOG_DIR"
-  echo "  Log file  : $LOG_FILE"
+  echo "  Log file  : $LOG_FILE ($QTLOG_LOG_FORMAT)"
   echo "  Device    : $DEVICE"
   echo "  Timestamp : $NOW_FMT"
   echo "  Message   : $MESSAGE"
+  echo "  Spool     : $( [ "$FLUSH_MODE" -eq 1 ] && echo "flush $(spool_count) queued" || { [ "$SPOOL_MODE" = "1" ] && echo 'queue' || echo 'off'; } )"
   echo "  Git       : $( [ "$NO_GIT" -ne 0 ] && echo 'disabled' || echo 'enabled' )"
   exit 0
 fi
@@ -1338,8 +1881,39 @@ if ! mkdir -p "$QTLOG_LOG_DIR"; then
 fi
 
 # --- Write log entry ----------------------------------------------
-ENTRY="$MESSAGE"
-echo "$ENTRY" >> "$LOG_FILE"
+LOG_FILES=("$LOG_FILE")
+LOG_PENDING=0
+if [ "$FLUSH_MODE" -eq 0 ]; then
+  ENTRY="$MESSAGE"
+  qt_now_ms trace_t0
+  if [ "$QTLOG_LOG_FORMAT" != "jsonl" ]; then
+    log_append_text "$ENTRY" || { echo "qtlog: failed to write $LOG_FILE" >&2; exit 1; }
+    qt_trace log.append "$trace_t0" format=text
+  elif [ "${SPOOL_MODE}" != "1" ] && { [ "$LOG_MODE" = "notion" ] || [ "$LOG_MODE" = "both" ]; }; then
+    LOG_PENDING=1   # written after the Notion step so the record carries the entry's block id
+  elif ! log_append_jsonl ""; then
+    echo "qtlog: failed to write $LOG_FILE" >&2
+    exit 1
+  else
+    qt_trace log.append "$trace_t0" format=jsonl
+  fi
+fi
+
+# --- Spool: queue for --flush and stop here (no Notion/git at the prompt) ---
+if [ "$SPOOL_MODE" = "auto" ]; then
+  SPOOL_MODE=0
+  if [ "${LOG_MODE:-}" != "local" ] && sync_worker_running; then
+    SPOOL_MODE=1
+  fi
+fi
+if [ "$SPOOL_MODE" = "1" ] && [ "$FLUSH_MODE" -eq 0 ]; then
+  if [ "$LOG_PENDING" -eq 1 ]; then
+    log_append_jsonl "" || { echo "qtlog: failed to write $LOG_FILE" >&2; exit 1; }
+  fi
+  spool_entry "$ENTRY" "$LOG_FILE" "${LOG_MODE:-}" || { echo "qtlog: failed to queue entry in $QTLOG_SPOOL_FILE" >&2; exit 1; }
+  echo "qtlog: logged to $LOG_FILE (queued for --flush: $(spool_count) pending)"
+  exit "$BOOTSTRAP_RC"
+fi
 
 
 
@@ -1358,6 +1932,8 @@ echo "$ENTRY" >> "$LOG_FILE"
 # Big payload strategy:
 # - Keep title short
 # - Put large/multiline body under Log as code blocks
+# - The first batch (<=100 code blocks) rides inside the entry insert; anything longer
+#   (and QTLOG_APPEND_FILE) streams in 100-block PATCHes via tools/notion_upload.py
 
 # --- Notion helper: find first child toggle by exact title (GitHub-safe) ---
 notion_find_child_toggle_id_by_title() {
@@ -1368,9 +1944,7 @@ notion_find_child_toggle_id_by_title() {
   [ -z "${title:-}" ] && return 1
   [ -z "${NOTION_API_KEY:-}" ] && return 1
 
-  curl -sS "https://api.notion.com/v1/blocks/${parent_id}/children?page_size=200" \
-    -H "Authorization: Bearer $NOTION_API_KEY" \
-    -H "Notion-Version: 2022-06-28" | \
+  notion_http GET "blocks/${parent_id}/children?page_size=200" | notion_http_body | \
   jq -r --arg t "$title" '.results[]?
     | select(.type=="toggle")
     | select((.toggle.rich_text|map(.plain_text)|join(""))==$t)
@@ -1378,43 +1952,34 @@ notion_find_child_toggle_id_by_title() {
 }
 
 
-notion_append_big_text_as_codeblocks() {
-  local entry_id="$1"
-  local raw_text="$2"
-
-  local log_child_id
-      # Retry: newly-created entry children can be eventually-consistent in Notion API
-    local tries=0
-    while :; do
-      log_child_id="$(notion_find_child_toggle_id_by_title "$entry_id" "Log")" || true
-      [ -n "${log_child_id:-}" ] && break
-      tries=$((tries+1))
-      [ "$tries" -ge 6 ] && break
-      sleep 1
-    done
-  [ -z "$log_child_id" ] && return 0
+notion_upload_codeblocks() {
+  # $1 entry id, $2 source key (msg | file-<cksum of path>), then tools/notion_upload.py append
+  # options (--file F or stdin, --skip-first-line, --skip-blocks N).
+  # Streams the text into code blocks under the entry's "Log" child, 100 blocks per PATCH.
+  # The entry exists once its insert returned, so the Log child is read once (no polling).
+  # Progress is kept in $QTLOG_STATE_DIR/upload-<entry id>-<source key>.json until the upload
+  # completes: the message overflow and QTLOG_APPEND_FILE share the Log child but never a state.
+  local entry_id="$1" source="$2" log_child_id state
+  shift 2
+  log_child_id="$(notion_find_child_toggle_id_by_title "$entry_id" "Log")" || true
+  if [ -z "${log_child_id:-}" ]; then
+    echo "qtlog: entry ${entry_id} has no Log child; big payload not attached" >&2
+    return 1
+  fi
+  state="$QTLOG_STATE_DIR/upload-${entry_id}-${source}.json"
+  if ! notion_py notion_upload append "$log_child_id" --state "$state" --source "$source" "$@"; then
+    echo "qtlog: big payload upload incomplete; resume with: python tools/notion_upload.py append ${log_child_id} --state ${state} --source ${source} $*" >&2
+    return 1
+  fi
+}
 
+notion_append_big_text_as_codeblocks() {
+  # $1 entry id, $2 raw message (line 1 is the title and is skipped), $3 code blocks already sent inline
+  local entry_id="$1" raw_text="$2"
   local body
   body="$(printf "%s" "$raw_text" | awk 'NR==1{next} {print}')"
   [ -z "${body//[[:space:]]/}" ] && return 0
-
-    printf "%s" "$body" | python - <<'PY' | \
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${log_child_id}/children" \
-        -H "Authorization: Bearer ${NOTION_API_KEY}" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d @-
-import json, sys
-text = sys.stdin.read()
-chunk = 1400
-parts = [text[i:i+chunk] for i in range(0, len(text), chunk)]
-blocks = [{
-  "object":"block",
-  "type":"code",
-  "code":{"rich_text":[{"type":"text","text":{"content":p}}],"language":"plain text"}
-} for p in parts]
-print(json.dumps({"children": blocks}, ensure_ascii=False))
-PY
+  printf "%s" "$raw_text" | notion_upload_codeblocks "$entry_id" msg --skip-first-line --skip-blocks "${3:-0}"
 }
 ### /QTLOG_NOTION_BIGPAYLOAD_HELPERS ###
 write_notion_toggle() {
@@ -1425,211 +1990,226 @@ write_notion_toggle() {
   local raw="${ENTRY:-$MESSAGE}"
 
   # SOP: entry title must be "YYYY-MM-DD HHMM ET — description"
-  local ts_min desc title
+  local ts_min title
   ts_min="$(TZ=America/Toronto date '+%Y-%m-%d %H%M')"
-
-  # QTLOG_TITLE_SAFETY
-  # Use ONLY first line and hard-cap length for Notion (<=2000)
-  desc="$(printf "%s" "$raw" | awk 'NR==1{print; exit}')"
-  # Strip trailing timestamps like " — 2025-12-18 221141" or " — 2025-12-18 2211"
-  desc="$(printf "%s" "$desc" | sed -E 's/[[:space:]]+—[[:space:]]+[0-9]{4}-[0-9]{2}-[0-9]{2}[[:space:]]+[0-9]{4,6}$//')"
-  desc="${desc:0:1800}"
-  title="${ts_min} ET — ${desc}"
+  NOTION_WRITE_TS="$ts_min"
+  NOTION_WRITE_SENT=0
+  title="$(notion_entry_title "$raw" "$ts_min")"
 
   local today
   today="$(TZ=America/Toronto date '+%Y-%m-%d')"
 
-  # 1) Locate the H1 "Log" under the QT - Log page
-  local log_h1_id
-  log_h1_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${NOTION_LOG_PAGE_ID}/children?page_size=100" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
-      | select(.type=="heading_1")
-      | select((.heading_1.rich_text[0].plain_text // "")=="Log")
-      | .id' | head -n1
-  )"
-
-  if [ -z "${log_h1_id:-}" ]; then
-    echo "qtlog: Notion log failed (could not find H1 'Log')" >&2
-    return 1
+  # 1-3) Resolve H1 "Log" / day toggle / Day __TOP__ (cached ids first; see notion_log_resolve_day)
+  # 4) Insert newest entry AFTER Day __TOP__ so it always appears at the top of the day list
+  local attempt note payload_entry resp code new_id big_json=""
+  # SOP: big payload safety — if multiline (or forced), the body goes under the entry's Log as code blocks
+  if notion_entry_is_big "$raw"; then
+    big_json="$(printf '%s' "$raw" | notion_py notion_upload blocks --skip-first-line)" || big_json=""
   fi
+  for attempt in 1 2; do
+    if ! notion_log_resolve_day "$today"; then
+      case "$NOTION_RESOLVE_FAIL" in
+        missing_h1_log)    echo "qtlog: Notion log failed (could not find H1 'Log')" >&2 ;;
+        day_top_not_first) echo "qtlog: Day __TOP__ is not the first child under ${today}. Drag Day __TOP__ to the TOP once, then retry." >&2 ;;
+        *)                 echo "qtlog: Notion log failed (${NOTION_RESOLVE_FAIL})" >&2 ;;
+      esac
+      return 1
+    fi
+    for note in $NOTION_RESOLVE_NOTES; do
+      case "$note" in
+        created_h1_top_anchor)  echo "qtlog: created H1 __TOP__ (please drag it to the TOP under H1 'Log' once)" >&2 ;;
+        created_day_top_anchor) echo "qtlog: created Day __TOP__ (please drag it to the TOP under ${today} once)" >&2 ;;
+      esac
+    done
 
-  # 1b) Ensure H1 __TOP__ anchor exists (user should keep it as the FIRST block under H1)
-  local h1_top_id h1_first_id
-  h1_first_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | jq -r '.results[0].id // empty'
-  )"
+    # Big payload: the first batch of code blocks rides inside the insert (under the entry's Log child).
+    payload_entry="$(printf '%s' "${big_json:-null}" | jq -c --arg after "$NOTION_DAY_TOP_ID" --arg t "$title" \
+      "$NOTION_ENTRY_JQ"'. as $big | {after:$after, children:[entry($t)
+        | if $big then .toggle.children[0].toggle.children = $big.blocks else . end]}')"
 
-  h1_top_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
-      | select(.type=="toggle")
-      | select((.toggle.rich_text|map(.plain_text)|join(""))=="__TOP__")
-      | .id' | head -n1
-  )"
+### QTLOG_NOTION_ENTRY_PATCH ###
+    # 5) Write entry to Notion (PATCH children of the day toggle)
+    NOTION_WRITE_SENT=1
+    resp="$(notion_http PATCH "blocks/${NOTION_DAY_ID}/children" "$payload_entry")"
+    code="$(printf '%s\n' "$resp" | notion_http_code)"
+    resp="$(printf '%s\n' "$resp" | notion_http_body)"
+    new_id="$(printf '%s' "$resp" | jq -r '.results[0].id // empty' 2>/dev/null)"
+    [ -n "${new_id:-}" ] && break
+
+    # Cached ids went stale between validation and write: forget them and rediscover once.
+    # Only on a 4xx (the insert was rejected); after a 5xx/timeout it may have landed.
+    if [ "$attempt" -eq 1 ] && [ "$NOTION_RESOLVE_CACHED" -eq 1 ] && [ "${code:-0}" -ge 400 ] && [ "${code:-0}" -lt 500 ]; then
+      notion_cache_drop "$NOTION_DAY_ID" "$NOTION_DAY_TOP_ID"
+      continue
+    fi
+    echo "qtlog: Notion log failed (entry insert returned no id)" >&2
+    printf '%s\n' "$resp" >&2
+    return 1
+  done
+  echo "qtlog: Notion entry inserted id=$new_id" >&2
+  NOTION_ENTRY_ID="$new_id"
 
-  if [ -z "${h1_top_id:-}" ]; then
-    # Create H1 __TOP__ (best practice: drag it to be FIRST under H1 once, then it stays there)
-    local payload_h1_top
-    payload_h1_top="$(jq -nc --arg after "${h1_first_id:-}" '{
-      after: ($after|select(length>0)),
-      children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]
-    }')"
-    h1_top_id="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${log_h1_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload_h1_top" | jq -r '.results[0].id // empty' )"
-    echo "qtlog: created H1 __TOP__ (please drag it to the TOP under H1 'Log' once)" >&2
-  fi
-
-  # 2) Find today's toggle under H1, or create it (new day inserted AFTER H1 __TOP__)
-  local day_id
-  day_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${log_h1_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r --arg t "$today" '.results[]?
-      | select(.type=="toggle")
-      | select((.toggle.rich_text[0].plain_text // "")==$t)
-      | .id' | head -n1
-  )"
+  # Rest of a body longer than the inline batch (rare: argv caps a message near 128 KB).
+  if [ -n "$big_json" ] && [ "$(jq -r '.more' <<<"$big_json")" = "true" ]; then
+    notion_append_big_text_as_codeblocks "$new_id" "$raw" "$(jq -r '.blocks | length' <<<"$big_json")" || true
+  fi
 
-  if [ -z "${day_id:-}" ]; then
-    local payload_day
-    payload_day="$(jq -nc --arg after "${h1_top_id:-}" --arg d "$today" '{
-      after: ($after|select(length>0)),
-      children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:$d}}],children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]}}]
-    }')"
-    day_id="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${log_h1_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload_day" | jq -r '.results[0].id // empty' )"
-  fi
-  [ -z "${day_id:-}" ] && return 1
-
-  # 3) Ensure Day __TOP__ anchor exists (user should keep it as FIRST under the day once)
-  local top_id first_id
-  first_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | jq -r '.results[0].id // empty'
-  )"
+  # AUTO_APPEND_FILE: if QTLOG_APPEND_FILE points to a file, stream its content into the entry's Log child.
+  # GitHub-safe: no secrets; operator controls file path locally.
+  if [ -n "${QTLOG_APPEND_FILE:-}" ] && [ -f "${QTLOG_APPEND_FILE}" ]; then
+    if grep -q '[^[:space:]]' "${QTLOG_APPEND_FILE}"; then
+      notion_upload_codeblocks "$new_id" "file-$(printf '%s' "${QTLOG_APPEND_FILE}" | cksum | cut -d' ' -f1)" \
+        --file "${QTLOG_APPEND_FILE}" < /dev/null \
+        && echo "qtlog: appended file to Notion entry (QTLOG_APPEND_FILE=${QTLOG_APPEND_FILE})" >&2
+    else
+      echo "qtlog: QTLOG_APPEND_FILE was empty; nothing appended (${QTLOG_APPEND_FILE})" >&2
+    fi
+  fi
 
-  top_id="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=200" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '.results[]?
-      | select(.type=="toggle")
-      | select((.toggle.rich_text|map(.plain_text)|join(""))=="__TOP__")
-      | .id' | head -n1
-  )"
+    return 0
 
-  if [ -z "${top_id:-}" ]; then
-    local payload_top
-    payload_top="$(jq -nc --arg after "${first_id:-}" '{
-      after: ($after|select(length>0)),
-      children:[{object:"block",type:"toggle",toggle:{rich_text:[{type:"text",text:{content:"__TOP__"}}],children:[]}}]
-    }')"
-    top_id="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${day_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload_top" | jq -r '.results[0].id // empty' )"
-    echo "qtlog: created Day __TOP__ (please drag it to the TOP under ${today} once)" >&2
-  fi
-  [ -z "${top_id:-}" ] && return 1
-
-
-  # Guard: Day __TOP__ must be the FIRST child under the day toggle for true newest-at-top behavior.
-  local day_first_title
-  day_first_title="$(
-    curl -sS "https://api.notion.com/v1/blocks/${day_id}/children?page_size=1" \
-      -H "Authorization: Bearer $NOTION_API_KEY" \
-      -H "Notion-Version: 2022-06-28" | \
-    jq -r '(
-      .results[0]
-      | select(.type=="toggle")
-      | (.toggle.rich_text|map(.plain_text)|join(""))
-    ) // ""'
-  )"
+}
 
-  if [ "$day_first_title" != "__TOP__" ]; then
-    echo "qtlog: Day __TOP__ is not the first child under ${today}. Drag Day __TOP__ to the TOP once, then retry." >&2
-    return 1
+### QTLOG_SPOOL_FLUSH ###
+spool_reconcile() {
+  # $1 claimed spool file. Drop entries whose earlier insert was sent but never
+  # acknowledged and whose title is already under their day toggle.
+  local claimed="$1" sent="${QTLOG_SPOOL_FILE}.sent" keys day present tmp
+  [ -s "$sent" ] || return 0
+  keys="$(awk '$1=="S"{s[$2]=1} $1=="A"{delete s[$2]} END{for (k in s) print k}' "$sent" | jq -Rsc 'split("\n") | map(select(length>0))')"
+  [ "$keys" = "[]" ] && return 0
+  for day in $(jq -r --argjson k "$keys" 'select(.key as $x | $k | index([$x])) | .day' "$claimed" | sort -u); do
+    notion_log_resolve_day "$day" || return 1
+    present="$(notion_http GET "blocks/${NOTION_DAY_ID}/children?page_size=200" | notion_http_body \
+      | jq -c '[.results[]? | select(.type=="toggle") | .toggle.rich_text | map(.plain_text) | join("")]')" || return 1
+    [ -n "$present" ] || return 1
+    tmp="$(mktemp)"
+    jq -c --argjson k "$keys" --arg d "$day" --argjson p "$present" '
+      select(.day != $d or ((.key as $x | $k | index([$x])) == null) or ((.title as $t | $p | index([$t])) == null))
+    ' "$claimed" > "$tmp"
+    if [ "$(wc -l < "$tmp")" -lt "$(wc -l < "$claimed")" ]; then
+      echo "qtlog: flush: $(( $(wc -l < "$claimed") - $(wc -l < "$tmp") )) entries for ${day} were already in Notion (not re-sent)" >&2
+    fi
+    mv -f "$tmp" "$claimed"
+  done
+  # Every unacknowledged key is now settled one way or the other.
+  rm -f "$sent"
+}
+
+spool_flush() {
+  # Drain the spool. Notion entries go per day in multi-child PATCHes after Day __TOP__
+  # (oldest chunk first, newest-first inside a chunk, so the day stays newest-at-top).
+  # Entries that cannot be written stay queued for the next --flush.
+  # Sets MESSAGE (batch commit message) and LOG_FILES (log files for the git step).
+  local claimed="${QTLOG_SPOOL_FILE}.flushing" sent="${QTLOG_SPOOL_FILE}.sent" keep total days day entries n off chunk payload resp code ids k attempt
+  local written=0 calls=0
+  spool_locked spool_claim_unlocked || return 1
+  if [ ! -s "$claimed" ]; then
+    rm -f "$claimed"
+    echo "qtlog: spool is empty; nothing to flush"
+    LOG_FILES=()
+    return 0
   fi
+  keep="$(mktemp)"
+  if ! spool_reconcile "$claimed"; then
+    echo "qtlog: flush: cannot confirm earlier unacknowledged inserts (${NOTION_RESOLVE_FAIL:-offline}); everything stays queued" >&2
+    spool_locked spool_requeue_unlocked "$claimed"
+    rm -f "$keep"
+    LOG_FILES=()
+    return 0
+  fi
+  total="$(wc -l < "$claimed" | tr -d ' ')"
 
-  # 4) Insert newest entry AFTER Day __TOP__ so it always appears at the top of the day list
-  local payload_entry
-  payload_entry="$(jq -nc --arg after "$top_id" --arg t "$title" '{
-    after:$after,
-    children:[{
-      object:"block", type:"toggle",
-      toggle:{
-        rich_text:[{type:"text", text:{content:$t}}],
-        children:[
-          {object:"block", type:"toggle", toggle:{rich_text:[{type:"text", text:{content:"Log"}}], children:[]}},
-          {object:"block", type:"toggle", toggle:{rich_text:[{type:"text", text:{content:"Notes"}}], children:[]}},
-          {object:"block", type:"toggle", toggle:{rich_text:[{type:"text", text:{content:"Next steps"}}], children:[]}}
-        ]
-      }
-    }]
-  }')"
+  days="$(jq -r 'select(.mode=="notion" or .mode=="both") | .day' "$claimed" | sort -u)"
+  if [ -n "$days" ] && { [ -z "${NOTION_API_KEY:-}" ] || [ -z "${NOTION_LOG_PAGE_ID:-}" ] || ! sop_env_check need_notion; }; then
+    echo "qtlog: flush: Notion not available; Notion entries stay queued" >&2
+    jq -c 'select(.mode=="notion" or .mode=="both")' "$claimed" >> "$keep"
+    days=""
+  fi
 
-### QTLOG_NOTION_ENTRY_PATCH ###
-    # 5) Write entry to Notion (PATCH children of day_id)
-    local resp new_id
-    resp="$(
-      curl -sS -X PATCH "https://api.notion.com/v1/blocks/${day_id}/children" \
-        -H "Authorization: Bearer $NOTION_API_KEY" \
-        -H "Notion-Version: 2022-06-28" \
-        -H "Content-Type: application/json" \
-        -d "$payload_entry"
-    )"
-    new_id="$(printf '%s' "$resp" | jq -r '.results[0].id // empty')"
-    if [ -z "${new_id:-}" ]; then
-      echo "qtlog: Notion log failed (entry insert returned no id)" >&2
-      printf '%s\n' "$resp" >&2
-      return 1
+  for day in $days; do
+    entries="$(jq -sc --arg d "$day" 'map(select(.day==$d and (.mode=="notion" or .mode=="both")))' "$claimed")"
+    n="$(jq 'length' <<<"$entries")"
+    if ! notion_log_resolve_day "$day"; then
+      echo "qtlog: flush: Notion day ${day} unavailable (${NOTION_RESOLVE_FAIL}); ${n} entries stay queued" >&2
+      jq -c '.[]' <<<"$entries" >> "$keep"
+      continue
     fi
-    echo "qtlog: Notion entry inserted id=$new_id" >&2
-
-        # AUTO_APPEND_FILE: if QTLOG_APPEND_FILE points to a file, append its content into the Notion entry.
-        # GitHub-safe: no secrets; operator controls file path locally.
-        if [ -n "${QTLOG_APPEND_FILE:-}" ] && [ -f "${QTLOG_APPEND_FILE}" ]; then
-          local file_body
-          file_body="$(cat "${QTLOG_APPEND_FILE}")"
-          if [ -n "${file_body:-}" ]; then
-            notion_append_big_text_as_codeblocks "$new_id" "$file_body" || true
-            echo "qtlog: appended file to Notion entry (QTLOG_APPEND_FILE=${QTLOG_APPEND_FILE})" >&2
-          else
-            echo "qtlog: QTLOG_APPEND_FILE was empty; nothing appended (${QTLOG_APPEND_FILE})" >&2
-          fi
-        fi
-
-      # SOP: big payload safety — if multiline (or forced), append body under Log as code blocks
-      if [ "${QTLOG_FORCE_BIGPAYLOAD:-0}" = "1" ] || [ "$(printf "%s" "$raw" | wc -l | tr -d " ")" -gt 1 ]; then
-        notion_append_big_text_as_codeblocks "$new_id" "$raw" || true
+    off=0
+    while [ "$off" -lt "$n" ]; do
+      chunk="$(jq -c --argjson o "$off" '.[$o:$o+100] | reverse' <<<"$entries")"
+      jq -r '.[] | select(.key) | "S " + .key' <<<"$chunk" >> "$sent"
+      for attempt in 1 2; do
+        payload="$(jq -c --arg after "$NOTION_DAY_TOP_ID" "$NOTION_ENTRY_JQ"'{after:$after, children:map(entry(.title))}' <<<"$chunk")"
+        resp="$(notion_http PATCH "blocks/${NOTION_DAY_ID}/children" "$payload")"
+        code="$(printf '%s\n' "$resp" | notion_http_code)"
+        resp="$(printf '%s\n' "$resp" | notion_http_body)"
+        calls=$((calls + 1))
+        ids="$(printf '%s' "$resp" | jq -r '.results[]?.id // empty' 2>/dev/null)"
+        [ -n "$ids" ] && break
+        # Same stale-cache recovery as write_notion_toggle (rejected inserts only).
+        [ "$attempt" -eq 1 ] && [ "$NOTION_RESOLVE_CACHED" -eq 1 ] && [ "${code:-0}" -ge 400 ] && [ "${code:-0}" -lt 500 ] || break
+        notion_cache_drop "$NOTION_DAY_ID" "$NOTION_DAY_TOP_ID"
+        notion_log_resolve_day "$day" || break
+      done
+      if [ -z "$ids" ]; then
+        echo "qtlog: flush: Notion insert failed for ${day}; $((n - off)) entries stay queued" >&2
+        printf '%s\n' "$resp" >&2
+        jq -c --argjson o "$off" '.[$o:][]' <<<"$entries" >> "$keep"
+        break
       fi
-
-    return 0
-
+      jq -r '.[] | select(.key) | "A " + .key' <<<"$chunk" >> "$sent"
+      # Multiline bodies go under each new entry's "Log" toggle (same as a single write).
+      for k in $(jq -r 'to_entries[] | select(.value.big) | .key' <<<"$chunk"); do
+        notion_append_big_text_as_codeblocks "$(sed -n "$((k + 1))p" <<<"$ids")" \
+          "$(jq -r --argjson k "$k" '.[$k].message' <<<"$chunk")" || true
+      done
+      written=$((written + $(jq 'length' <<<"$chunk")))
+      off=$((off + 100))
+    done
+  done
+
+  mapfile -t LOG_FILES < <(jq -r 'select(.mode!="local" and .mode!="notion") | .log_file' "$claimed" | sort -u)
+  spool_locked spool_requeue_unlocked "$keep"
+  # Keep only the journal lines that still matter: sent, never acknowledged.
+  if [ -f "$sent" ]; then
+    awk '$1=="S"{s[$2]=1} $1=="A"{delete s[$2]} END{for (k in s) print "S " k}' "$sent" > "${sent}.$$" \
+      && mv -f "${sent}.$$" "$sent"
+    [ -s "$sent" ] || rm -f "$sent"
+  fi
+  rm -f "$keep"
+  echo "qtlog: flush: ${written}/${total} queued entries written to Notion in ${calls} PATCH calls; $(spool_count) still queued" >&2
+  MESSAGE="flush: ${total} queued entries"
+  return 0
 }
 
 # --- Notion sync ---
-if [ "$LOG_MODE" = "notion" ] || [ "$LOG_MODE" = "both" ]; then
+# Every Notion call of this step (resolve, insert, upload; reconcile and the per-day
+# chunk PATCHes of a flush) goes through one session process and connection.
+if [ "$FLUSH_MODE" -eq 1 ]; then
+  notion_session_start
+  spool_flush || exit 1
+  notion_session_stop
+  if [ "${#LOG_FILES[@]}" -eq 0 ]; then
+    exit 0
+  fi
+elif [ "$LOG_MODE" = "notion" ] || [ "$LOG_MODE" = "both" ]; then
+  qt_now_ms trace_t0
+  notion_session_start
   write_notion_toggle
+  NOTION_WRITE_RC=$?
+  notion_session_stop
+  qt_trace notion.write "$trace_t0" rc="$NOTION_WRITE_RC"
+  if [ "$NOTION_WRITE_RC" -ne 0 ]; then
+    # Outbox: keep the entry for `qtlog.sh --sync` (same title stamp; re-sent only if it is not already there).
+    if spool_entry "$ENTRY" "$LOG_FILE" notion "${NOTION_WRITE_TS:-}" "$([ "${NOTION_WRITE_SENT:-0}" -eq 1 ] && echo sent)"; then
+      echo "qtlog: Notion write failed; entry queued for retry (qtlog.sh --sync or --sync-start)" >&2
+    fi
+  fi
+  if [ "$LOG_PENDING" -eq 1 ] && ! log_append_jsonl "${NOTION_ENTRY_ID:-}"; then
+    echo "qtlog: failed to write $LOG_FILE" >&2
+    exit 1
+  fi
 fi
 
 
@@ -1637,20 +2217,7 @@ fi
 
 
 
-confirm_commit() {
-  # Non-interactive: commit only if something changed.
-  # Return 0 to proceed; return 1 to skip commit/push.
-  if command -v git >/dev/null 2>&1; then
-    if [ "$(git status --porcelain 2>/dev/null | wc -l | tr -d " ")" -eq 0 ]; then
-      echo "qtlog: nothing changed; skipping commit/push"
-      return 1
-    fi
-    return 0
-  fi
-  return 1
-}
-
-# --- Git sync -----------------------------------------------------
+# --- Git sync (QTLOG_GIT_SYNC) ------------------------------------
 cd "$QTLOG_REPO_DIR"
 
 if [ "$NO_GIT" -ne 0 ]; then
@@ -1659,19 +2226,21 @@ if [ "$NO_GIT" -ne 0 ]; then
   exit 0
 fi
 
-
-echo "qtlog: pulling latest changes..."
-if ! git pull --rebase; then
-  echo "qtlog: warning: pull failed; continuing with local copy"
+if ! command -v git >/dev/null 2>&1; then
+  echo "qtlog: git not found; logged to $LOG_FILE (no git actions)"
+  exit 0
 fi
-if git check-ignore -q "$LOG_FILE" 2>/dev/null; then
+
+GIT_FILES=()
+for f in "${LOG_FILES[@]}"; do
+  git check-ignore -q "$f" 2>/dev/null || GIT_FILES+=("$f")
+done
+if [ "${#GIT_FILES[@]}" -eq 0 ]; then
   echo "qtlog: log file is gitignored ($LOG_FILE); skipping git commit/push"
   echo "qtlog: logged to $LOG_FILE"
   exit 0
 fi
 
-git add "$LOG_FILE"
-
 # --- Message finalization (brag polish) ---
 MESSAGE_FINAL="$MESSAGE"
 if [ -n "${VERSION:-}" ]; then
@@ -1681,26 +2250,35 @@ if [ -n "${VERSION:-}" ]; then
 fi
 COMMIT_MSG="[$DEVICE] $TODAY $NOW_FMT $MESSAGE_FINAL"
 
-confirm_commit || exit 0
-    git commit -m "$COMMIT_MSG" >/dev/null 2>&1 || echo "qtlog: nothing to commit (maybe duplicate message?)"
-
-echo "qtlog: pushing..."
-if ! git push; then
-  echo "qtlog: warning: push failed; local log only"
-fi
-
-echo "qtlog: logged '$COMMIT_MSG' to $LOG_FILE"
+git_lock || exit 1
+git_pull_if_moved
+GIT_T_COMMIT=0
+git_commit_logs "$COMMIT_MSG"
+case $? in
+  1)
+    git_unlock
+    echo "qtlog: nothing changed; skipping commit/push"
+    exit 0
+    ;;
+  2) echo "qtlog: nothing to commit (maybe duplicate message?)" ;;
+esac
 
-# --- Public export guard ---
-if [[ "${EXPORT_CHECK:-0}" == "1" ]]; then
-  echo "Export check: scanning for non-/public references..."
-  BAD=$(git grep -n -I -E "(^|[^A-Za-z0-9])(~\/|\/home\/|\/data\/|\/storage\/|\/sdcard\/|\/projects\/|api\.notion\.com)" -- "public/**" "README.md" 2>/dev/null || true);
-  if [[ -n "$BAD" ]]; then
-    echo "❌ Export blocked: references outside /public detected:"
-    echo "$BAD"
-    exit 1
+mkdir -p "$QTLOG_STATE_DIR" && date '+%Y-%m-%d %H%M' > "$QTLOG_PUSH_PENDING_FILE"
+if [ "$QTLOG_GIT_PUSH" = "sync" ]; then
+  if git_push_now; then
+    GIT_PUSH="${GIT_T_PUSH}ms"
+  else
+    GIT_PUSH=failed
+    echo "qtlog: warning: push failed; queued for retry (qtlog.sh --sync or --sync-start)"
+  fi
+else
+  # A live worker re-checks HEAD under this lock before it exits, so it will push this commit too.
+  GIT_PUSH=async
+  if ! git_push_worker_running; then
+    nohup bash "$QTLOG_REPO_DIR/qtlog.sh" --git-push-worker >> "$QTLOG_GIT_PUSH_LOG" 2>&1 < /dev/null 8>&- &
   fi
-  echo "✅ Export check passed: only /public content referenced."
-  exit 0
 fi
+git_unlock
+echo "qtlog: git timings: remote=${GIT_T_REMOTE}ms pull=$GIT_PULL commit=${GIT_T_COMMIT}ms (${GIT_COMMIT:-none}) push=$GIT_PUSH"
 
+echo "qtlog: logged '$COMMIT_MSG' to $LOG_FILE"
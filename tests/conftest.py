@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+from notion_fake_server import BIG_PICTURE_PAGE_ID, LOG_PAGE_ID, TODO_PAGE_ID
+
+
+@pytest.fixture
+def fake_notion_env(monkeypatch):
+    """
+    fake_notion_env(fake, **extra) -> env: fresh shared clients, pointed at a FakeNotion
+    (key "fake", no rate limit, the seeded page ids, then extra). The env is set in
+    os.environ unless setenv=False (callers that pass it down explicitly, like the daemon).
+    """
+    def use(fake, setenv: bool = True, **extra) -> dict:
+        monkeypatch.setattr(notion_api, "_clients", {})
+        env = {"NOTION_API_KEY": "fake", "QT_NOTION_API_BASE": fake.base_url, "QT_NOTION_RPS": "0",
+               "NOTION_LOG_PAGE_ID": LOG_PAGE_ID, "NOTION_TODO_PAGE_ID": TODO_PAGE_ID,
+               "QT_BIG_PICTURE_PAGE_ID": BIG_PICTURE_PAGE_ID, **{k: str(v) for k, v in extra.items()}}
+        if setenv:
+            for k, v in env.items():
+                monkeypatch.setenv(k, v)
+        return env
+    return use
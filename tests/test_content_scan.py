@@ -0,0 +1,63 @@
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import content_scan
+
+
+def _git(cwd, *a):
+    subprocess.run(["git", *a], cwd=cwd, check=True, capture_output=True)
+
+
+def _repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "public" / "screened").mkdir(parents=True)
+    _git(tmp_path, "init", "-q", str(root))
+    (root / "public" / "ok.md").write_text("plain\n")
+    (root / "public" / "screened" / "a.md").write_text("Screened-By: ops\nsee ../private\n")
+    (root / "public" / "screened" / "b.md").write_text("no header\n")
+    (root / "README.md").write_text("x\nlogs live in /home/user/qt\n")
+    _git(root, "add", ".")
+    return root
+
+
+def test_export_profiles_in_one_pass(tmp_path):
+    root = _repo(tmp_path)
+    got = {(f["rule"], f["path"], f["line"]) for f in content_scan.scan(str(root), ["export", "export-check"])}
+    assert got == {("private-path", "public/screened/a.md", 2), ("screened-by", "public/screened/b.md", 0),
+                   ("device-path", "README.md", 2)}
+
+
+def test_commit_profile_reads_staged_blobs_and_redacts(tmp_path):
+    root = _repo(tmp_path)
+    (root / "k.py").write_text('KEY = "AKIA' + "A" * 16 + '"\n')
+    (root / "id.pem").write_text("")
+    _git(root, "add", "k.py", "id.pem")
+    (root / "k.py").write_text("clean in the worktree\n")      # the staged copy is what counts
+    got = {(f["rule"], f["path"], f["text"]) for f in content_scan.scan(str(root), ["commit"])}
+    assert ("secret-content", "k.py", "[redacted]") in got and ("key-file", "id.pem", "") in got
+
+
+def test_unchanged_blobs_come_from_the_cache(tmp_path, monkeypatch):
+    root = _repo(tmp_path)
+    cache = content_scan.Cache(str(tmp_path / "scan.sqlite"))
+    first = content_scan.scan(str(root), ["export"], cache)
+    calls = []
+    monkeypatch.setattr(content_scan, "_read", lambda p: calls.append(p) or b"")
+    assert content_scan.scan(str(root), ["export"], cache) == first and calls == []
+
+    monkeypatch.undo()
+    (root / "public" / "screened" / "b.md").write_text("screened-by: ops\n")   # worktree edit: rescanned
+    assert [f["rule"] for f in content_scan.scan(str(root), ["export"], cache)] == ["private-path"]
+
+
+def test_missing_blob_is_a_reported_error(tmp_path):
+    root = _repo(tmp_path)
+    try:
+        content_scan.read_blobs(str(root), ["0" * 40])
+    except content_scan.ScanError as e:
+        assert str(e) == f"git cat-file: {'0' * 40} missing"
+    else:
+        raise AssertionError("expected ScanError")
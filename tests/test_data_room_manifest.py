@@ -0,0 +1,52 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import data_room_manifest
+from data_room_manifest import INDEX_FOOTER, Manifest
+
+
+def _tree(root):
+    (root / "docs" / "03_Technical").mkdir(parents=True)
+    (root / "docs" / "Data_Room" / "PM").mkdir(parents=True)
+    (root / "docs" / "03_Technical" / "qtlog.md").write_text("# qtlog\nsee `qtlog.sh`\n")
+    (root / "docs" / "Data_Room" / "PM" / "ARCHITECTURE.md").write_text(
+        "# Architecture (Data Room Alias)\n- Link: [ARCHITECTURE.md](../../../ARCHITECTURE.md)\n")
+    (root / "ARCHITECTURE.md").write_text("# Architecture\n")
+
+
+def test_update_rereads_only_changed_files(tmp_path):
+    root, path = tmp_path / "repo", str(tmp_path / "manifest.json")
+    _tree(root)
+    m = data_room_manifest.current(str(root), path)
+    assert len(m.changed) == 3 and m.entries["docs/03_Technical/qtlog.md"]["title"] == "qtlog"
+    assert m.references("docs/03_Technical/qtlog.md", "qtlog.sh")
+    assert m.links_to("docs/Data_Room/PM/ARCHITECTURE.md", "ARCHITECTURE.md")
+    assert m.listdir("docs") == ["03_Technical", "Data_Room"]
+
+    m = data_room_manifest.current(str(root), path)
+    assert (m.changed, m.removed) == ([], [])
+
+    doc = root / "docs" / "03_Technical" / "qtlog.md"
+    doc.write_text("# qtlog CLI\n")
+    os.utime(doc, ns=(1, 1))
+    (root / "docs" / "Data_Room" / "PM" / "ARCHITECTURE.md").unlink()
+    m = data_room_manifest.current(str(root), path)
+    assert m.changed == ["docs/03_Technical/qtlog.md"] and m.removed == ["docs/Data_Room/PM/ARCHITECTURE.md"]
+    assert m.entries["docs/03_Technical/qtlog.md"]["title"] == "qtlog CLI"
+    assert Manifest.load(str(root), path).entries == m.entries
+
+
+def test_index_keeps_hand_written_tail_and_skips_unchanged_listing(tmp_path):
+    root = tmp_path / "repo"
+    _tree(root)
+    out = root / "MASTER_INDEX.md"
+    out.write_text(f"# old\n### Last Updated: x\n---\n{INDEX_FOOTER}\n\n## Hand-written\n")
+    m = data_room_manifest.current(str(root), str(tmp_path / "manifest.json"))
+    assert data_room_manifest.write_index(m, str(out))
+    text = out.read_text()
+    assert "* [qtlog.md](./docs/03_Technical/qtlog.md)" in text and "## 01 Legal\n* *No documents uploaded yet.*" in text
+    assert text.endswith(f"{INDEX_FOOTER}\n\n## Hand-written\n")
+    assert not data_room_manifest.write_index(m, str(out)) and out.read_text() == text
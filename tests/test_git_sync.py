@@ -0,0 +1,83 @@
+import os
+import signal
+import subprocess
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _git(cwd, *a):
+    return subprocess.run(["git", *a], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _setup(tmp_path):
+    remote, work, other = tmp_path / "remote.git", tmp_path / "work", tmp_path / "other"
+    _git(tmp_path, "init", "-q", "--bare", str(remote))
+    for clone in (work, other):
+        _git(tmp_path, "clone", "-q", str(remote), str(clone))
+        _git(clone, "config", "user.email", "t@example.com")
+        _git(clone, "config", "user.name", "t")
+    _git(work, "commit", "-q", "--allow-empty", "-m", "init")
+    _git(work, "push", "-q", "origin", "HEAD")
+    for name in ("qtlog.sh", "tools", "bin"):
+        (work / name).symlink_to(ROOT / name)
+    (work / ".git" / "info" / "exclude").write_text("qtlog.sh\ntools\nbin\n")
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("NOTION_", "QT_", "QTLOG_"))}
+    env.update({"HOME": str(tmp_path / "home"), "CI": "1", "QTLOG_REPO_DIR": str(work),
+                "QTLOG_LOG_DIR": str(work / "Log"), "QTLOG_GIT_PUSH": "sync"})
+    return remote, work, other, env
+
+
+def _qt(work, env, *a, **extra):
+    p = subprocess.run(["bash", str(work / "qtlog.sh"), "--git", *a], cwd=work, env={**env, **extra},
+                       capture_output=True, text=True, timeout=60)
+    assert p.returncode == 0, p.stdout + p.stderr
+    return p.stdout
+
+
+def test_pull_only_when_upstream_moved_and_coalesce(tmp_path):
+    remote, work, other, env = _setup(tmp_path)
+    out = _qt(work, env, "first")
+    assert "pull=skipped" in out and "push=" in out
+    assert _git(remote, "log", "-1", "--format=%s").endswith("first")
+
+    _git(other, "pull", "-q")
+    (other / "x").write_text("x\n")
+    _git(other, "add", "x")
+    _git(other, "commit", "-q", "-m", "other")
+    _git(other, "push", "-q")
+    out = _qt(work, env, "second")
+    assert "pull=done" in out
+    assert _git(remote, "log", "-2", "--format=%s").splitlines()[1] == "other"
+
+    _qt(work, env, "third", QTLOG_GIT_PUSH="async", QTLOG_GIT_COALESCE="60")
+    out = _qt(work, env, "fourth", QTLOG_GIT_PUSH="async", QTLOG_GIT_COALESCE="60")
+    assert "(amend)" in out
+    body = _git(work, "log", "-1", "--format=%B")
+    assert "third" in body and "fourth" in body
+    assert _git(remote, "log", "-1", "--format=%s").endswith("second")   # held for the window
+    pid_file = tmp_path / "home" / ".local" / "state" / "qt" / "git_push.pid"
+    for _ in range(40):                                                  # stop the waiting worker
+        if pid_file.exists():
+            break
+        time.sleep(0.05)
+    if pid_file.exists():
+        os.kill(int(pid_file.read_text()), signal.SIGTERM)
+
+
+def test_compact_commits_archives_in_place_of_closed_month_files(tmp_path):
+    remote, work, other, env = _setup(tmp_path)
+    logs = work / "Log"
+    (logs / "2025-12-05").mkdir(parents=True)
+    (logs / "2025-12-05.log").write_text("[Fold7] 2025-12-05 0800 EST old\n")
+    (logs / "2025-12-05" / "0900.log").write_text("[Fold7] 0900 EST fragment\n")
+    _git(work, "add", "Log")
+    _git(work, "commit", "-q", "-m", "old logs")
+    out = _qt(work, env, "--compact")
+    assert "LOG_COMPACT=ok months=1 files=2" in out and "compact committed" in out
+    assert _git(work, "ls-files", "Log").splitlines() == ["Log/archive/2025-12.index.json", "Log/archive/2025-12.log.gz"]
+    assert _git(work, "status", "--porcelain") == ""
+    status = subprocess.run(["bash", str(work / "qtlog.sh"), "--status"], cwd=work, env=env,
+                            capture_output=True, text=True, timeout=60).stdout
+    assert "local_log_last_line=[Fold7] 0900 EST fragment" in status
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import governance_store
+
+
+def _artifacts(workflow=b"name: Emergency\n"):
+    return {"verify_cmd": b"tools/governance_verify.sh\n", "verify_out": b"[governance-verify] OK\n",
+            "protection": b'{"enforce_admins": true}\n', "emergency_workflow": workflow,
+            "bridge_workflow": b"name: Bridge\n"}
+
+
+def test_unchanged_snapshot_is_not_stored_and_blobs_are_shared(tmp_path):
+    (tmp_path / "GOVERNANCE_UNBROKEN_CHAIN_2026-01-07_2129_ET.md").write_text("# old\n")
+    store = governance_store.Store(str(tmp_path))
+    assert store.put("2026-01-08_0100_ET", "2026-01-08 0100 ET", _artifacts()) == ("2026-01-08_0100_ET", True)
+    assert store.put("2026-01-09_0100_ET", "2026-01-09 0100 ET", _artifacts()) == ("2026-01-08_0100_ET", False)
+    assert store.put("2026-01-09_0100_ET", "2026-01-09 0100 ET", _artifacts(b"name: Emergency v2\n")) == \
+        ("2026-01-09_0100_ET", True)
+
+    assert store.manifests() == ["2026-01-08_0100_ET", "2026-01-09_0100_ET"]
+    assert len(list((tmp_path / "objects").iterdir())) == 6        # 5 artifacts + the changed workflow
+    readme = (tmp_path / "README.md").read_text()
+    assert readme.index("2026-01-09_0100_ET") < readme.index("2026-01-08_0100_ET") \
+        < readme.index("GOVERNANCE_UNBROKEN_CHAIN_2026-01-07_2129_ET.md")
+
+    text = store.render()
+    assert "**Timestamp:** 2026-01-09 0100 ET" in text and "```yaml\nname: Emergency v2\n```" in text
+    assert "```text\n[governance-verify] OK\n```" in store.render("2026-01-08_0100_ET")
@@ -0,0 +1,86 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import log_format
+
+
+def test_append_writes_one_record_per_line(tmp_path):
+    f = tmp_path / "Log" / "2026-01-02.jsonl"
+    log_format.append(f, "first", device="Fold7", mode="notion", version="1.3.5",
+                      notion_block_id="blk-1", ts="2026-01-02T09:05:00-05:00")
+    log_format.append(f, "second\nwith a newline", ts="2026-01-02T09:06:00-05:00")
+    lines = f.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["notion_block_id"] == "blk-1"
+    recs = [r for _, r in log_format.iter_file(f)]
+    assert [(r["day"], r["time"], r["device"], r["message"]) for r in recs] == [
+        ("2026-01-02", "0905", "Fold7", "first"),
+        ("2026-01-02", "0906", "", "second\nwith a newline"),
+    ]
+
+
+def test_iter_records_mixes_formats_in_day_order(tmp_path):
+    logs = tmp_path / "Log"
+    logs.mkdir()
+    (logs / "2026-01-03.log").write_text("[Fold7] 2026-01-03 0800 EST later\n")
+    log_format.append(logs / "2026-01-02.jsonl", "earlier", ts="2026-01-02T10:00:00-05:00")
+    it = log_format.iter_records(logs)
+    assert next(it)["message"] == "earlier"          # a generator, not a list
+    assert [r["message"] for r in it] == ["later"]
+    assert [r["message"] for r in log_format.iter_records(logs, since="2026-01-03")] == ["later"]
+
+
+def test_migrate_converts_legacy_and_is_idempotent(tmp_path):
+    logs = tmp_path / "Log"
+    (logs / "2025-12-05").mkdir(parents=True)
+    (logs / "2025-12-05.log").write_text("[Fold7] 2025-12-05 1928 EST v1.2.0 evening\nbare follow-up\n")
+    (logs / "2025-12-05" / "1415.log").write_text("2025-12-05 1415 afternoon\n")
+    log_format.append(logs / "2025-12-05.jsonl", "native", ts="2025-12-05T21:00:00-05:00")
+
+    st = log_format.migrate(logs)
+    assert st == {"days": 1, "records": 4, "legacy_files": 2}
+    assert sorted(p.name for p in logs.iterdir()) == ["2025-12-05.jsonl"]
+    out = [json.loads(ln) for ln in (logs / "2025-12-05.jsonl").read_text().splitlines()]
+    assert [r["message"] for r in out] == ["afternoon", "evening", "bare follow-up", "native"]
+    assert out[1]["device"] == "Fold7" and out[1]["version"] == "1.2.0"
+    assert out[0]["ts"].startswith("2025-12-05T14:15:00")
+
+    before = (logs / "2025-12-05.jsonl").read_text()
+    assert log_format.migrate(logs)["records"] == 0
+    assert (logs / "2025-12-05.jsonl").read_text() == before
+
+
+def test_compact_folds_closed_months_and_readers_see_no_difference(tmp_path):
+    logs = tmp_path / "Log"
+    (logs / "2025-11-30").mkdir(parents=True)
+    (logs / "2025-11-29.log").write_text("[Fold7] 2025-11-29 0800 EST nov a\n")
+    (logs / "2025-11-30" / "0900.log").write_text("[Fold7] 0900 EST nov b\n")
+    (logs / "2025-12-01.log").write_text("[Fold7] 2025-12-01 0700 EST dec a\n")
+    log_format.append(logs / "2025-12-02.jsonl", "dec b", ts="2025-12-02T10:00:00-05:00")
+    (logs / "2026-01-02.log").write_text("[Fold7] 2026-01-02 0800 EST live\n")
+    before = [json.dumps(r, sort_keys=True) for r in log_format.iter_records(logs)]
+
+    st = log_format.compact(logs, before="2026-01")
+    assert (st["months"], st["files"]) == (2, 4)
+    assert sorted(p.relative_to(logs).as_posix() for p in logs.rglob("*") if p.is_file()) == [
+        "2026-01-02.log", "archive/2025-11.index.json", "archive/2025-11.log.gz",
+        "archive/2025-12.index.json", "archive/2025-12.log.gz"]
+    assert [json.dumps(r, sort_keys=True) for r in log_format.iter_records(logs)] == before
+
+    # A day read touches only that day's frame; the index is rebuilt from the archive if lost.
+    (logs / "archive" / "2025-12.index.json").unlink()
+    srcs = log_format.log_sources(logs, "2025-12-02", "2025-12-02")
+    assert [s.rel for s in srcs] == ["2025-12-02.jsonl"]
+    assert [r["message"] for r in log_format.iter_records(logs, "2025-12-02", "2025-12-02")] == ["dec b"]
+    assert log_format.tail(logs) == ["[Fold7] 2026-01-02 0800 EST live"]
+
+    # A late write to an archived day is merged into its frame; a leftover original is not re-added.
+    (logs / "2025-12-01.log").write_text("[Fold7] 2025-12-01 2300 EST dec late\n")
+    log_format.compact(logs, before="2026-01")
+    (logs / "2025-12-01.log").write_text("[Fold7] 2025-12-01 2300 EST dec late\n")
+    log_format.compact(logs, before="2026-01")
+    dec1 = [r["message"] for r in log_format.iter_records(logs, "2025-12-01", "2025-12-01")]
+    assert dec1 == ["dec a", "dec late"] and not (logs / "2025-12-01.log").exists()
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import log_index
+
+
+def test_parse_line_formats():
+    p = log_index.parse_line
+    assert p("[Fold7] 2025-12-06 2025-12-06 0728 Fold7 bootstrap working test") == {
+        "day": "2025-12-06", "time": "0728", "device": "Fold7", "version": "", "message": "Fold7 bootstrap working test"}
+    r = p("[Fold7] 2025-12-06 2025-12-06 1055 EST v1.2.1 install test")
+    assert (r["time"], r["version"], r["message"]) == ("1055", "1.2.1", "install test")
+    r = p("[Fold7] 1029 EST Test log entry", day="2025-12-06")
+    assert (r["day"], r["time"], r["device"]) == ("2025-12-06", "1029", "Fold7")
+    r = p("2025-12-05 1415 Test auto-push entry")
+    assert (r["day"], r["time"], r["device"], r["message"]) == ("2025-12-05", "1415", "", "Test auto-push entry")
+    r = p("sop bootstrap day", day="2026-01-02")
+    assert (r["day"], r["time"], r["message"]) == ("2026-01-02", "", "sop bootstrap day")
+    assert p("   \n") is None
+
+
+def test_block_file(tmp_path):
+    f = tmp_path / "2025-12-05" / "1727.log"
+    f.parent.mkdir()
+    f.write_text("=" * 64 + "\n[Fold7] 2025-12-05 1727 (no message provided)\n" + "-" * 64 + "\n"
+                 "User:    someone\nDevice:  Fold7\nTime:    2025-12-05 1727\n\nMessage:\nreal body\n")
+    [(line, rec)] = list(log_index.parse_file(f))
+    assert line == 1
+    assert rec == {"day": "2025-12-05", "time": "1727", "device": "Fold7", "version": "", "message": "real body"}
+
+
+def test_incremental_update_and_queries(tmp_path):
+    logs = tmp_path / "Log"
+    logs.mkdir()
+    (logs / "2025-12-05.log").write_text("[Fold7] 2025-12-05 1928 rocket test A\n")
+    (logs / "2025-12-06.log").write_text("[S24] 2025-12-06 0853 EST rocket test B\n[Fold7] 2025-12-06 0900 EST other\n")
+    idx = log_index.LogIndex(str(tmp_path / "idx.sqlite"), logs)
+    assert idx.update() == {"files": 2, "reindexed": 2, "removed": 0}
+    assert idx.update()["reindexed"] == 0
+
+    assert [r["message"] for r in idx.query("rocket")] == ["rocket test B", "rocket test A"]
+    assert [r["message"] for r in idx.query("rocket", device="fold7")] == ["rocket test A"]
+    assert [r["day"] for r in idx.query(since="2025-12-06")] == ["2025-12-06", "2025-12-06"]
+    assert [r["message"] for r in idx.query("rock*", until="2025-12-05")] == ["rocket test A"]
+
+    f = logs / "2025-12-06.log"
+    with open(f, "a") as fh:
+        fh.write("rocket follow-up\n")
+    os.utime(f, ns=(f.stat().st_atime_ns, f.stat().st_mtime_ns + 1))
+    assert idx.update() == {"files": 2, "reindexed": 1, "removed": 0}
+    assert idx.query("follow")[0]["day"] == "2025-12-06"
+    assert len(idx.query("rocket")) == 3
+
+    (logs / "2025-12-05.log").unlink()
+    assert idx.update()["removed"] == 1
+    assert [r["message"] for r in idx.query("rocket")] == ["rocket follow-up", "rocket test B"]
+    idx.close()
+
+
+def test_indexes_structured_logs(tmp_path):
+    import log_format
+    logs = tmp_path / "Log"
+    log_format.append(logs / "2026-01-02.jsonl", "structured rocket", device="Fold7",
+                      version="1.3.5", ts="2026-01-02T09:05:00-05:00")
+    idx = log_index.LogIndex(str(tmp_path / "idx.sqlite"), logs)
+    idx.update()
+    [r] = idx.query("rocket")
+    assert (r["day"], r["time"], r["device"], r["version"]) == ("2026-01-02", "0905", "Fold7", "1.3.5")
+    idx.close()
+
+
+def test_plain_words_with_punctuation_are_not_fts_syntax(tmp_path):
+    logs = tmp_path / "Log"
+    logs.mkdir()
+    (logs / "2025-12-06.log").write_text("[Fold7] 2025-12-06 0900 released v1.3.5 after sop-check\n"
+                                        "[Fold7] 2025-12-06 0910 don't call api.notion.com directly\n")
+    idx = log_index.LogIndex(str(tmp_path / "idx.sqlite"), logs)
+    idx.update()
+    for text, want in (("v1.3.5", "released"), ("sop-check", "released"), ("api.notion.com", "don't"),
+                       ("don't", "don't"), ('"sop', "released"), ("relea*", "released")):
+        assert [r["message"].split()[0] for r in idx.query(text)] == [want], text
+    assert len(idx.query("released OR directly", fts=True)) == 2
+    assert idx.query("released OR directly") == []
+    idx.close()
+    assert log_index.main(["--db", str(tmp_path / "idx.sqlite"), "--log-dir", str(logs), "query", "sop-check"]) == 0
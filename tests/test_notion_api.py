@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+
+
+class PagedClient(notion_api.NotionClient):
+    """Serves 250 children in pages of <=100 without any network."""
+
+    def __init__(self):
+        super().__init__("test-key")
+        self.calls = []
+
+    def request(self, method, path, body=None):
+        self.calls.append((method, path))
+        from urllib.parse import urlsplit, parse_qs
+        q = parse_qs(urlsplit(path).query)
+        start = int((q.get("start_cursor") or ["0"])[0])
+        size = int(q["page_size"][0])
+        end = min(start + size, 250)
+        results = [{"id": f"b{i}", "type": "toggle",
+                    "toggle": {"rich_text": [{"plain_text": f"t{i}"}]}} for i in range(start, end)]
+        more = end < 250
+        return 200, {"results": results, "has_more": more, "next_cursor": str(end) if more else None}
+
+
+def test_children_follows_next_cursor():
+    c = PagedClient()
+    kids = c.children("root")
+    assert [b["id"] for b in kids] == [f"b{i}" for i in range(250)]
+    assert len(c.calls) == 3
+
+
+def test_children_limit_is_one_request():
+    c = PagedClient()
+    assert [b["id"] for b in c.children("root", limit=1)] == ["b0"]
+    assert len(c.calls) == 1
+
+
+def test_find_toggle_sees_past_first_page():
+    c = PagedClient()
+    assert c.find_toggle("root", "t240") == "b240"
+
+
+def test_retry_after_is_honoured(monkeypatch):
+    c = notion_api.NotionClient("k", backoff=0.01)
+    answers = [(429, {"Retry-After": "2"}), (200, {})]
+    slept = []
+
+    class Resp:
+        def __init__(self, status, headers):
+            self.status, self._h = status, headers
+        def read(self):
+            return b'{"ok": true}'
+        def getheader(self, name):
+            return self._h.get(name)
+
+    class Conn:
+        def request(self, *a, **kw):
+            pass
+        def getresponse(self):
+            return Resp(*answers.pop(0))
+        def close(self):
+            pass
+
+    monkeypatch.setattr(c, "_conn", lambda fresh=False: Conn())
+    monkeypatch.setattr(notion_api.time, "sleep", slept.append)
+    status, body = c.request("GET", "blocks/x/children")
+    assert status == 200 and body == {"ok": True}
+    assert 2 <= slept[0] <= 3
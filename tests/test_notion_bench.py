@@ -0,0 +1,50 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+import notion_bench
+from notion_fake_server import FakeNotion, spec
+
+
+@pytest.fixture(scope="module")
+def bench():
+    if not shutil.which("jq"):
+        pytest.skip("qtlog.sh needs jq")
+    return {r["scenario"]: r for r in notion_bench.run()}
+
+
+@pytest.mark.parametrize("scenario", list(notion_bench.SCENARIOS))
+def test_request_count_is_pinned(bench, scenario):
+    r = bench[scenario]
+    assert r["ok"], r["output"]
+    assert r["requests"] == notion_bench.BUDGET[scenario], r["by_method"]
+
+
+@pytest.mark.parametrize("scenario", list(notion_bench.CONNECTIONS))
+def test_write_paths_use_one_connection(bench, scenario):
+    assert bench[scenario]["connections"] == notion_bench.CONNECTIONS[scenario]
+
+
+def test_fake_paginates_and_client_follows():
+    with FakeNotion() as fake:
+        fake.add_page("p", [spec("toggle", f"t{i}") for i in range(150)])
+        c = notion_api.NotionClient("k", base=fake.base_url, rate=0)
+        assert len(c.children("p")) == 150
+        assert fake.stats()["requests"] == 2
+        assert c.find_toggle("p", "t149")
+
+
+def test_client_rides_out_injected_429s():
+    with FakeNotion(rate_limit_every=2) as fake:
+        fake.add_page("p", [spec("toggle", "__TOP__")])
+        c = notion_api.NotionClient("k", base=fake.base_url, rate=0, backoff=0.01)
+        top = c.find_toggle("p", "__TOP__")
+        c.append("p", [spec("toggle", "entry")], after=top)
+        st = fake.stats()
+        assert st["throttled"] == 1 and st["by_method"] == {"GET": 1, "PATCH": 2}
+        assert [notion_api.block_title(b) for b in c.children("p")] == ["__TOP__", "entry"]
@@ -0,0 +1,54 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+import notion_bootstrap
+from notion_verify import Listings
+from notion_fake_server import LOG_PAGE_ID, TODO_PAGE_ID, FakeNotion, spec
+
+
+def test_cold_bootstrap_creates_days_then_is_read_only(fake_notion_env, capsys):
+    with FakeNotion().seed() as fake:
+        fake_notion_env(fake)
+        assert notion_bootstrap.run("2026-01-02") == 0
+        out = capsys.readouterr().out.splitlines()
+        assert "ENSURE_TODAY_TOP_NOTE=created_day_toggle_2026-01-02" in out
+        assert "ENSURE_TODAY_TOP_OK=2026-01-02" in out and "TODO_DAY_CREATED=2026-01-02" in out
+        assert "DAY_FIRST=__TOP__" in out and "TODO_SECOND=2026-01-02" in out
+        # Log output first, even though both branches ran concurrently.
+        assert out.index("ENSURE_TODAY_TOP_OK=2026-01-02") < out.index("TODO_DAY_CREATED=2026-01-02")
+
+        fake.reset()
+        assert notion_bootstrap.run("2026-01-02") == 0
+        out = capsys.readouterr().out.splitlines()
+        assert "TODO_DAY_EXISTS=2026-01-02" in out
+        assert not [l for l in out if "NOTE=" in l]
+        assert fake.stats()["by_method"] == {"GET": 6}
+
+
+def test_missing_todo_heading_fails_without_stopping_log(fake_notion_env, capsys):
+    with FakeNotion() as fake:
+        fake.add_page(LOG_PAGE_ID, [spec("heading_1", "Log")])
+        fake.add_page(TODO_PAGE_ID, [])
+        fake_notion_env(fake)
+        assert notion_bootstrap.run("2026-01-02") == 1
+        out = capsys.readouterr().out.splitlines()
+        assert "ENSURE_TODAY_TOP_OK=2026-01-02" in out and out[-1] == "TODO_ENSURE_FAIL=todo_heading_missing"
+
+
+def test_parallel_ensures_create_one_day_toggle(fake_notion_env, tmp_path):
+    with FakeNotion().seed() as fake:
+        fake_notion_env(fake, QTLOG_STATE_DIR=tmp_path)
+        client = notion_api.client_from_env()
+        # Separate Listings per writer, as in separate qtlog processes.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: notion_bootstrap.ensure_log(Listings(client), LOG_PAGE_ID, "2026-01-02"),
+                                    range(4)))
+        assert [rc for _, rc in results] == [0, 0, 0, 0]
+        assert sum("ENSURE_TODAY_TOP_NOTE=created_day_toggle_2026-01-02" in out for out, _ in results) == 1
+        h1 = fake.find(LOG_PAGE_ID, "Log")
+        assert [notion_api.block_title(fake.blocks[b]) for b in fake.kids[h1]].count("2026-01-02") == 1
+        assert len({out[-1] for out, _ in results}) == 1    # every writer resolved the same ids
@@ -0,0 +1,60 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+import notion_mirror
+import notion_verify
+from notion_fake_server import LOG_PAGE_ID, FakeNotion, spec
+
+
+def old_day(d):
+    return spec("toggle", d, [spec("toggle", "__TOP__")] + [
+        spec("toggle", f"{d} 0900 ET — entry {i}", [spec("toggle", "Log", [spec("code", "x")])]) for i in range(3)])
+
+
+def test_incremental_sync_relists_only_what_changed(fake_notion_env, monkeypatch, tmp_path, capsys):
+    now = time.time()
+    today = notion_api._today_et()
+    with FakeNotion() as fake:
+        fake.clock = lambda: now - 3 * 86400
+        fake.seed()
+        h1 = fake.kids[LOG_PAGE_ID][0]
+        fake.insert(h1, [spec("toggle", "__TOP__")] + [old_day(f"2026-01-0{i}") for i in range(5, 0, -1)])
+        fake_notion_env(fake, QT_NOTION_MIRROR=tmp_path / "mirror.json")
+
+        assert notion_mirror.sync() == 0
+        assert "MIRROR_SYNC=full" in capsys.readouterr().out
+
+        fake.reset()
+        assert notion_mirror.sync() == 0
+        assert "MIRROR_SYNC=incremental" in capsys.readouterr().out
+        assert fake.stats()["by_method"] == {"GET": 3}          # one pages/<id> per root
+
+        # Today: a new day under H1 (H1 stamped), then an entry inside it (only the day stamped).
+        fake.clock = lambda: now
+        top = fake.find(h1, "__TOP__")
+        fake.insert(h1, [spec("toggle", today, [spec("toggle", "__TOP__")])], after=top)
+        fake.reset()
+        assert notion_mirror.sync() == 0
+        assert fake.stats()["requests"] == 3 + 3                # Log page, H1, new day
+        day = fake.find(h1, today)
+        fake.insert(day, [spec("toggle", f"{today} 1000 ET — mirrored entry")], after=fake.find(day, "__TOP__"))
+        fake.reset()
+        assert notion_mirror.sync() == 0
+        assert fake.stats()["requests"] == 3 + 3                # Log page, hot H1, hot day
+        capsys.readouterr()
+
+        # The mirror replays like a snapshot, with zero requests.
+        fake.reset()
+        monkeypatch.setattr(notion_api, "_clients", {})
+        monkeypatch.setenv("QT_NOTION_SNAPSHOT", str(tmp_path / "mirror.json"))
+        assert notion_verify.run("all", today) == 0
+        out = capsys.readouterr().out
+        assert "DAY_SECOND=" + f"{today} 1000 ET — mirrored entry" in out and "TODO_TOP_CHILDREN=0" in out
+        assert fake.stats()["requests"] == 0
+
+        rows = notion_mirror.search("mirrored")
+        assert [(r["root"], r["path"]) for r in rows] == [("log", f"Log > {today}")]
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_rollover
+from notion_fake_server import LOG_PAGE_ID, TODO_PAGE_ID, FakeNotion, spec
+
+TODAY = "2026-03-05"
+
+
+def titles(fake, parent):
+    return [notion_fake_text(fake, b) for b in fake.kids[parent]]
+
+
+def notion_fake_text(fake, bid):
+    b = fake.blocks[bid]
+    return "".join(r["plain_text"] for r in b[b["type"]]["rich_text"])
+
+
+def tree(fake, parent):
+    return [(notion_fake_text(fake, b), tree(fake, b)) for b in fake.kids[parent]]
+
+
+def day(d, n=2):
+    entries = [spec("toggle", f"{d} 09{i:02d} ET — entry {i}") for i in range(n)]
+    entries.append(spec("toggle", f"{d} 0800 ET — big", [spec("toggle", "Log", [spec("code", "x" * 50)] * 3)]))
+    return spec("toggle", d, [spec("toggle", "__TOP__")] + entries)
+
+
+def test_old_days_move_into_archive_newest_at_top(fake_notion_env, tmp_path):
+    days = [f"2026-03-0{i}" for i in range(5, 0, -1)] + [f"2026-02-{i:02d}" for i in range(28, 20, -1)]
+    with FakeNotion() as fake:
+        fake.add_page(LOG_PAGE_ID, [spec("heading_1", "Log", [spec("toggle", "__TOP__")] + [day(d) for d in days])])
+        fake_notion_env(fake, QTLOG_STATE_DIR=tmp_path)
+        h1 = fake.kids[LOG_PAGE_ID][0]
+        before = {d: tree(fake, fake.find(h1, d)) for d in days}
+
+        lines, rc = notion_rollover.rollover("log", LOG_PAGE_ID, 3, 0, False, TODAY)
+        assert rc == 0, lines
+        assert "ROLLOVER_REMAINING=log:0" in lines
+        assert titles(fake, h1) == ["__TOP__", "2026-03-05", "2026-03-04", "2026-03-03", "Archive"]
+        archive = fake.find(h1, "Archive")
+        assert titles(fake, archive) == ["__TOP__", "2026"]
+        year = fake.find(archive, "2026")
+        assert titles(fake, year) == ["__TOP__", "2026-03", "2026-02"]
+        assert titles(fake, fake.find(year, "2026-03")) == ["__TOP__", "2026-03-02", "2026-03-01"]
+        feb = fake.find(year, "2026-02")
+        assert titles(fake, feb) == ["__TOP__"] + days[5:]
+        # Content, nesting and order survive the copy.
+        assert tree(fake, fake.find(feb, "2026-02-21")) == before["2026-02-21"]
+        # Every original id (day and entries) maps to its copy; the cache drop gets the day id.
+        moved = {old: (new, d) for old, new, d in
+                 (l.split("\t") for l in (tmp_path / "notion_moved.tsv").read_text().splitlines())}
+        old_day = next(l for l in lines if l.startswith("ROLLOVER_MOVED=log:2026-02-21 ")).split(" id=")[1]
+        assert moved[old_day] == (fake.find(feb, "2026-02-21"), "2026-02-21")
+        entry = fake.find(fake.find(feb, "2026-02-21"), "2026-02-21 0800 ET — big")
+        assert (entry, "2026-02-21") in moved.values()
+
+        fake.reset()
+        lines, rc = notion_rollover.rollover("log", LOG_PAGE_ID, 3, 0, False, TODAY)
+        assert rc == 0 and fake.stats()["by_method"] == {"GET": 2}
+
+
+def test_interrupted_copy_is_redone_and_uncopyable_days_stay(fake_notion_env, tmp_path):
+    with FakeNotion() as fake:
+        odd = spec("toggle", "2026-01-02", [spec("child_page", "Notes")])
+        fake.add_page(TODO_PAGE_ID, [spec("heading_2", "ToDo", [
+            spec("toggle", "__TOP__"), day("2026-03-05"), day("2026-01-03"), odd, day("2026-01-01"), day("2026-01-01")])])
+        fake_notion_env(fake, QTLOG_STATE_DIR=tmp_path)
+        heading = fake.kids[TODO_PAGE_ID][0]
+        # A copy that died half way through: a "(copying)" leftover in the month.
+        fake.insert(heading, [spec("toggle", "Archive", [spec("toggle", "__TOP__"), spec("toggle", "2026", [
+            spec("toggle", "__TOP__"), spec("toggle", "2026-01", [
+                spec("toggle", "__TOP__"), spec("toggle", "2026-01-03 (copying)", [spec("toggle", "partial")])])])])])
+
+        lines, rc = notion_rollover.rollover("todo", TODO_PAGE_ID, 1, 0, False, TODAY)
+        assert rc == 0, lines
+        assert "ROLLOVER_SKIP=todo:2026-01-02:uncopyable_child_page" in lines
+        assert "ROLLOVER_SKIP=todo:2026-01-01:duplicate_day" in lines
+        assert titles(fake, heading) == ["__TOP__", "2026-03-05", "2026-01-02", "2026-01-01", "2026-01-01", "Archive"]
+        month = fake.find(fake.find(fake.find(heading, "Archive"), "2026"), "2026-01")
+        assert titles(fake, month) == ["__TOP__", "2026-01-03"]
+        assert "partial" not in str(tree(fake, month))
@@ -0,0 +1,39 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_session
+from notion_fake_server import LOG_PAGE_ID, FakeNotion
+
+
+def replies(raw: bytes) -> list[tuple[int, bytes]]:
+    out, buf = [], io.BytesIO(raw)
+    while line := buf.readline():
+        rc, n = line.split()
+        out.append((int(rc), buf.read(int(n))))
+    return out
+
+
+def test_session_runs_every_call_on_one_connection(fake_notion_env, capsys):
+    with FakeNotion().seed() as fake:
+        fake_notion_env(fake)
+        h1 = fake.find(LOG_PAGE_ID, "Log")
+        body = {"children": [{"object": "block", "type": "toggle",
+                              "toggle": {"rich_text": [{"type": "text", "text": {"content": "Log"}}]}}]}
+        reqs = [
+            {"argv": ["notion_api", "request", "GET", f"blocks/{LOG_PAGE_ID}/children?page_size=100"]},
+            {"argv": ["notion_api", "request", "PATCH", f"blocks/{h1}/children"], "stdin": json.dumps(body)},
+            {"argv": ["notion_upload", "append", "--skip-first-line"]},   # no parent: argparse error
+            {"argv": ["nope"]},
+        ]
+        out = io.BytesIO()
+        notion_session.serve(io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in reqs)), out)
+        got = replies(out.getvalue())
+        assert [rc for rc, _ in got] == [0, 0, 2, 2]
+        assert got[0][1].decode().endswith("HTTP_CODE=200\n") and h1 in got[0][1].decode()
+        assert fake.kids[h1] and got[2][1] == b""
+        assert fake.stats()["connections"] == 1
+    assert "unknown tool: nope" in capsys.readouterr().err
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+
+TREE = {
+    "page": [{"id": "h1", "type": "heading_1", "has_children": True,
+              "heading_1": {"rich_text": [{"plain_text": "Log", "annotations": {"bold": True}}], "color": "default"}}],
+    "h1": [{"id": "top", "type": "toggle", "toggle": {"rich_text": [{"plain_text": "__TOP__"}]}},
+           {"id": "d1", "type": "toggle", "has_children": True, "toggle": {"rich_text": [{"plain_text": "2026-01-02"}]}}],
+}
+
+
+class TreeClient(notion_api.NotionClient):
+    def __init__(self):
+        super().__init__("k", rate=0)
+        self.calls = 0
+
+    def request(self, method, path, body=None):
+        self.calls += 1
+        block_id = path.split("/")[1]
+        return 200, {"results": TREE.get(block_id, []), "has_more": False}
+
+
+def test_record_then_replay_offline(tmp_path):
+    live = TreeClient()
+    live.record = {}
+    assert live.children("h1", limit=1)[0]["id"] == "top"
+    live.children("page")
+    path = str(tmp_path / "snap.json")
+    notion_api.Snapshot(live.record, day="2026-01-02", env={"NOTION_LOG_PAGE_ID": "page"}).merge_into(path)
+
+    snap = notion_api.Snapshot.load(path)
+    assert snap.day == "2026-01-02" and snap.env["NOTION_LOG_PAGE_ID"] == "page"
+    # recording keeps complete listings even when the caller asked for one child
+    assert [b["id"] for b in snap.children["h1"]] == ["top", "d1"]
+    # compact form keeps titles, drops annotations
+    assert snap.children["page"][0]["heading_1"] == {"rich_text": [{"plain_text": "Log"}], "color": "default"}
+
+    replay = notion_api.SnapshotClient(snap)
+    assert replay.find_toggle("h1", "2026-01-02") == "d1"
+    assert [b["id"] for b in replay.children("h1", limit=1)] == ["top"]
+    status, _ = replay.request("PATCH", "blocks/h1/children", {"children": []})
+    assert status == 405
+    status, _ = replay.request("GET", "blocks/unknown/children?page_size=1")
+    assert status == 404
+
+
+def test_merge_and_diff(tmp_path):
+    path = str(tmp_path / "snap.json")
+    notion_api.Snapshot({"h1": TREE["h1"]}, day="2026-01-02").merge_into(path)
+    notion_api.Snapshot({"page": TREE["page"]}, day="2026-01-02").merge_into(path)
+    old = notion_api.Snapshot.load(path)
+    assert set(old.children) == {"h1", "page"}
+
+    moved = notion_api.Snapshot(dict(old.children), day=old.day)
+    moved.children["h1"] = list(reversed(old.children["h1"])) + [
+        {"id": "d2", "type": "toggle", "toggle": {"rich_text": [{"plain_text": "2026-01-03"}]}}]
+    diff = notion_api.diff_snapshots(old, moved)
+    assert "+ h1 toggle '2026-01-03'" in diff
+    assert "~ h1 children reordered" in diff
+    assert notion_api.diff_snapshots(old, old) == []
@@ -0,0 +1,41 @@
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_todo
+from notion_api import block_title
+from notion_fake_server import TODO_PAGE_ID, FakeNotion
+
+
+def test_bulk_items_land_newest_at_top_in_100_item_patches(fake_notion_env, capsys):
+    with FakeNotion().seed() as fake:
+        fake_notion_env(fake)
+        lines = io.StringIO("\n".join(f'plan "{i}"' for i in range(149))
+                            + '\n\n{"text": "2026-01-01 0800 json item", "status_emoji": "🟩", "device": "Pad"}\n')
+        items = notion_todo.parse_items(lines, "🟦", "Fold7")
+        assert notion_todo.add(items, "2026-01-02", "2026-01-02 0930") == 0
+        assert capsys.readouterr().out.strip() == "TODO_ADDED=150 day=2026-01-02"
+        assert fake.stats()["by_method"] == {"GET": 3, "PATCH": 3}   # + the new day toggle
+
+        heading = fake.find(TODO_PAGE_ID, "ToDo")
+        day = fake.find(heading, "2026-01-02")
+        titles = [block_title(fake.blocks[b]) for b in fake.kids[day]]
+        assert titles[:3] == ["__TOP__", "2026-01-01 0800 🟩 json item [Pad]", '2026-01-02 0930 🟦 plan "148" [Fold7]']
+        assert titles[-1] == '2026-01-02 0930 🟦 plan "0" [Fold7]' and len(titles) == 151
+        entry = fake.kids[day][1]
+        assert [block_title(fake.blocks[b]) for b in fake.kids[entry]] == ["Work done", "Notes", "Next steps"]
+
+        fake.reset()
+        assert notion_todo.add(items[:2], "2026-01-02", "2026-01-02 0931") == 0
+        assert fake.stats()["by_method"] == {"GET": 3, "PATCH": 1}
+
+
+def test_bad_json_line_is_rejected_before_any_write():
+    try:
+        notion_todo.parse_items(["ok", "{not json"], "🟦", "D")
+    except notion_todo.TodoError as e:
+        assert str(e).startswith("line 2: bad JSON")
+    else:
+        raise AssertionError("expected TodoError")
@@ -0,0 +1,74 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+import notion_upload
+from notion_fake_server import FakeNotion
+
+
+class LosingFake(FakeNotion):
+    """Applies the `lose_at`-th PATCH but answers 502, like a response lost in transit."""
+
+    lose_at = 0
+
+    def _dispatch(self, method, parts, q, body):
+        status, payload = super()._dispatch(method, parts, q, body)
+        if method == "PATCH":
+            self.lose_at -= 1
+            if self.lose_at == 0:
+                return 502, {"object": "error", "status": 502}
+        return status, payload
+
+
+def _texts(fake, parent):
+    return [notion_api.block_title(fake.blocks[b]) for b in fake.kids[parent]]
+
+
+def test_chunks_cut_on_lines_and_round_trip():
+    text = "title\n" + "".join(f"line {i} é\n" for i in range(500)) + "y" * 3000 + "\ntail"
+    chunks = list(notion_upload.iter_chunks(io.StringIO(text), skip_first_line=True))
+    assert all(len(c) <= notion_upload.CHUNK_CHARS for c in chunks)
+    assert "".join(chunks) == text.split("\n", 1)[1]
+    assert all(c.endswith("\n") for c in chunks[:4])
+    batches = list(notion_upload.iter_batches(["a"] * 250))
+    assert [len(b) for b in batches] == [100, 100, 50]
+
+
+def test_resume_after_lost_response_does_not_duplicate(tmp_path):
+    text = "".join(f"{i:06d}\n" for i in range(40000))        # 280 KB -> 200 blocks -> 2 batches
+    state = str(tmp_path / "upload.json")
+    with LosingFake() as fake:
+        fake.add_page("log")
+        client = notion_api.NotionClient("k", base=fake.base_url, rate=0, max_retries=0)
+        fake.lose_at = 2
+        with pytest.raises(notion_api.NotionError):
+            notion_upload.Uploader(client, "log", state).upload(notion_upload.iter_chunks(io.StringIO(text)))
+        assert len(fake.kids["log"]) == 200 and Path(state).exists()
+
+        sent = notion_upload.Uploader(client, "log", state).upload(notion_upload.iter_chunks(io.StringIO(text)))
+        assert sent == 0 and not Path(state).exists()
+        assert "".join(_texts(fake, "log")) == text
+
+
+def test_state_of_another_source_is_not_resumed(tmp_path):
+    text = "".join(f"{i:06d}\n" for i in range(40000))
+    other = "".join(f"file {i:06d}\n" for i in range(1000))
+    state = str(tmp_path / "upload.json")
+    with LosingFake() as fake:
+        fake.add_page("log")
+        client = notion_api.NotionClient("k", base=fake.base_url, rate=0, max_retries=0)
+        fake.lose_at = 2
+        with pytest.raises(notion_api.NotionError):
+            notion_upload.Uploader(client, "log", state, source="msg").upload(notion_upload.iter_chunks(io.StringIO(text)))
+        assert Path(state).exists()
+
+        fake.lose_at = 0
+        sent = notion_upload.Uploader(client, "log", state, source="file:/tmp/build.log").upload(
+            notion_upload.iter_chunks(io.StringIO(other)))
+        assert sent == len(list(notion_upload.iter_chunks(io.StringIO(other))))
+        assert "".join(_texts(fake, "log")).endswith(other)
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import notion_api
+import notion_verify
+from notion_fake_server import LOG_PAGE_ID, TODO_PAGE_ID, FakeNotion, spec
+
+
+def test_each_parent_is_listed_once(monkeypatch):
+    with FakeNotion() as fake:
+        fake.add_page(TODO_PAGE_ID, [spec("heading_2", "ToDo", [spec("toggle", "__TOP__")])])
+        fake.add_page(LOG_PAGE_ID, [spec("heading_1", "Log", [
+            spec("toggle", "__TOP__"),
+            spec("toggle", "2026-01-02", [spec("toggle", "__TOP__"), spec("toggle", "entry")]),
+        ])])
+        monkeypatch.setenv("NOTION_API_KEY", "fake")
+        ls = notion_verify.Listings(notion_api.NotionClient("fake", base=fake.base_url, rate=0))
+        lines, rc = notion_verify.verify_log(ls, LOG_PAGE_ID, "2026-01-02")
+        assert rc == 0 and lines[1:] == ["H1_FIRST=__TOP__", "DAY_FIRST=__TOP__", "DAY_SECOND=entry"]
+        assert notion_verify.verify_log(ls, LOG_PAGE_ID, "2026-01-02")[0][1:] == lines[1:]
+        assert fake.stats()["requests"] == 3
+
+        lines, rc = notion_verify.verify_todo(ls, TODO_PAGE_ID)
+        assert rc == 0 and lines[-1] == "TODO_TOP_CHILDREN=0"
+        assert notion_verify.verify_log(ls, LOG_PAGE_ID, "2026-01-03")[0][-1] == "VERIFY_FAIL: missing day toggle"
+        assert fake.stats()["requests"] == 6
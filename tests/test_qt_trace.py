@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import qt_trace
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_spans_and_percentiles(tmp_path, monkeypatch):
+    f = tmp_path / "trace.jsonl"
+    monkeypatch.setenv("QTLOG_TRACE", "1")
+    monkeypatch.setenv("QTLOG_TRACE_FILE", str(f))
+    for run in range(10):
+        monkeypatch.setenv("QTLOG_TRACE_RUN", f"r{run}")
+        qt_trace.record("git.push", 0, float(run + 1))
+        with qt_trace.span("notion.request", method="GET") as s:
+            s["status"] = 200
+    assert qt_trace.endpoint("/blocks/0123456789abcdef0123456789abcdef/children?page_size=3") == "blocks/:id/children"
+    rows = {r["span"]: r for r in qt_trace.summary(str(f), runs=10)["spans"]}
+    assert rows["git.push"]["p50"] == 5 and rows["git.push"]["p95"] == 10
+    assert rows["notion.request"]["n"] == 10
+    assert qt_trace.summary(str(f), runs=4)["spans"][0]["n"] == 4
+
+
+def test_qtlog_run_writes_parsable_spans(tmp_path):
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("NOTION_", "QT_", "QTLOG_"))}
+    env.update({"HOME": str(tmp_path), "CI": "1", "QTLOG_LOG_DIR": str(tmp_path / "Log"),
+                "QTLOG_TRACE": "1", "QTLOG_TRACE_FILE": str(tmp_path / "t.jsonl")})
+    p = subprocess.run(["bash", str(ROOT / "qtlog.sh"), "--local", 'say "hi"'], env=env,
+                       capture_output=True, text=True, timeout=60)
+    assert p.returncode == 0, p.stderr
+    spans = [json.loads(l) for l in (tmp_path / "t.jsonl").read_text().splitlines()]
+    assert {s["span"] for s in spans} >= {"env.load", "log.append", "run"}
+    assert len({s["run"] for s in spans}) == 1
+    assert next(s for s in spans if s["span"] == "run")["op"] == "--local"
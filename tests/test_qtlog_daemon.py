@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import qtlog_daemon
+from notion_api import block_title
+from notion_bench import bench_env
+from notion_fake_server import TODO_PAGE_ID, FakeNotion
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_parse_log_argv_serves_plain_logs_only():
+    o = qtlog_daemon.parse_log_argv(["--notion", "--no-git", "--device", "Fold7", "shipped", "it"])
+    assert o == {"mode": "notion", "no_git": True, "device": "Fold7", "spool": False, "message": "shipped it"}
+    assert qtlog_daemon.parse_log_argv(["--log", "both", "--", "--not-a-flag"])["message"] == "--not-a-flag"
+    for argv in (["--query", "x"], ["--sync"], ["sop", "x"], ["--local"], []):
+        assert qtlog_daemon.parse_log_argv(argv) is None
+
+
+def test_entry_title_strips_trailing_stamp():
+    assert qtlog_daemon.entry_title("did x — 2025-12-01 0930\nbody", "1000") == "1000 ET — did x"
+
+
+def test_daemon_logs_and_queues_over_socket(tmp_path):
+    with FakeNotion().seed() as fake:
+        env = bench_env(fake.base_url, str(tmp_path))
+        env["QTLOG_DAEMON_FLUSH_DELAY"] = "60"          # keep the entry queued for the assertion
+        qt = lambda *a: subprocess.run(["bash", str(ROOT / "qtlog.sh"), *a], env=env, cwd=ROOT,
+                                       capture_output=True, text=True, timeout=60)
+        assert qt("--daemon-start").returncode == 0
+        try:
+            p = qt("--notion", "--no-git", "from the daemon")
+            assert p.returncode == 0 and "queued; daemon syncing: 1 pending" in p.stdout
+            state = tmp_path / ".local" / "state" / "qt"
+            (entry,) = [json.loads(l) for l in (state / "spool.jsonl").read_text().splitlines()]
+            assert entry["mode"] == "notion" and entry["message"] == "from the daemon"
+            assert "daemon=RUNNING" in qt("--status").stdout
+            assert "from the daemon" in qt("--query", "daemon").stdout   # not served: runs in-process
+        finally:
+            qt("--daemon-stop")
+        for _ in range(20):
+            if not (state / "qtlog.sock").exists():
+                break
+            time.sleep(0.1)
+        assert not (state / "qtlog.sock").exists()
+
+
+def test_verify_uses_request_env_without_touching_the_process(fake_notion_env, tmp_path, monkeypatch, capsys):
+    for k in ("NOTION_API_KEY", "NOTION_LOG_PAGE_ID", "NOTION_TODO_PAGE_ID", "QT_NOTION_API_BASE"):
+        monkeypatch.delenv(k, raising=False)
+    with FakeNotion(latency=0.05).seed() as fake:
+        env = fake_notion_env(fake, setenv=False, HOME=tmp_path)
+        before, stdout, seen, done = dict(os.environ), sys.stdout, [], threading.Event()
+
+        def watch():                          # what sync_loop / other connections would observe
+            while not done.is_set():
+                seen.append(("NOTION_API_KEY" in os.environ, sys.stdout is stdout))
+                time.sleep(0.005)
+
+        t = threading.Thread(target=watch)
+        t.start()
+        try:
+            resp = qtlog_daemon.Daemon(env)._verify("todo", env)
+        finally:
+            done.set()
+            t.join()
+        assert seen and all(s == (False, True) for s in seen)
+        assert dict(os.environ) == before
+        assert resp["rc"] == 0 and "TODO_FIRST=__TOP__" in resp["out"]
+        assert "VERIFY_SKIP" not in resp["out"]
+    assert capsys.readouterr().out == ""
+
+
+def test_todo_runs_in_process_on_the_warm_client(fake_notion_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(qtlog_daemon.Daemon, "run_qtlog", None)    # no qtlog.sh subprocess
+    with FakeNotion().seed() as fake:
+        env = fake_notion_env(fake, setenv=False, HOME=tmp_path, DEVICE="Fold7")
+        d = qtlog_daemon.Daemon(env)
+        for item in ("first", "second"):
+            resp = d._handle(["--todo", item], env)
+            assert resp["rc"] == 0 and resp["out"].endswith("qtlog: TODO written to Notion\n")
+        assert fake.stats()["connections"] == 1
+        day = next(b for b in fake.kids[fake.find(TODO_PAGE_ID, "ToDo")] if block_title(fake.blocks[b])[:2] == "20")
+        titles = [block_title(fake.blocks[b]) for b in fake.kids[day]]
+        assert titles[0] == "__TOP__" and titles[1].endswith("second [Fold7]") and titles[2].endswith("first [Fold7]")
+    assert list((tmp_path / ".local" / "state" / "qt").glob("notion-*.lock"))
@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from notion_fake_server import LOG_PAGE_ID, FakeNotion, spec
+
+REPO = Path(__file__).resolve().parents[1]
+
+pytestmark = pytest.mark.skipif(not shutil.which("jq"), reason="qtlog.sh needs jq")
+
+
+class LossyFake(FakeNotion):
+    """Applies the next `lose` PATCHes but answers 502, like a response lost in transit."""
+
+    lose = 0
+
+    def _dispatch(self, method, parts, q, body):
+        status, payload = super()._dispatch(method, parts, q, body)
+        if method == "PATCH" and self.lose:
+            self.lose -= 1
+            return 502, {"object": "error", "status": 502}
+        return status, payload
+
+
+@pytest.fixture
+def qtlog(tmp_path):
+    with LossyFake().seed() as fake:
+        env = {k: v for k, v in os.environ.items() if not k.startswith(("NOTION_", "QT_", "QTLOG_"))}
+        env.update(HOME=str(tmp_path), CI="1", NOTION_API_KEY="fake", NOTION_LOG_PAGE_ID=LOG_PAGE_ID,
+                   QTLOG_LOG_DIR=str(tmp_path / "Log"), QT_NOTION_API_BASE=fake.base_url, QT_NOTION_RPS="0")
+
+        def run(*args, **extra):
+            p = subprocess.run(["bash", str(REPO / "qtlog.sh"), *args], env={**env, **extra},
+                               capture_output=True, text=True, cwd=tmp_path)
+            assert p.returncode == 0, p.stdout + p.stderr
+            return p.stdout + p.stderr
+
+        run.fake = fake
+        run.state = tmp_path / ".local/state/qt"
+        yield run
+
+
+def day_titles(fake):
+    h1 = fake.find(LOG_PAGE_ID, "Log")
+    day = fake.kids[h1][-1]
+    return [fake.blocks[b]["toggle"]["rich_text"][0]["plain_text"] for b in fake.kids[day]]
+
+
+def test_lost_response_is_not_inserted_twice(qtlog):
+    qtlog("--notion", "--no-git", "first")
+    qtlog.fake.lose = 1
+    out = qtlog("--notion", "--no-git", "lost response")
+    assert "queued for retry" in out
+    queued = [json.loads(l) for l in (qtlog.state / "spool.jsonl").read_text().splitlines()]
+    assert [e["message"] for e in queued] == ["lost response"] and queued[0]["key"]
+
+    out = qtlog("--sync")
+    assert "already in Notion" in out
+    titles = day_titles(qtlog.fake)
+    assert titles[0] == "__TOP__"
+    assert sum(t.endswith("lost response") for t in titles) == 1
+    assert not (qtlog.state / "spool.jsonl").read_text()
+
+
+def test_offline_write_is_queued_then_synced(qtlog):
+    qtlog("--notion", "--no-git", "first")
+    out = qtlog("--notion", "--no-git", "offline entry", QT_NOTION_API_BASE="http://127.0.0.1:9/v1", QT_NOTION_RETRIES="0")
+    assert "queued for retry" in out
+    assert "outbox=1" in qtlog("--status")
+
+    qtlog.fake.reset()
+    qtlog("--sync")
+    assert day_titles(qtlog.fake)[1].endswith("offline entry")
+    assert qtlog.fake.stats()["by_method"] == {"GET": 1, "PATCH": 1}
+    assert "outbox=0" in qtlog("--status")
+
+
+def queue(qtlog, ts, message):
+    line = {"key": f"k-{ts}", "day": ts[:10], "ts": ts, "title": f"{ts} ET — {message}", "message": message,
+            "big": False, "log_file": "", "mode": "notion"}
+    with open(qtlog.state / "spool.jsonl", "a") as fh:
+        fh.write(json.dumps(line) + "\n")
+
+
+def test_past_days_resolve_into_the_archive_after_rollover(qtlog):
+    fake = qtlog.fake
+    h1 = fake.find(LOG_PAGE_ID, "Log")
+    fake.insert(h1, [spec("toggle", "__TOP__")] +
+                [spec("toggle", d, [spec("toggle", "__TOP__")]) for d in ("2020-01-07", "2020-01-05", "2020-01-02")])
+    qtlog.state.mkdir(parents=True)
+    queue(qtlog, "2020-01-02 0900", "before rollover")
+    qtlog("--flush")
+    old_day = fake.find(h1, "2020-01-02")
+    cache = Path(qtlog.state).parents[2] / ".cache/qt/notion_ids.tsv"
+    assert old_day in cache.read_text()
+
+    out = qtlog("--rollover", QTLOG_ROLLOVER_KEEP="2")
+    assert f"ROLLOVER_MOVED=log:2020-01-02 -> Archive/2020/2020-01 id={old_day}" in out
+    assert old_day not in cache.read_text()
+
+    queue(qtlog, "2020-01-02 1000", "after rollover")
+    queue(qtlog, "2020-01-03 0900", "missing archived day")
+    queue(qtlog, "2020-01-06 0900", "missing recent day")
+    qtlog("--flush")
+    titles = lambda parent: [fake.blocks[b]["toggle"]["rich_text"][0]["plain_text"] for b in fake.kids[parent]]
+    # No duplicate of the archived day at the top level; past days land in date order.
+    assert titles(h1) == ["__TOP__", "2020-01-07", "2020-01-06", "2020-01-05", "Archive"]
+    month = fake.find(fake.find(fake.find(h1, "Archive"), "2020"), "2020-01")
+    assert titles(month) == ["__TOP__", "2020-01-03", "2020-01-02"]
+    assert titles(fake.find(month, "2020-01-02")) == [
+        "__TOP__", "2020-01-02 1000 ET — after rollover", "2020-01-02 0900 ET — before rollover"]
@@ -0,0 +1,48 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import sop_hash
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_recorded_hash_and_manifest_are_current():
+    have, regions = sop_hash.digest((ROOT / "qtlog.sh").read_bytes())
+    assert have == (ROOT / ".sop_hash").read_text().strip()
+    assert [r["marker"] for r in regions] == [m for m, _ in sop_hash.MARKERS]
+
+
+def test_check_names_the_drifted_region_and_caches(tmp_path, monkeypatch):
+    monkeypatch.setenv("QT_SOP_HASH_CACHE", str(tmp_path / "cache.json"))
+    shutil.copy(ROOT / "qtlog.sh", tmp_path / "qtlog.sh")
+    sop_hash.write(tmp_path)
+    assert sop_hash.check(tmp_path)["ok"]
+    assert sop_hash.check(tmp_path)["cached"]
+
+    src = (tmp_path / "qtlog.sh").read_text()
+    i = src.index("### QTLOG_NOTION_LOG_RESOLVE ###")
+    j = src.index("\n}\n", i)
+    (tmp_path / "qtlog.sh").write_text(src[:j] + "\n  : drift" + src[j:])
+    r = sop_hash.check(tmp_path)
+    assert not r["ok"] and not r["cached"]
+    assert [d["marker"] for d in r["drift"]] == ["QTLOG_NOTION_LOG_RESOLVE"]
+
+    (tmp_path / "qtlog.sh").write_text(src.replace("### QTLOG_CODING_SOP ###", "### gone ###"))
+    with pytest.raises(sop_hash.SopHashError, match="QTLOG_CODING_SOP"):
+        sop_hash.check(tmp_path)
+
+
+def test_check_without_cache_write_leaves_no_file(tmp_path, monkeypatch):
+    cache = tmp_path / "cache.json"
+    monkeypatch.setenv("QT_SOP_HASH_CACHE", str(cache))
+    shutil.copy(ROOT / "qtlog.sh", tmp_path / "qtlog.sh")
+    sop_hash.write(tmp_path)
+    assert sop_hash.main(["check", "--no-cache-write", "--root", str(tmp_path)]) == 0
+    assert not cache.exists()
+    sop_hash.check(tmp_path)
+    assert sop_hash.check(tmp_path, store=False)["cached"]
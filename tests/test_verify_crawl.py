@@ -0,0 +1,68 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import verify_sop_automation as v
+
+# root -> a, b ; a -> a1, a2 ; b -> b1 ; a2 -> deep
+TREE = {
+    "root": ["a", "b"],
+    "a": ["a1", "a2"],
+    "b": ["b1"],
+    "a2": ["deep"],
+}
+
+
+def fake_children(block_id, api_key, page_size=200):
+    time.sleep(0.01)
+    return {"results": [{"id": k, "has_children": k in TREE} for k in TREE.get(block_id, [])]}
+
+
+def test_parallel_crawl_keeps_serial_bfs_order(monkeypatch):
+    monkeypatch.setattr(v, "notion_get_children", fake_children)
+    ids = [b["id"] for b in v.notion_walk_block_tree("root", "k", max_depth=8, concurrency=4)]
+    assert ids == ["a", "b", "a1", "a2", "b1", "deep"]
+
+
+def test_crawl_respects_max_depth(monkeypatch):
+    monkeypatch.setattr(v, "notion_get_children", fake_children)
+    ids = [b["id"] for b in v.notion_walk_block_tree("root", "k", max_depth=1, concurrency=2)]
+    assert ids == ["a", "b", "a1", "a2", "b1"]
+
+
+def test_crawl_runs_a_level_concurrently(monkeypatch):
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def slow_children(block_id, api_key, page_size=200):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return fake_children(block_id, api_key)
+
+    monkeypatch.setattr(v, "notion_get_children", slow_children)
+    v.notion_walk_block_tree("root", "k", max_depth=8, concurrency=3)
+    assert peak[0] >= 2
+
+
+def test_crawl_records_each_block_depth(monkeypatch):
+    monkeypatch.setattr(v, "notion_get_children", fake_children)
+    depths = {b["id"]: b["_depth"] for b in v.notion_walk_block_tree("root", "k", max_depth=8, concurrency=2)}
+    assert depths == {"a": 0, "b": 0, "a1": 1, "a2": 1, "b1": 1, "deep": 2}
+
+
+def test_drift_check_ignores_titles_below_its_depth(monkeypatch, capsys):
+    monkeypatch.setenv("NOTION_API_KEY", "k")
+    monkeypatch.setenv("QT_BIG_PICTURE_PAGE_ID", "root")
+    titles = ["QT - Canon", "QT - Log", "QT - ToDo", "QT - WBS Crosswalk", "QT - Due Diligence", "QT - Investors"]
+    blocks = [{"type": "paragraph", "paragraph": {"rich_text": [{"plain_text": t}]}, "_depth": 0} for t in titles]
+    blocks[-1]["_depth"] = v.DRIFT_DEPTH + 1
+    v.verify_notion_github_drift(blocks)
+    out = capsys.readouterr().out
+    assert "missing expected item 'QT - Investors'" in out
+    assert "'QT - Canon'" not in out
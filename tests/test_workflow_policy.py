@@ -0,0 +1,64 @@
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import workflow_policy
+
+WORKFLOWS = Path(__file__).resolve().parents[1] / ".github" / "workflows"
+
+EMERGENCY = """\
+name: Emergency Auto-Approve
+on:
+  pull_request:
+permissions:
+  pull-requests: read
+jobs:
+  approve:
+    runs-on: ubuntu-latest
+    steps:
+      - name: Gate
+        env:
+          GH_TOKEN: ${{ secrets.OTHER_TOKEN }}
+        run: |
+          echo "$title" | grep -q "EMERGENCY-MODE:"
+          gh api status --jq 'map(select(.context=="verify"))'
+"""
+
+
+def test_rules_on_parsed_workflows_and_content_cache(tmp_path):
+    wf = tmp_path / "workflows"
+    wf.mkdir()
+    for name in ("ci.yml", "qtlog-verify.yml", "verify-status-bridge.yml"):
+        shutil.copy(WORKFLOWS / name, wf / name)
+    (wf / "emergency-auto-approve.yml").write_text(EMERGENCY)
+    (wf / "broken.yml").write_text("name: x\non: push\njobs:\n  a:\n    steps: [\n")
+    cache = workflow_policy.Cache(str(tmp_path / "cache.sqlite"))
+
+    findings, stats = workflow_policy.check(str(wf), cache=cache)
+    assert {(f["file"].rsplit("/", 1)[1], f["rule"]) for f in findings} == {
+        ("broken.yml", "parse"),
+        ("emergency-auto-approve.yml", "emergency-pr-write"),
+        ("emergency-auto-approve.yml", "emergency-token"),
+        ("verify-status-bridge.yml", "workflow-run-ref"),      # no Compliance workflow here
+    }
+    assert stats == {"parsed": 5, "cached": 0, "workflows": 5}
+
+    (wf / "emergency-auto-approve.yml").write_text(EMERGENCY.replace("OTHER_TOKEN", "QT_EMERGENCY_REVIEW_TOKEN"))
+    findings, stats = workflow_policy.check(str(wf), only=["emergency-auto-approve.yml"], cache=cache)
+    assert [f["rule"] for f in findings] == ["emergency-pr-write"]
+    assert stats == {"parsed": 1, "cached": 4, "workflows": 5}
+
+
+def test_missing_emergency_workflow_is_reported(tmp_path):
+    findings, _ = workflow_policy.check(str(tmp_path))
+    assert [f["rule"] for f in findings] == ["emergency-present"]
+
+
+def test_ref_resolves_a_workflow_that_does_not_parse(tmp_path):
+    shutil.copy(WORKFLOWS / "verify-status-bridge.yml", tmp_path / "verify-status-bridge.yml")
+    shutil.copy(WORKFLOWS / "qtlog-verify.yml", tmp_path / "qtlog-verify.yml")
+    (tmp_path / "compliance.yml").write_text('name: "Compliance"\non: push\njobs:\n  verify:\n    steps: [\n')
+    findings, _ = workflow_policy.check(str(tmp_path), only=["compliance.yml", "verify-status-bridge.yml"])
+    assert [(f["file"].rsplit("/", 1)[1], f["rule"]) for f in findings] == [("compliance.yml", "parse")]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Persisted manifest of the documentation trees (docs/, docs/Data_Room and the
+root files the Data Room points at), shared by bin/generate_index.sh
+(MASTER_INDEX.md) and verify_data_room in tools/verify_sop_automation.py.
+
+One entry per file:
+    {"size": ..., "mtime_ns": ..., "sha256": ..., "title": "<first '# ' heading>", "refs": [...]}
+refs are the path-like tokens of a Markdown file (link targets, `code` paths),
+which is what the completeness and alias checks look for. An update stats the
+trees and re-reads only files whose size or mtime changed (on a thread pool);
+everything else comes from the manifest, so an update of an unchanged Data Room
+reads no file. The manifest is rewritten only when something changed.
+
+    data_room_manifest.py update                  DATA_ROOM_MANIFEST=... counts
+    data_room_manifest.py index [--out FILE]      regenerate the generated head of MASTER_INDEX.md
+Manifest: ~/.cache/qt/data_room_manifest.json (QT_DATA_ROOM_MANIFEST); one repo root per file.
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, posixpath, re, sys, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+VERSION = 1
+TREES = ("docs",)
+ROOT_FILES = ("ARCHITECTURE.md", "SECURITY.md", "CHANGELOG.md", "qtlog.sh")
+INDEX_DIRS = ("01_Legal", "02_Finance", "03_Technical", "04_Defense")
+INDEX_FOOTER = "Generated by qtlog v1.3.0 Unified CLI"
+_REF = re.compile(r"[A-Za-z0-9_./-]*[A-Za-z0-9_]\.(?:md|sh|py|yml|yaml|json|svg|pdf|txt)\b")
+_TITLE = re.compile(r"^#\s+(.+?)\s*#*\s*$", re.M)
+
+def default_path() -> str:
+    cache = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.getenv("QT_DATA_ROOM_MANIFEST") or os.path.join(cache, "qt", "data_room_manifest.json")
+
+def _describe(root: str, rel: str, st: os.stat_result) -> dict:
+    with open(os.path.join(root, rel), "rb") as fh:
+        data = fh.read()
+    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": hashlib.sha256(data).hexdigest(),
+             "title": "", "refs": []}
+    if rel.endswith(".md"):
+        text = data.decode("utf-8", "replace")
+        m = _TITLE.search(text)
+        entry["title"] = m.group(1) if m else ""
+        entry["refs"] = sorted(set(_REF.findall(text)))
+    return entry
+
+class Manifest:
+    def __init__(self, root: str, entries: dict | None = None):
+        self.root, self.entries = os.path.abspath(root), entries or {}
+        self.changed: list[str] = []
+        self.removed: list[str] = []
+
+    @classmethod
+    def load(cls, root: str, path: str | None = None) -> "Manifest":
+        try:
+            with open(path or default_path(), encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("v") != VERSION or data.get("root") != os.path.abspath(root):
+            data = {}
+        return cls(root, data.get("entries"))
+
+    def _walk(self):
+        for tree in TREES:
+            for dirpath, dirs, files in os.walk(os.path.join(self.root, tree)):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                for f in files:
+                    if not f.startswith("."):
+                        full = os.path.join(dirpath, f)
+                        yield os.path.relpath(full, self.root).replace(os.sep, "/"), full
+        for f in ROOT_FILES:
+            yield f, os.path.join(self.root, f)
+
+    def update(self, workers: int | None = None) -> "Manifest":
+        """Re-stat both trees; re-read only new or changed files. Fills changed/removed."""
+        seen, todo = {}, []
+        for rel, full in self._walk():
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            seen[rel] = st
+            old = self.entries.get(rel)
+            if not old or old["size"] != st.st_size or old["mtime_ns"] != st.st_mtime_ns:
+                todo.append(rel)
+        with ThreadPoolExecutor(max_workers=workers or min(8, len(todo) or 1)) as pool:
+            fresh = dict(zip(todo, pool.map(lambda rel: _describe(self.root, rel, seen[rel]), todo)))
+        self.changed = sorted(fresh)
+        self.removed = sorted(set(self.entries) - set(seen))
+        for rel in self.removed:
+            del self.entries[rel]
+        self.entries.update(fresh)
+        return self
+
+    def save(self, path: str | None = None):
+        path = path or default_path()
+        if not self.changed and not self.removed and os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".manifest.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"v": VERSION, "root": self.root, "entries": self.entries}, fh, sort_keys=True)
+        os.replace(tmp, path)
+
+    # -- queries -----------------------------------------------------------------
+    def exists(self, rel: str) -> bool:
+        return rel in self.entries
+
+    def listdir(self, rel: str) -> list[str]:
+        """Names directly under rel (files and subdirectories), like `ls`."""
+        prefix = rel.rstrip("/") + "/"
+        return sorted({p[len(prefix):].split("/", 1)[0] for p in self.entries if p.startswith(prefix)})
+
+    def refs(self, rel: str) -> list[str]:
+        return (self.entries.get(rel) or {}).get("refs", [])
+
+    def references(self, rel: str, target: str) -> bool:
+        """Does Markdown file rel mention target (a path or file name) in any path-like token?"""
+        return any(target in t for t in self.refs(rel))
+
+    def links_to(self, rel: str, target: str) -> bool:
+        """Does rel carry a relative path that resolves to repo path target?"""
+        base = posixpath.dirname(rel)
+        return any(posixpath.normpath(posixpath.join(base, t)) == target for t in self.refs(rel))
+
+def current(root: str = ".", path: str | None = None) -> Manifest:
+    """The up-to-date manifest of root (loaded, refreshed, saved)."""
+    m = Manifest.load(root, path).update()
+    m.save(path)
+    return m
+
+# -- MASTER_INDEX.md -----------------------------------------------------------------
+def index_body(m: Manifest) -> list[str]:
+    """The generated part of MASTER_INDEX.md below the timestamp line."""
+    out = ["---",
+           "This index serves as the official directory for the Quantum Trek Private Placement Memorandum (PPM) "
+           "and Technical Data Room.",
+           "",
+           "## 🛡️ Security & Access",
+           "* [Security Policy](./SECURITY.md) - IP Protection & Access Protocols",
+           ""]
+    for d in INDEX_DIRS:
+        out.append(f"## {d.replace('_', ' ')}")
+        names = m.listdir(f"docs/{d}")
+        out += [f"* [{n}](./docs/{d}/{n})" for n in names] or ["* *No documents uploaded yet.*"]
+        out.append("")
+    return out + ["---", INDEX_FOOTER]
+
+def write_index(m: Manifest, out: str = "MASTER_INDEX.md") -> bool:
+    """Regenerate the head of `out` (title through the footer line), keeping what follows the
+    footer; the file is left untouched when the listing did not change. True when written."""
+    try:
+        with open(out, encoding="utf-8") as fh:
+            old = fh.read().split("\n")
+    except FileNotFoundError:
+        old = []
+    tail = old[old.index(INDEX_FOOTER) + 1:] if INDEX_FOOTER in old else [""]
+    body = index_body(m)
+    if INDEX_FOOTER in old and old[2:old.index(INDEX_FOOTER) + 1] == body:
+        return False
+    try:
+        from zoneinfo import ZoneInfo
+        now = datetime.now(ZoneInfo("America/New_York"))
+    except Exception:
+        now = datetime.now()
+    head = ["# 🚀 Quantum Trek Master Index", f"### Last Updated: {now.strftime('%Y-%m-%d %H:%M:%S')} ET"]
+    with open(out, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(head + body + tail))
+    return True
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="data_room_manifest.py", description="Manifest of docs/ and docs/Data_Room")
+    ap.add_argument("--root", default=".", help="repo root (default: current directory)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("update", help="refresh the manifest (re-reads changed files only)")
+    ix = sub.add_parser("index", help="regenerate MASTER_INDEX.md from the manifest")
+    ix.add_argument("--out", default="MASTER_INDEX.md")
+    a = ap.parse_args(argv)
+    m = current(a.root)
+    if a.cmd == "update":
+        print(f"DATA_ROOM_MANIFEST=ok entries={len(m.entries)} changed={len(m.changed)} "
+              f"removed={len(m.removed)} file={default_path()}")
+        return 0
+    wrote = write_index(m, os.path.join(a.root, a.out))
+    print(f"DATA_ROOM_INDEX={'written' if wrote else 'unchanged'} file={a.out} changed={len(m.changed)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store behind tools/governance_snapshot.sh
+(docs/Governance/Snapshots).
+
+Every artifact of a snapshot (the verify command and its output, branch
+protection, the emergency and bridge workflows) is kept once, under its sha256:
+    objects/<sha256>
+and each snapshot is a small manifest naming those blobs:
+    manifests/<YYYY-MM-DD_HHMM_ET>.json   {"v": 1, "ts": ..., "timestamp": ..., "artifacts": {name: sha256}}
+A snapshot whose artifacts all hash like the newest manifest's is not stored
+(SNAPSHOT_UNCHANGED), so nothing is written or committed when governance did
+not change. The Markdown view (same layout as the earlier
+GOVERNANCE_UNBROKEN_CHAIN_*.md files) is rendered from a manifest on demand;
+README.md lists the manifests newest first, then the earlier full snapshots.
+
+    governance_store.py put --ts TS --timestamp "YYYY-MM-DD HHMM ET" NAME=FILE ...
+    governance_store.py render [TS|latest] [--out FILE]
+    governance_store.py list
+"""
+from __future__ import annotations
+import argparse, glob, hashlib, json, os, re, sys, tempfile
+
+VERSION = 1
+STORE_DIR = "docs/Governance/Snapshots"
+_STAMP = re.compile(r"\d{4}-\d{2}-\d{2}_\d{4}")
+ARTIFACTS = ("verify_cmd", "verify_out", "protection", "emergency_workflow", "bridge_workflow")
+INDEX_HEAD = """# Governance Snapshots (Timestamped History)
+
+Newest first. Each snapshot captures:
+- one-command governance verification output
+- branch protection state
+- emergency workflow(s) verbatim
+
+Snapshots are manifests of content-addressed blobs (`objects/`); a snapshot is
+stored only when something changed. Render one as Markdown with
+`python3 tools/governance_store.py render <snapshot>` (`latest` for the newest).
+
+---
+"""
+
+class StoreError(Exception):
+    pass
+
+def _write(path: str, data: bytes):
+    """Atomic create/replace."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp.")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+class Store:
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+
+    def _obj(self, sha: str) -> str:
+        return os.path.join(self.root, "objects", sha)
+
+    def put_blob(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self._obj(sha)):
+            _write(self._obj(sha), data)
+        return sha
+
+    def blob(self, sha: str) -> bytes:
+        try:
+            with open(self._obj(sha), "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            raise StoreError(f"missing blob {sha}")
+        if hashlib.sha256(data).hexdigest() != sha:
+            raise StoreError(f"corrupt blob {sha}")
+        return data
+
+    def manifests(self) -> list[str]:
+        """Snapshot names, oldest first (the names sort by time)."""
+        return sorted(os.path.basename(p)[:-5] for p in glob.glob(os.path.join(self.root, "manifests", "*.json")))
+
+    def manifest(self, name: str = "latest") -> dict:
+        names = self.manifests()
+        if name == "latest":
+            if not names:
+                raise StoreError("no snapshots")
+            name = names[-1]
+        try:
+            with open(os.path.join(self.root, "manifests", name + ".json"), encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            raise StoreError(f"no snapshot {name}")
+
+    def put(self, ts: str, timestamp: str, artifacts: dict[str, bytes]) -> tuple[str, bool]:
+        """(snapshot name, stored?). Not stored when every artifact matches the newest snapshot."""
+        shas = {k: hashlib.sha256(v).hexdigest() for k, v in artifacts.items()}
+        names = self.manifests()
+        if names and self.manifest(names[-1]).get("artifacts") == shas:
+            return names[-1], False
+        for data in artifacts.values():
+            self.put_blob(data)
+        name, n = ts, 1
+        while name in names:
+            n += 1
+            name = f"{ts}_{n}"
+        doc = {"v": VERSION, "ts": name, "timestamp": timestamp, "artifacts": shas}
+        _write(os.path.join(self.root, "manifests", name + ".json"),
+               (json.dumps(doc, indent=2, sort_keys=True) + "\n").encode())
+        self.write_index()
+        return name, True
+
+    def write_index(self):
+        """README.md from the manifest names and the earlier full-Markdown snapshots (no file is read)."""
+        lines = [INDEX_HEAD]
+        for name in reversed(self.manifests()):
+            lines.append(f"- [{name}](./manifests/{name}.json) — {name.replace('_ET', ' ET').replace('_', ' ')}")
+        legacy = sorted((os.path.basename(p) for p in glob.glob(os.path.join(self.root, "GOVERNANCE_*.md"))),
+                        key=lambda n: (_STAMP.findall(n) or [""])[-1], reverse=True)
+        if legacy:
+            lines += ["", "## Earlier snapshots (full Markdown)", ""]
+            lines += [f"- [{n}](./{n})" for n in legacy]
+        _write(os.path.join(self.root, "README.md"), ("\n".join(lines) + "\n").encode())
+
+    def render(self, name: str = "latest") -> str:
+        m = self.manifest(name)
+        a = {k: self.blob(sha).decode("utf-8", "replace").rstrip("\n") for k, sha in m["artifacts"].items()}
+        return f"""# Governance — Unbroken Chain Snapshot
+
+**Timestamp:** {m['timestamp']}
+
+This document is a timestamped snapshot of governance state and continuity mechanisms.
+
+---
+
+## One-command governance verification (canonical)
+
+```bash
+{a.get('verify_cmd', '')}
+```
+
+### tools/governance_verify.sh output
+
+```text
+{a.get('verify_out', '')}
+```
+
+### Branch protection (main)
+
+```json
+{a.get('protection', '')}
+```
+
+---
+
+## Emergency auto-approve workflow (verbatim)
+
+```yaml
+{a.get('emergency_workflow', '')}
+```
+
+---
+
+## Verify status bridge workflow (verbatim)
+
+```yaml
+{a.get('bridge_workflow', '')}
+```
+
+---
+
+## Invariants (DO NOT BREAK)
+
+- Branch protection always ON (including enforce_admins)
+- Linear history required (no merge commits)
+- Required status context must match CI’s actual context string (currently: `verify`)
+- Required approvals = 1 (satisfied only via emergency bot token; NOT `github.token` approvals)
+- Emergency actions must be explicit + auditable (EMERGENCY-MODE marker + same-repo + allowed branch prefix)
+"""
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="governance_store.py", description="Content-addressed governance snapshots")
+    ap.add_argument("--dir", default=STORE_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("put", help="store a snapshot unless it matches the newest one")
+    p.add_argument("--ts", required=True, help="snapshot name, e.g. 2026-01-07_2129_ET")
+    p.add_argument("--timestamp", required=True, help='human timestamp, e.g. "2026-01-07 2129 ET"')
+    p.add_argument("artifacts", nargs="+", metavar="NAME=FILE")
+    r = sub.add_parser("render", help="Markdown view of a snapshot")
+    r.add_argument("name", nargs="?", default="latest")
+    r.add_argument("--out")
+    sub.add_parser("list", help="snapshot names, newest first")
+    a = ap.parse_args(argv)
+    store = Store(a.dir)
+    try:
+        if a.cmd == "put":
+            artifacts = {}
+            for spec in a.artifacts:
+                name, _, path = spec.partition("=")
+                if name not in ARTIFACTS or not path:
+                    ap.error(f"artifact must be one of {', '.join(ARTIFACTS)} as NAME=FILE: {spec}")
+                with open(path, "rb") as fh:
+                    artifacts[name] = fh.read()
+            name, stored = store.put(a.ts, a.timestamp, artifacts)
+            print(f"SNAPSHOT_STORED={name}" if stored else f"SNAPSHOT_UNCHANGED={name}")
+            return 0
+        if a.cmd == "render":
+            text = store.render(a.name)
+            if a.out:
+                _write(os.path.abspath(a.out), text.encode("utf-8"))
+            else:
+                sys.stdout.write(text)
+            return 0
+        for name in reversed(store.manifests()):
+            print(name)
+        return 0
+    except StoreError as e:
+        print(f"governance_store: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -3,8 +3,9 @@ set -euo pipefail
 
 echo "[governance-verify] Running one-command governance verification..."
 
-# 1) Emergency workflow should exist and be parseable (warn-only validator emits ::warning)
-python tools/check_emergency_workflow.py || true
+# 1) Every workflow against tools/workflow_policy.py rules, emergency auto-approve included
+#    (warn-only validator emits ::warning)
+python tools/workflow_policy.py || true
 
 # 2) Ensure governance doc exists
 test -f docs/GOVERNANCE_EMERGENCY_MODE.md || { echo "ERROR: docs/GOVERNANCE_EMERGENCY_MODE.md missing"; exit 1; }
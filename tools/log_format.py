@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Local log formats: the legacy free-text lines and the structured JSONL format.
+
+Structured (QTLOG_LOG_FORMAT=jsonl): Log/YYYY-MM-DD.jsonl, one object per line:
+    {"v": 1, "ts": "2026-01-02T09:05:00-05:00", "device": "Fold7", "mode": "both",
+     "version": "1.3.5", "notion_block_id": "…" | null, "message": "…"}
+written by `append` with one O_APPEND write under an flock on the file, so
+concurrent writers (qtlog.sh, the daemon) never interleave partial lines.
+
+Legacy text (Log/YYYY-MM-DD.log, Log/YYYY-MM-DD/HHMM.log), every format seen so far:
+    [Fold7] 2025-12-06 2025-12-06 0728 msg      (doubled date)
+    [Fold7] 2025-12-06 0853 EST msg
+    [Fold7] 1029 EST msg                        (date from the file name)
+    2025-12-05 1415 msg                         (no device)
+    ====... / Device: / Time: / Message: blocks (early per-entry files)
+    msg                                         (bare message)
+A leading "vX.Y.Z" in the message is taken as the qtlog version.
+
+Monthly archives (`compact`): closed months fold into Log/archive/YYYY-MM.log.gz,
+one gzip member per original file (bytes unchanged), so each file's frame
+decompresses on its own and `zcat` still reads the whole month. The offset index
+Log/archive/YYYY-MM.index.json lists every frame:
+    {"v": 1, "month": "2025-12", "frames": [{"rel": "2025-12-05/0900.log", "day": "2025-12-05",
+      "offset": 0, "length": 311, "size": 904, "sha256": "…", "parts": ["<sha256 of each source>"]}]}
+Readers see an archived file exactly like the live one it replaced; a day or
+range read inflates only the frames of those days.
+
+Readers are generators (constant memory however large the log set):
+    iter_file(path)                   -> (line_no, record)
+    iter_source(path | Frame)         -> (line_no, record), live file or archived frame
+    log_sources(log_dir, since, until) -> live files and frames, oldest day first
+    iter_records(log_dir, since, until) -> record, oldest day first
+
+    log_format.py append  --file F [--device D] [--mode M] [--version V] [--notion-id ID] -- MESSAGE
+    log_format.py cat     [--log-dir D] [--since D] [--until D]     (records as JSONL on stdout)
+    log_format.py tail    [--log-dir D] [-n N]                      (last N lines of the newest day, raw)
+    log_format.py migrate [--log-dir D] [--keep-legacy] [--dry-run] (legacy text -> <day>.jsonl)
+    log_format.py compact [--log-dir D] [--before YYYY-MM] [--dry-run] (months before the current ET month)
+"""
+from __future__ import annotations
+import argparse, fcntl, gzip, hashlib, io, json, os, re, struct, sys, tempfile, zlib
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+REPO = Path(__file__).resolve().parents[1]
+FORMAT_VERSION = 1
+TZ_NAME = "America/Toronto"
+
+DAY_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+LINE_RE = re.compile(
+    r"^(?:\[(?P<device>[^\]]+)\]\s+)?"
+    r"(?:(?P<day>\d{4}-\d{2}-\d{2})\s+)?"
+    r"(?:\d{4}-\d{2}-\d{2}\s+)?"                 # doubled date ("$TODAY $NOW_FMT" with a dated format)
+    r"(?:(?P<time>\d{4})(?:\d{2})?\s+(?:[A-Z]{2,4}\s+)?)?"
+    r"(?P<message>.*)$"
+)
+VERSION_RE = re.compile(r"^v(\d+\.\d+\.\d+)\b\s*")
+BLOCK_RULE = re.compile(r"^={8,}\s*$")
+ARCHIVE_DIR = "archive"
+ARCHIVE_VERSION = 1
+MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+def _tz():
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(TZ_NAME)
+    except Exception:
+        return None
+
+def file_day(path: Path) -> str:
+    """YYYY-MM-DD from Log/<day>.log(.jsonl) or Log/<day>/<HHMM>.log ('' when neither has one)."""
+    for part in (path.stem, path.parent.name):
+        m = DAY_RE.fullmatch(part)
+        if m:
+            return m.group(1)
+    return ""
+
+# -- legacy text ---------------------------------------------------------------
+def parse_line(line: str, day: str = "") -> dict | None:
+    """One text log line -> {day, time, device, version, message}, or None for blank lines."""
+    text = line.rstrip("\n").strip()
+    if not text:
+        return None
+    m = LINE_RE.match(text)
+    device, d, t, msg = m.group("device"), m.group("day"), m.group("time"), m.group("message")
+    if d is None and t is None and device is None:
+        msg = text                                  # bare message: no framing at all
+    version = ""
+    v = VERSION_RE.match(msg)
+    if v:
+        version, msg = v.group(1), msg[v.end():]
+    return {"day": d or day, "time": t or "", "device": device or "", "version": version, "message": msg.strip()}
+
+def _parse_block(lines: list[str], day: str) -> dict | None:
+    fields, message, in_msg = {}, [], False
+    for ln in lines:
+        if in_msg:
+            message.append(ln)
+            continue
+        if ln.strip() == "Message:":
+            in_msg = True
+            continue
+        k, sep, v = ln.partition(":")
+        if sep and k.strip() and " " not in k.strip():
+            fields[k.strip().lower()] = v.strip()
+    head = next((parse_line(ln, day) for ln in lines if ln.strip() and not ln.startswith("-")), None)
+    rec = head or {"day": day, "time": "", "device": "", "version": "", "message": ""}
+    stamp = fields.get("time", "").split()
+    if len(stamp) == 2 and DAY_RE.fullmatch(stamp[0]):
+        rec["day"], rec["time"] = stamp[0], stamp[1][:4]
+    rec["device"] = fields.get("device") or rec["device"]
+    body = "\n".join(message).strip()
+    if body:
+        rec["message"] = body
+    return rec
+
+# -- structured ----------------------------------------------------------------
+def parse_json_line(line: str, day: str = "") -> dict | None:
+    """One JSONL line -> record with day/time derived from ts; None if it is not a JSON object."""
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+    ts = obj.get("ts") or ""
+    obj.setdefault("day", ts[:10] if DAY_RE.match(ts) else day)
+    obj.setdefault("time", ts[11:13] + ts[14:16] if len(ts) >= 16 else "")
+    for k in ("device", "version", "mode", "message"):
+        obj[k] = obj.get(k) or ""
+    return obj
+
+def to_record(r: dict, mode: str = "") -> dict:
+    """Legacy {day, time, ...} -> structured record (ts in ET when the time is known)."""
+    ts = None
+    if r["day"] and r["time"]:
+        try:
+            dt = datetime.strptime(f"{r['day']} {r['time']}", "%Y-%m-%d %H%M")
+            tz = _tz()
+            ts = (dt.replace(tzinfo=tz) if tz else dt).isoformat()
+        except ValueError:
+            ts = None
+    out = {"v": FORMAT_VERSION, "ts": ts, "device": r["device"] or None, "mode": mode or None,
+           "version": r["version"] or None, "notion_block_id": None, "message": r["message"]}
+    if ts is None:
+        out["day"] = r["day"]
+    return out
+
+# -- readers -------------------------------------------------------------------
+def _iter_lines(lines, day: str, structured: bool):
+    block: list[str] | None = None
+    block_start = 0
+    for n, line in enumerate(lines, 1):
+        if structured or line.startswith("{"):
+            rec = parse_json_line(line, day)
+            if rec is not None:
+                yield n, rec
+                continue
+        if BLOCK_RULE.match(line):
+            if block is not None:
+                rec = _parse_block(block, day)
+                if rec:
+                    yield block_start, rec
+            block, block_start = [], n
+            continue
+        if block is not None:
+            block.append(line.rstrip("\n"))
+            continue
+        rec = parse_line(line, day)
+        if rec:
+            yield n, rec
+    if block is not None:
+        rec = _parse_block(block, day)
+        if rec:
+            yield block_start, rec
+
+def iter_file(path: Path):
+    """Yield (line_no, record) for every entry in one log file, either format (streaming)."""
+    path = Path(path)
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        yield from _iter_lines(fh, file_day(path), path.suffix == ".jsonl")
+
+# -- archives ------------------------------------------------------------------
+class Frame(NamedTuple):
+    """One original log file inside a monthly archive."""
+    archive: Path
+    rel: str
+    day: str
+    offset: int
+    length: int
+    size: int
+    sha256: str
+    parts: tuple
+
+def archive_paths(log_dir: Path, month: str) -> tuple[Path, Path]:
+    """(archive, index) for YYYY-MM."""
+    d = Path(log_dir) / ARCHIVE_DIR
+    return d / f"{month}.log.gz", d / f"{month}.index.json"
+
+def archive_months(log_dir: Path) -> list[str]:
+    d = Path(log_dir) / ARCHIVE_DIR
+    if not d.is_dir():
+        return []
+    return sorted(p.name[:7] for p in d.glob("*.log.gz") if MONTH_RE.match(p.name[:7]))
+
+def _member(rel: str, data: bytes) -> bytes:
+    """One gzip member carrying `rel` in its FNAME field (mtime 0: same input, same bytes)."""
+    c = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return (b"\x1f\x8b\x08\x08" + struct.pack("<I", 0) + b"\x02\xff" + rel.encode("utf-8") + b"\0"
+            + c.compress(data) + c.flush() + struct.pack("<II", zlib.crc32(data), len(data) & 0xFFFFFFFF))
+
+def _scan(archive: Path) -> list[dict]:
+    """Rebuild the frame list from the archive itself (every member names its file)."""
+    buf, pos, frames = Path(archive).read_bytes(), 0, []
+    while pos < len(buf):
+        if buf[pos:pos + 3] != b"\x1f\x8b\x08":
+            raise ValueError(f"{archive}: not a gzip member at {pos}")
+        flags, head, rel = buf[pos + 3], pos + 10, ""
+        if flags & 0x04:
+            head += 2 + struct.unpack("<H", buf[head:head + 2])[0]
+        if flags & 0x08:
+            end = buf.index(b"\0", head)
+            rel, head = buf[head:end].decode("utf-8", errors="replace"), end + 1
+        if flags & 0x10:
+            head = buf.index(b"\0", head) + 1
+        if flags & 0x02:
+            head += 2
+        d = zlib.decompressobj(-zlib.MAX_WBITS)
+        data = d.decompress(buf[head:])
+        end = len(buf) - len(d.unused_data) + 8
+        h = hashlib.sha256(data).hexdigest()
+        frames.append({"rel": rel, "day": file_day(Path(rel)), "offset": pos, "length": end - pos,
+                       "size": len(data), "sha256": h, "parts": [h]})
+        pos = end
+    return frames
+
+def _write_index(index: Path, month: str, archive_size: int, frames: list[dict]):
+    fd, tmp = tempfile.mkstemp(dir=index.parent, prefix=f".{month}.", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump({"v": ARCHIVE_VERSION, "month": month, "archive_size": archive_size, "frames": frames},
+                  fh, ensure_ascii=False, indent=0)
+        fh.write("\n")
+    os.replace(tmp, index)
+
+def archive_frames(log_dir: Path, month: str) -> list[Frame]:
+    """The month's frames from its index (rebuilt from the archive when missing or out of step)."""
+    archive, index = archive_paths(log_dir, month)
+    try:
+        size = archive.stat().st_size
+    except OSError:
+        return []
+    try:
+        with open(index, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("archive_size") != size:
+            raise ValueError("stale index")
+        frames = meta.get("frames") or []
+    except (OSError, ValueError):
+        frames = _scan(archive)     # readers never write; the next compact rewrites the index
+    return [Frame(archive, f["rel"], f["day"], f["offset"], f["length"], f["size"], f["sha256"],
+                  tuple(f.get("parts") or ())) for f in frames]
+
+def read_frame(frame: Frame) -> bytes:
+    """The original file's bytes (one seek + one gzip member)."""
+    with open(frame.archive, "rb") as fh:
+        fh.seek(frame.offset)
+        return gzip.decompress(fh.read(frame.length))
+
+def iter_source(src: Path | Frame):
+    """(line_no, record) for a live file or an archived frame, parsed the same way."""
+    if isinstance(src, Frame):
+        text = read_frame(src).decode("utf-8", errors="replace")
+        yield from _iter_lines(io.StringIO(text), src.day, src.rel.endswith(".jsonl"))
+    else:
+        yield from iter_file(src)
+
+def source_text(src: Path | Frame) -> str:
+    data = read_frame(src) if isinstance(src, Frame) else Path(src).read_bytes()
+    return data.decode("utf-8", errors="replace")
+
+def _rel_key(day: str, rel: str) -> tuple:
+    return (day, len(Path(rel).parts), Path(rel).name)
+
+def log_files(log_dir: Path):
+    """Every live log file under log_dir, oldest day first (day file before that day's per-entry files)."""
+    files = [p for p in Path(log_dir).rglob("*") if p.suffix in (".log", ".jsonl") and p.is_file()]
+    return sorted(files, key=lambda p: _rel_key(file_day(p), str(p.relative_to(log_dir))))
+
+def log_sources(log_dir: Path, since: str | None = None, until: str | None = None) -> list:
+    """Live files and archived frames with a day in [since, until], oldest first, archive before live."""
+    log_dir = Path(log_dir)
+    out = []
+    for month in archive_months(log_dir):
+        if (since and month < since[:7]) or (until and month > until[:7]):
+            continue
+        out += [(_rel_key(f.day, f.rel), 0, f) for f in archive_frames(log_dir, month)]
+    out += [(_rel_key(file_day(p), str(p.relative_to(log_dir))), 1, p) for p in log_files(log_dir)]
+    out = [t for t in out if not t[0][0] or not ((since and t[0][0] < since) or (until and t[0][0] > until))]
+    return [src for _, _, src in sorted(out, key=lambda t: (t[0], t[1]))]
+
+def iter_records(log_dir: str | Path | None = None, since: str | None = None, until: str | None = None):
+    """Every entry under log_dir (live and archived) as a dict with day/time/device/version/mode/message."""
+    log_dir = Path(log_dir or os.getenv("QTLOG_LOG_DIR") or REPO / "Log")
+    for src in log_sources(log_dir, since, until):
+        for _, rec in iter_source(src):
+            yield rec
+
+def tail(log_dir: str | Path, n: int = 1) -> list[str]:
+    """Last n non-empty lines of the newest day's sources, live or archived."""
+    srcs = log_sources(Path(log_dir))
+    if not srcs:
+        return []
+    key = lambda s: s.day if isinstance(s, Frame) else file_day(s)
+    newest = key(srcs[-1])
+    lines = [ln for s in srcs if key(s) == newest for ln in source_text(s).splitlines() if ln.strip()]
+    return lines[-n:] if n > 0 else lines
+
+# -- writer --------------------------------------------------------------------
+def append(path: str | Path, message: str, device: str = "", mode: str = "", version: str = "",
+           notion_block_id: str = "", ts: str | None = None) -> dict:
+    """Append one structured record with a single O_APPEND write."""
+    rec = {"v": FORMAT_VERSION, "ts": ts or datetime.now().astimezone().isoformat(timespec="seconds"),
+           "device": device or None, "mode": mode or None, "version": version or None,
+           "notion_block_id": notion_block_id or None, "message": message}
+    append_line(path, json.dumps(rec, ensure_ascii=False))
+    return rec
+
+def append_line(path: str | Path, line: str):
+    """One line, one O_APPEND write, under an flock on the file (the same lock qtlog.sh's text appends take)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        data = (line + "\n").encode("utf-8")
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+# -- migrator ------------------------------------------------------------------
+def migrate(log_dir: str | Path, keep_legacy: bool = False, dry_run: bool = False) -> dict:
+    """
+    Convert every legacy text file into Log/<day>.jsonl. Records already in a
+    day's .jsonl are kept after the converted ones (deduplicated), so re-running
+    is safe. Converted text files are removed unless keep_legacy.
+    """
+    log_dir = Path(log_dir)
+    by_day: dict[str, list[Path]] = {}
+    for p in log_files(log_dir):
+        if p.suffix == ".log" and file_day(p):
+            by_day.setdefault(file_day(p), []).append(p)
+    stats = {"days": 0, "records": 0, "legacy_files": 0}
+    for day, sources in sorted(by_day.items()):
+        out = log_dir / f"{day}.jsonl"
+        records, seen, order = [], set(), []
+        for src in sources:
+            last = ""                                  # untimed lines keep the time above them
+            for _, r in iter_file(src):
+                last = r.get("time") or last
+                rec = r if "v" in r else to_record(r)
+                key = (rec.get("ts") or rec.get("day"), rec["message"])
+                if key not in seen:
+                    seen.add(key)
+                    order.append((last, len(order), rec))
+        records = [rec for _, _, rec in sorted(order, key=lambda t: t[:2])]
+        if out.exists():
+            for _, rec in iter_file(out):
+                rec = {k: v for k, v in rec.items() if k not in ("time",) and not (k == "day" and rec.get("ts"))}
+                key = (rec.get("ts") or rec.get("day"), rec["message"])
+                if key not in seen:
+                    seen.add(key)
+                    records.append(rec)
+        stats["days"] += 1
+        stats["records"] += len(records)
+        stats["legacy_files"] += len(sources)
+        if dry_run:
+            continue
+        fd, tmp = tempfile.mkstemp(dir=log_dir, prefix=f".{day}.", suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for rec in records:
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        os.replace(tmp, out)
+        if not keep_legacy:
+            for src in sources:
+                src.unlink()
+                if src.parent != log_dir and not any(src.parent.iterdir()):
+                    src.parent.rmdir()
+    return stats
+
+# -- compaction ----------------------------------------------------------------
+def _month_et() -> str:
+    tz = _tz()
+    return (datetime.now(tz) if tz else datetime.now()).strftime("%Y-%m")
+
+def compact(log_dir: str | Path, before: str | None = None, dry_run: bool = False) -> dict:
+    """
+    Fold the live files of every month before `before` (default: the current ET
+    month) into Log/archive/YYYY-MM.log.gz. A month that already has an archive
+    gets the new files merged in (a file at an archived path is appended to its
+    frame). The archive is written to a temp file, renamed over the old one and
+    read back frame by frame before any original is removed. A file whose bytes
+    are already in its frame (a run that died before removing it) is only removed.
+    """
+    log_dir = Path(log_dir)
+    before = before or _month_et()
+    by_month: dict[str, list[Path]] = {}
+    for p in log_files(log_dir):
+        d = file_day(p)
+        if d and d[:7] < before and p.relative_to(log_dir).parts[0] != ARCHIVE_DIR:
+            by_month.setdefault(d[:7], []).append(p)
+    stats = {"months": 0, "files": 0, "bytes_in": 0, "bytes_out": 0}
+    for month, files in sorted(by_month.items()):
+        archive, index = archive_paths(log_dir, month)
+        old = {f.rel: f for f in archive_frames(log_dir, month)}
+        entries = {}
+        if old:
+            with open(archive, "rb") as fh:
+                for f in old.values():
+                    fh.seek(f.offset)
+                    entries[f.rel] = {"day": f.day, "member": fh.read(f.length), "size": f.size,
+                                      "sha256": f.sha256, "parts": list(f.parts)}
+        for p in files:
+            rel, data = p.relative_to(log_dir).as_posix(), p.read_bytes()
+            h = hashlib.sha256(data).hexdigest()
+            stats["bytes_in"] += len(data)
+            e = entries.get(rel)
+            if e and h in e["parts"]:
+                continue
+            if e:
+                data = read_frame(old[rel]) + data
+            entries[rel] = {"day": file_day(p), "member": _member(rel, data), "size": len(data),
+                            "sha256": hashlib.sha256(data).hexdigest(), "parts": (e["parts"] if e else []) + [h]}
+        stats["months"] += 1
+        stats["files"] += len(files)
+        frames, offset = [], 0
+        for rel in sorted(entries, key=lambda r: _rel_key(entries[r]["day"], r)):
+            e = entries[rel]
+            frames.append({"rel": rel, "day": e["day"], "offset": offset, "length": len(e["member"]),
+                           "size": e["size"], "sha256": e["sha256"], "parts": e["parts"]})
+            offset += len(e["member"])
+        stats["bytes_out"] += offset
+        if dry_run:
+            continue
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=archive.parent, prefix=f".{month}.", suffix=".gz")
+        with os.fdopen(fd, "wb") as fh:
+            for f in frames:
+                fh.write(entries[f["rel"]]["member"])
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, archive)
+        _write_index(index, month, offset, frames)
+        for f in archive_frames(log_dir, month):
+            if hashlib.sha256(read_frame(f)).hexdigest() != f.sha256:
+                raise ValueError(f"{archive}: frame {f.rel} does not read back; originals kept")
+        for p in files:
+            p.unlink()
+            if p.parent != log_dir and not any(p.parent.iterdir()):
+                p.parent.rmdir()
+    return stats
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="log_format.py", description="qtlog local log formats")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a_ = sub.add_parser("append", help="append one structured record")
+    a_.add_argument("--file", required=True)
+    a_.add_argument("--device", default="")
+    a_.add_argument("--mode", default="")
+    a_.add_argument("--version", default="")
+    a_.add_argument("--notion-id", default="")
+    a_.add_argument("message", nargs="+")
+    c = sub.add_parser("cat", help="stream every record as JSONL")
+    c.add_argument("--log-dir")
+    c.add_argument("--since")
+    c.add_argument("--until")
+    t = sub.add_parser("tail", help="last lines of the newest day (live or archived), raw")
+    t.add_argument("--log-dir")
+    t.add_argument("-n", type=int, default=1)
+    k = sub.add_parser("compact", help="fold closed months into Log/archive/YYYY-MM.log.gz")
+    k.add_argument("--log-dir")
+    k.add_argument("--before", help="compact months before YYYY-MM (default: the current ET month)")
+    k.add_argument("--dry-run", action="store_true")
+    m = sub.add_parser("migrate", help="convert legacy text logs to <day>.jsonl")
+    m.add_argument("--log-dir")
+    m.add_argument("--keep-legacy", action="store_true")
+    m.add_argument("--dry-run", action="store_true")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "append":
+        append(a.file, " ".join(a.message), a.device, a.mode, a.version, a.notion_id)
+        return 0
+    if a.cmd == "cat":
+        try:
+            for rec in iter_records(a.log_dir, a.since, a.until):
+                sys.stdout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except BrokenPipeError:
+            pass
+        return 0
+    log_dir = Path(a.log_dir or os.getenv("QTLOG_LOG_DIR") or REPO / "Log")
+    if a.cmd == "tail":
+        for line in tail(log_dir, a.n):
+            print(line)
+        return 0
+    if a.cmd == "compact":
+        if a.before and not MONTH_RE.match(a.before):
+            raise SystemExit("log_format: --before must be YYYY-MM")
+        st = compact(log_dir, a.before, a.dry_run)
+        verb = "would fold" if a.dry_run else "folded"
+        print(f"LOG_COMPACT={'dry_run' if a.dry_run else 'ok'} months={st['months']} files={st['files']} "
+              f"bytes_in={st['bytes_in']} bytes_out={st['bytes_out']}")
+        print(f"log_format: {verb} {st['files']} files of {st['months']} months into {log_dir / ARCHIVE_DIR}",
+              file=sys.stderr)
+        return 0
+    st = migrate(log_dir, a.keep_legacy, a.dry_run)
+    verb = "would write" if a.dry_run else "wrote"
+    print(f"log_format: {verb} {st['records']} records into {st['days']} day files "
+          f"from {st['legacy_files']} legacy files ({log_dir})")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
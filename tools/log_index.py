@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Incremental SQLite/FTS5 index over the local log store (Log/YYYY-MM-DD.log,
+Log/YYYY-MM-DD/HHMM.log, Log/YYYY-MM-DD.jsonl, and the frames of the monthly
+archives Log/archive/YYYY-MM.log.gz) for `qtlog.sh --query`.
+
+Every entry is parsed by tools/log_format.py (all historical text formats plus
+the structured JSONL one) into (day, time, device, version, message).
+
+Only files whose (mtime, size) changed since the last run are re-parsed; files
+that disappeared are dropped. An archived file is keyed "archive/YYYY-MM.log.gz:<path>"
+and re-parsed when its archive is rewritten. The index is a cache (default
+~/.cache/qt/log_index.sqlite, QT_LOG_INDEX) and can be rebuilt at any time.
+
+    log_index.py [--log-dir DIR] query [TEXT] [--since D] [--until D] [--device X] [--limit N] [--json] [--fts]
+
+Query text is matched word by word (every word must occur; v1.3.5, sop-check,
+api.notion.com and don't are plain words; a trailing * is a prefix match).
+--fts passes the text through as raw FTS5 syntax ("phrases", OR, NOT, NEAR).
+    log_index.py [--log-dir DIR] update | rebuild | stats
+"""
+from __future__ import annotations
+import argparse, json, os, sqlite3, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from log_format import ARCHIVE_DIR, archive_frames, archive_months, archive_paths, iter_source
+from log_format import iter_file as parse_file, parse_line  # noqa: F401  (re-exported for callers)
+
+REPO = Path(__file__).resolve().parents[1]
+SCHEMA_VERSION = 1
+
+def _default_db() -> str:
+    cache = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.getenv("QT_LOG_INDEX") or os.path.join(cache, "qt", "log_index.sqlite")
+
+class LogIndex:
+    def __init__(self, db_path: str | None = None, log_dir: str | Path | None = None):
+        self.db_path = db_path or _default_db()
+        self.log_dir = Path(log_dir or os.getenv("QTLOG_LOG_DIR") or REPO / "Log").resolve()
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._schema()
+
+    def _schema(self):
+        (v,) = self.db.execute("PRAGMA user_version").fetchone()
+        if v == SCHEMA_VERSION:
+            return
+        self.db.executescript("""
+            DROP TABLE IF EXISTS entries_fts;
+            DROP TABLE IF EXISTS entries;
+            DROP TABLE IF EXISTS files;
+            CREATE TABLE files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+            CREATE TABLE entries (
+                id INTEGER PRIMARY KEY, path TEXT NOT NULL, line INTEGER,
+                day TEXT, time TEXT, sort_time TEXT, device TEXT, version TEXT, message TEXT);
+            CREATE INDEX entries_day ON entries(day, sort_time);
+            CREATE INDEX entries_path ON entries(path);
+            CREATE VIRTUAL TABLE entries_fts USING fts5(message, content='entries', content_rowid='id');
+        """)
+        self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    # -- maintenance ---------------------------------------------------------
+    def update(self) -> dict:
+        """Re-index changed files, drop vanished ones. Returns counts."""
+        seen, changed, removed = {}, 0, 0
+        if self.log_dir.is_dir():
+            for p in self.log_dir.rglob("*"):
+                if p.suffix not in (".log", ".jsonl"):
+                    continue
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                seen[str(p.relative_to(self.log_dir))] = (p, st.st_mtime_ns, st.st_size)
+            for month in archive_months(self.log_dir):
+                archive = archive_paths(self.log_dir, month)[0]
+                mtime = archive.stat().st_mtime_ns
+                for f in archive_frames(self.log_dir, month):
+                    seen[f"{ARCHIVE_DIR}/{archive.name}:{f.rel}"] = (f, mtime, f.size)
+        known = {r[0]: (r[1], r[2]) for r in self.db.execute("SELECT path, mtime_ns, size FROM files")}
+        with self.db:
+            for rel in known.keys() - seen.keys():
+                self._drop(rel)
+                self.db.execute("DELETE FROM files WHERE path=?", (rel,))
+                removed += 1
+            for rel, (p, mtime, size) in seen.items():
+                if known.get(rel) == (mtime, size):
+                    continue
+                self._drop(rel)
+                # Untimed lines sort with the last timed line above them in the same file.
+                rows, last = [], ""
+                for n, r in iter_source(p):
+                    last = r["time"] or last
+                    rows.append((rel, n, r["day"], r["time"], last, r["device"], r["version"], r["message"]))
+                for row in rows:
+                    cur = self.db.execute(
+                        "INSERT INTO entries(path, line, day, time, sort_time, device, version, message) "
+                        "VALUES (?,?,?,?,?,?,?,?)", row)
+                    self.db.execute("INSERT INTO entries_fts(rowid, message) VALUES (?, ?)", (cur.lastrowid, row[-1]))
+                self.db.execute("INSERT OR REPLACE INTO files(path, mtime_ns, size) VALUES (?,?,?)", (rel, mtime, size))
+                changed += 1
+        return {"files": len(seen), "reindexed": changed, "removed": removed}
+
+    def _drop(self, rel: str):
+        for rowid, message in self.db.execute("SELECT id, message FROM entries WHERE path=?", (rel,)).fetchall():
+            self.db.execute("INSERT INTO entries_fts(entries_fts, rowid, message) VALUES ('delete', ?, ?)", (rowid, message))
+        self.db.execute("DELETE FROM entries WHERE path=?", (rel,))
+
+    def rebuild(self) -> dict:
+        with self.db:
+            self.db.execute("DELETE FROM entries_fts")
+            self.db.execute("DELETE FROM entries")
+            self.db.execute("DELETE FROM files")
+        return self.update()
+
+    # -- queries -------------------------------------------------------------
+    def query(self, text: str | None = None, since: str | None = None, until: str | None = None,
+              device: str | None = None, limit: int = 50, fts: bool = False) -> list[dict]:
+        """Newest first. `text` is plain words (AND-ed, see fts_query), or raw FTS5 syntax with fts=True."""
+        sql = "SELECT e.day, e.time, e.device, e.version, e.message, e.path, e.line FROM entries e"
+        where, args = [], []
+        if text:
+            sql += " JOIN entries_fts f ON f.rowid = e.id"
+            where.append("entries_fts MATCH ?")
+            args.append(text if fts else fts_query(text))
+        if since:
+            where.append("e.day >= ?")
+            args.append(since)
+        if until:
+            where.append("e.day <= ?")
+            args.append(until)
+        if device:
+            where.append("e.device = ? COLLATE NOCASE")
+            args.append(device)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.day DESC, e.sort_time DESC, e.path DESC, e.line DESC LIMIT ?"
+        args.append(limit)
+        cols = ("day", "time", "device", "version", "message", "path", "line")
+        return [dict(zip(cols, r)) for r in self.db.execute(sql, args)]
+
+    def stats(self) -> dict:
+        (files,) = self.db.execute("SELECT COUNT(*) FROM files").fetchone()
+        (entries,) = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        first, last = self.db.execute("SELECT MIN(day), MAX(day) FROM entries WHERE day != ''").fetchone()
+        return {"db": self.db_path, "log_dir": str(self.log_dir), "files": files, "entries": entries,
+                "first_day": first or "", "last_day": last or ""}
+
+def fts_query(text: str) -> str:
+    """Plain search words -> FTS5: each whitespace-separated word a quoted string (AND-ed), so
+    punctuation (. - ' :) is never read as FTS5 syntax; a trailing * stays a prefix match."""
+    out = []
+    for tok in text.split():
+        star = "*" if tok.endswith("*") and tok.strip("*") else ""
+        tok = tok.rstrip("*") if star else tok
+        out.append('"' + tok.replace('"', '""') + '"' + star)
+    return " ".join(out)
+
+def format_row(r: dict) -> str:
+    stamp = f"{r['day']} {r['time']}".strip() or "????-??-??"
+    dev = f"[{r['device']}] " if r["device"] else ""
+    ver = f"v{r['version']} " if r["version"] else ""
+    msg = r["message"].replace("\n", " ⏎ ")
+    return f"{stamp:<15} {dev}{ver}{msg}  ({r['path']}:{r['line']})"
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="log_index.py", description="Indexed search over the local qtlog log store")
+    ap.add_argument("--log-dir")
+    ap.add_argument("--db", help="index file (default QT_LOG_INDEX or ~/.cache/qt/log_index.sqlite)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    q = sub.add_parser("query", help="search (updates the index first)")
+    q.add_argument("text", nargs="*", help="words that must all occur (trailing * = prefix)")
+    q.add_argument("--since", help="YYYY-MM-DD (inclusive)")
+    q.add_argument("--until", help="YYYY-MM-DD (inclusive)")
+    q.add_argument("--device")
+    q.add_argument("--limit", type=int, default=50)
+    q.add_argument("--json", action="store_true")
+    q.add_argument("--fts", action="store_true", help="TEXT is raw FTS5 syntax (phrases, OR, NOT, NEAR)")
+    for name in ("update", "rebuild", "stats"):
+        sub.add_parser(name)
+    a = ap.parse_args(argv)
+
+    idx = LogIndex(a.db, a.log_dir)
+    try:
+        if a.cmd == "stats":
+            print(json.dumps(idx.stats(), indent=2))
+            return 0
+        t0 = time.perf_counter()
+        info = idx.rebuild() if a.cmd == "rebuild" else idx.update()
+        if a.cmd != "query":
+            print(f"log_index: {info['files']} files, {info['reindexed']} re-indexed, {info['removed']} removed "
+                  f"({(time.perf_counter() - t0) * 1000:.0f} ms)")
+            return 0
+        try:
+            rows = idx.query(" ".join(a.text) or None, a.since, a.until, a.device, a.limit, a.fts)
+        except sqlite3.OperationalError as e:
+            print(f"log_index: bad query: {e}", file=sys.stderr)
+            return 2
+        if a.json:
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+        else:
+            for r in rows:
+                print(format_row(r))
+        return 0 if rows else 1
+    finally:
+        idx.close()
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Shared Notion API client for qtlog.sh and the verify tools.
+
+- one keep-alive HTTPS connection per client (per thread), reused across calls
+- children listings follow has_more/next_cursor transparently
+- 429 honours Retry-After; 429/5xx/connection drops retry with jittered backoff
+  (QT_NOTION_RETRIES, default 5; writes retry only on 429 or a failure before
+  the request was sent, so an append whose outcome is unknown is never sent twice)
+- a shared token bucket keeps concurrent callers near Notion's ~3 req/s average
+  (QT_NOTION_RPS, default 3; QT_NOTION_BURST, default 6; QT_NOTION_RPS=0 disables)
+- QT_NOTION_API_BASE overrides https://api.notion.com/v1 (e.g. tools/notion_fake_server.py)
+- QTLOG_TRACE=1 records a notion.request span per request (tools/qt_trace.py)
+- tree_lock(page_id): create-once lock for a tree's structure nodes, shared with qtlog.sh
+
+CLI (used by qtlog.sh; prints the body then a final "HTTP_CODE=<code>" line):
+    notion_api.py request GET   blocks/<id>/children?page_size=100
+    notion_api.py request PATCH blocks/<id>/children  < body.json
+    notion_api.py find-toggle  <parent_id> <title>
+    notion_api.py find-heading <parent_id> <title> [--ignore-case]
+    notion_api.py snapshot-env  <file>          (KEY=VALUE ids/day recorded with the snapshot)
+    notion_api.py snapshot-diff <old> <new>     (structural drift; exit 1 when different)
+
+Snapshots (offline replay, see Snapshot):
+    QT_NOTION_RECORD=<file>    every children listing fetched is merged into <file>
+    QT_NOTION_SNAPSHOT=<file>  children listings are served from <file>; zero network I/O
+
+For children listings a page_size below the API maximum (100) is a limit
+("first N children"); otherwise every page is fetched and merged.
+"""
+from __future__ import annotations
+import contextlib, fcntl, http.client, json, os, random, sys, threading, time, urllib.parse
+
+import qt_trace
+
+API_BASE = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+MAX_PAGE_SIZE = 100
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+SAFE_METHODS = ("GET", "HEAD", "DELETE")   # may be re-sent after an unknown outcome
+SNAPSHOT_FORMAT = "qt-notion-snapshot/1"
+# Page ids the checks need; recorded with a snapshot so replay works without the .env.
+SNAPSHOT_ENV_KEYS = (
+    "NOTION_LOG_PAGE_ID", "NOTION_TODO_PAGE_ID", "QT_BIG_PICTURE_PAGE_ID",
+    "QT_CANON_PAGE_ID", "QT_LOG_PAGE_ID", "QT_TODO_PAGE_ID",
+    "QT_WBS_CROSSWALK_PAGE_ID", "QT_DUE_DILIGENCE_PAGE_ID", "QT_INVESTORS_PAGE_ID",
+)
+
+class NotionError(Exception):
+    def __init__(self, status: int, body: dict):
+        self.status = status
+        self.body = body
+        super().__init__(f"HTTP {status}: {body.get('code') or body.get('message') or body}")
+
+class RateLimiter:
+    """Token bucket shared by all threads of a client: `rate` tokens/s, up to `burst` banked."""
+    def __init__(self, rate: float, burst: float):
+        self.rate, self.burst = rate, max(1.0, burst)
+        self.tokens, self.stamp = self.burst, time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if self.rate <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+
+class NotionClient:
+    def __init__(self, api_key: str, base: str = API_BASE, timeout: float = 30,
+                 max_retries: int | None = None, backoff: float = 0.5, rate: float | None = None,
+                 burst: float | None = None):
+        u = urllib.parse.urlsplit(base)
+        self.api_key = api_key
+        self.scheme, self.host, self.prefix = u.scheme, u.netloc, u.path.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = int(os.getenv("QT_NOTION_RETRIES", "5")) if max_retries is None else max_retries
+        self.backoff = backoff
+        if rate is None:
+            rate = float(os.getenv("QT_NOTION_RPS", "3") or 0)
+        if burst is None:
+            burst = float(os.getenv("QT_NOTION_BURST", "6") or 1)
+        self.limiter = RateLimiter(rate, burst)
+        self.record: dict | None = None   # block id -> compact children, when recording
+        self._local = threading.local()
+
+    # -- transport -----------------------------------------------------------
+    def _conn(self, fresh: bool = False) -> http.client.HTTPConnection:
+        c = getattr(self._local, "conn", None)
+        if c is not None and fresh:
+            c.close()
+            c = None
+        if c is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            c = self._local.conn = cls(self.host, timeout=self.timeout)
+        return c
+
+    def close(self):
+        c = getattr(self._local, "conn", None)
+        if c is not None:
+            c.close()
+            self._local.conn = None
+
+    def _delay(self, attempt: int, retry_after: str | None) -> float:
+        try:
+            base = float(retry_after) if retry_after else self.backoff * (2 ** attempt)
+        except ValueError:
+            base = self.backoff * (2 ** attempt)
+        return base + random.uniform(0, base / 2)
+
+    def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, dict]:
+        """Send one request; returns (status, decoded body). Retries 429/5xx and dropped connections."""
+        if not qt_trace.enabled():
+            return self._send(method, path, body, {})
+        t0, p0 = time.time(), time.perf_counter()
+        info = {"status": 0, "attempts": 0, "bytes_out": 0, "bytes_in": 0}
+        try:
+            return self._send(method, path, body, info)
+        finally:
+            qt_trace.record("notion.request", t0, (time.perf_counter() - p0) * 1000,
+                            method=method.upper(), endpoint=qt_trace.endpoint(path), **info)
+
+    def _send(self, method: str, path: str, body: dict | None, info: dict) -> tuple[int, dict]:
+        safe = method.upper() in SAFE_METHODS
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Notion-Version": NOTION_VERSION,
+        }
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+        url = f"{self.prefix}/{path.lstrip('/')}"
+        attempt = 0
+        while True:
+            self.limiter.wait()
+            sent = False
+            info["attempts"] = attempt + 1
+            try:
+                c = self._conn(fresh=attempt > 0)
+                c.request(method, url, body=data, headers=headers)
+                sent = True
+                r = c.getresponse()
+                raw = r.read()
+                status, retry_after = r.status, r.getheader("Retry-After")
+                info.update(status=status, bytes_out=len(data or b""), bytes_in=len(raw))
+            except (http.client.HTTPException, ConnectionError, TimeoutError, OSError):
+                if attempt >= self.max_retries or (sent and not safe):
+                    raise
+                time.sleep(self._delay(attempt, None) if attempt else 0)
+                attempt += 1
+                continue
+            if status in RETRY_STATUSES and attempt < self.max_retries and (safe or status == 429):
+                time.sleep(self._delay(attempt, retry_after))
+                attempt += 1
+                continue
+            try:
+                payload = json.loads(raw.decode("utf-8", errors="replace")) if raw else {}
+            except ValueError:
+                payload = {"message": raw.decode("utf-8", errors="replace")}
+            return status, payload
+
+    def call(self, method: str, path: str, body: dict | None = None) -> dict:
+        status, payload = self.request(method, path, body)
+        if not 200 <= status < 300:
+            raise NotionError(status, payload)
+        return payload
+
+    # -- blocks --------------------------------------------------------------
+    def children(self, block_id: str, limit: int | None = None) -> list:
+        """All children of block_id (following next_cursor), or only the first `limit`."""
+        if self.record is not None:
+            # A snapshot must hold complete listings, so recording always reads every page.
+            out = self._children(block_id, None)
+            self.record[block_id] = [compact_block(b) for b in out]
+            return out if limit is None else out[:limit]
+        return self._children(block_id, limit)
+
+    def _children(self, block_id: str, limit: int | None) -> list:
+        out, cursor = [], None
+        while True:
+            size = MAX_PAGE_SIZE if limit is None else min(MAX_PAGE_SIZE, limit - len(out))
+            q = {"page_size": size}
+            if cursor:
+                q["start_cursor"] = cursor
+            page = self.call("GET", f"blocks/{block_id}/children?{urllib.parse.urlencode(q)}")
+            out.extend(page.get("results") or [])
+            cursor = page.get("next_cursor")
+            if not page.get("has_more") or not cursor or (limit is not None and len(out) >= limit):
+                return out if limit is None else out[:limit]
+
+    def append(self, block_id: str, children: list, after: str | None = None) -> list:
+        body = {"children": children}
+        if after:
+            body["after"] = after
+        return self.call("PATCH", f"blocks/{block_id}/children", body).get("results") or []
+
+    def find_toggle(self, parent_id: str, title: str) -> str:
+        for b in self.children(parent_id):
+            if b.get("type") == "toggle" and block_title(b) == title:
+                return b.get("id", "")
+        return ""
+
+    def find_heading(self, parent_id: str, title: str, ignore_case: bool = False) -> str:
+        want = title.strip().lower() if ignore_case else title
+        for b in self.children(parent_id):
+            if b.get("type") in ("heading_1", "heading_2", "heading_3"):
+                got = block_title(b).strip()
+                if (got.lower() if ignore_case else got) == want:
+                    return b.get("id", "")
+        return ""
+
+def block_title(b: dict) -> str:
+    t = b.get("type") or ""
+    return "".join(x.get("plain_text", "") for x in ((b.get(t) or {}).get("rich_text") or []))
+
+def toggle_block(title: str, children: list | None = None) -> dict:
+    return {
+        "object": "block",
+        "type": "toggle",
+        "toggle": {"rich_text": [{"type": "text", "text": {"content": title}}], "children": children or []},
+    }
+
+def compact_block(b: dict) -> dict:
+    """Keep what the checks read: ids, type, text (plain_text/href) and scalar payload fields."""
+    t = b.get("type") or ""
+    payload = {}
+    for k, v in (b.get(t) or {}).items():
+        if k == "rich_text":
+            payload[k] = [{k2: r[k2] for k2 in ("plain_text", "href") if r.get(k2)} for r in v or []]
+        elif not isinstance(v, (dict, list)):
+            payload[k] = v
+    out = {"id": b.get("id", ""), "type": t, t: payload}
+    for k in ("has_children", "last_edited_time"):
+        if b.get(k):
+            out[k] = b[k]
+    return out
+
+def _today_et() -> str:
+    try:
+        from zoneinfo import ZoneInfo
+        return __import__("datetime").datetime.now(ZoneInfo("America/Toronto")).strftime("%Y-%m-%d")
+    except Exception:
+        return time.strftime("%Y-%m-%d")
+
+class Snapshot:
+    """
+    Compact on-disk copy of fetched block listings:
+        {"format": ..., "day": "YYYY-MM-DD", "env": {KEY: page_id}, "children": {block_id: [block, ...]}}
+    `day` is the ET date of the recording, so replayed "today" checks look at the same day toggle.
+    """
+    def __init__(self, children: dict | None = None, day: str = "", env: dict | None = None):
+        self.children = children or {}
+        self.day = day or _today_et()
+        self.env = env or {}
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with open(path, encoding="utf-8") as f:
+            d = json.load(f)
+        if d.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path}: not a {SNAPSHOT_FORMAT} file")
+        return cls(d.get("children") or {}, d.get("day", ""), d.get("env") or {})
+
+    def dumps(self) -> str:
+        return json.dumps({"format": SNAPSHOT_FORMAT, "day": self.day, "env": self.env,
+                           "children": self.children}, ensure_ascii=False, sort_keys=True,
+                          separators=(",", ":"))
+
+    def merge_into(self, path: str):
+        """Add these listings to `path` (created if missing); safe across concurrent processes."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                base = Snapshot.load(path)
+            except FileNotFoundError:
+                base = Snapshot(day=self.day)
+            base.children.update(self.children)
+            base.env.update({k: v for k, v in self.env.items() if v})
+            base.day = self.day
+            tmp = f"{path}.{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(base.dumps())
+            os.replace(tmp, path)
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> list[str]:
+    """Human-readable structural differences (added/removed/retitled/reordered children)."""
+    lines = []
+    for parent in sorted(set(old.children) | set(new.children)):
+        a = {b["id"]: b for b in old.children.get(parent, [])}
+        b = {x["id"]: x for x in new.children.get(parent, [])}
+        if parent not in old.children or parent not in new.children:
+            side = "+" if parent not in old.children else "-"
+            lines.append(f"{side} listing {parent} ({len(a) or len(b)} children)")
+            continue
+        for bid in b.keys() - a.keys():
+            lines.append(f"+ {parent} {b[bid]['type']} {block_title(b[bid])!r}")
+        for bid in a.keys() - b.keys():
+            lines.append(f"- {parent} {a[bid]['type']} {block_title(a[bid])!r}")
+        for bid in a.keys() & b.keys():
+            if (a[bid]["type"], block_title(a[bid])) != (b[bid]["type"], block_title(b[bid])):
+                lines.append(f"~ {parent} {block_title(a[bid])!r} -> {block_title(b[bid])!r}")
+        common = [x for x in a if x in b]
+        if common != [x for x in b if x in a]:
+            lines.append(f"~ {parent} children reordered")
+    return lines
+
+class SnapshotClient(NotionClient):
+    """
+    Read-only client answering children listings from a Snapshot; never touches the network.
+    A block the snapshot lists with has_children false answers an empty listing.
+    """
+    def __init__(self, snap: Snapshot):
+        super().__init__("snapshot", rate=0)
+        self.snap = snap
+        self.leaves = {b["id"] for kids in snap.children.values() for b in kids if not b.get("has_children")}
+
+    def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, dict]:
+        u = urllib.parse.urlsplit(path)
+        parts = u.path.strip("/").split("/")
+        if method.upper() != "GET" or len(parts) != 3 or parts[0] != "blocks" or parts[2] != "children":
+            return 405, {"object": "error", "code": "snapshot_read_only", "message": f"{method} {u.path}"}
+        if parts[1] in self.leaves and parts[1] not in self.snap.children:
+            return 200, {"object": "list", "results": [], "has_more": False, "next_cursor": None}
+        if parts[1] not in self.snap.children:
+            return 404, {"object": "error", "code": "object_not_found", "message": f"{parts[1]} not in snapshot"}
+        size = int((urllib.parse.parse_qs(u.query).get("page_size") or [MAX_PAGE_SIZE])[0])
+        return 200, {"object": "list", "results": self.snap.children[parts[1]][:size],
+                     "has_more": False, "next_cursor": None}
+
+_clients: dict = {}
+
+def client_for(api_key: str, env: dict | None = None) -> NotionClient:
+    """
+    Process-wide client per key, so every caller shares the warm connection.
+    QT_NOTION_SNAPSHOT switches to offline replay; QT_NOTION_RECORD starts recording.
+    env (default os.environ) supplies those settings, so a caller serving another
+    environment (the daemon) never has to swap the process environment.
+    """
+    env = os.environ if env is None else env
+    if api_key not in _clients:
+        replay = env.get("QT_NOTION_SNAPSHOT", "").strip()
+        if replay:
+            _clients[api_key] = SnapshotClient(Snapshot.load(replay))
+        else:
+            _clients[api_key] = NotionClient(api_key, base=env.get("QT_NOTION_API_BASE", "").strip() or API_BASE)
+            if env.get("QT_NOTION_RECORD", "").strip():
+                _clients[api_key].record = {}
+    return _clients[api_key]
+
+def flush_recording(env: dict | None = None):
+    """Merge everything recorded in this process into QT_NOTION_RECORD (no-op otherwise)."""
+    env = os.environ if env is None else env
+    path = env.get("QT_NOTION_RECORD", "").strip()
+    if not path:
+        return
+    rec = {}
+    for c in _clients.values():
+        rec.update(c.record or {})
+    if rec:
+        Snapshot(rec, env={k: env.get(k, "").strip() for k in SNAPSHOT_ENV_KEYS}).merge_into(path)
+
+def state_dir(env: dict | None = None) -> str:
+    """qtlog.sh's QTLOG_STATE_DIR (~/.local/state/qt); env defaults to os.environ."""
+    env = os.environ if env is None else env
+    return env.get("QTLOG_STATE_DIR") or os.path.join(
+        env.get("XDG_STATE_HOME") or os.path.join(env.get("HOME") or os.path.expanduser("~"), ".local", "state"), "qt")
+
+@contextlib.contextmanager
+def tree_lock(page_id: str, env: dict | None = None):
+    """
+    Create-once lock of one Notion tree (Log or ToDo page), shared with qtlog.sh's
+    notion_tree_lock: hold it from listing a parent until a missing day toggle or
+    __TOP__ is created, so a parallel writer lists after the create and reuses it.
+    """
+    state = state_dir(env)
+    os.makedirs(state, exist_ok=True)
+    with open(os.path.join(state, f"notion-{page_id}.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+def client_from_env(env: dict | None = None) -> NotionClient:
+    env = os.environ if env is None else env
+    key = env.get("NOTION_API_KEY", "").strip()
+    if not key and env.get("QT_NOTION_SNAPSHOT", "").strip():
+        key = "snapshot"
+    if not key:
+        raise SystemExit("notion_api: NOTION_API_KEY missing")
+    return client_for(key, env)
+
+# -- CLI (qtlog.sh) ----------------------------------------------------------
+def _offline(e: Exception) -> dict:
+    # Offline / connection lost: reported as HTTP_CODE=0 (like curl's 000) so callers can defer.
+    return {"object": "error", "message": f"{type(e).__name__}: {e}"}
+
+def _cli_request(c: NotionClient, method: str, path: str) -> int:
+    method = method.upper()
+    body = None
+    if method != "GET":
+        raw = sys.stdin.read()
+        body = json.loads(raw) if raw.strip() else None
+    u = urllib.parse.urlsplit(path)
+    if method == "GET" and u.path.rstrip("/").endswith("/children"):
+        q = urllib.parse.parse_qs(u.query)
+        size = int((q.get("page_size") or [MAX_PAGE_SIZE])[0])
+        block_id = u.path.rstrip("/").split("/")[-2]
+        try:
+            results = c.children(block_id, limit=size if size < MAX_PAGE_SIZE else None)
+            status, payload = 200, {"object": "list", "results": results, "has_more": False, "next_cursor": None}
+        except NotionError as e:
+            status, payload = e.status, e.body
+        except (http.client.HTTPException, OSError) as e:
+            status, payload = 0, _offline(e)
+    else:
+        try:
+            status, payload = c.request(method, path, body)
+        except (http.client.HTTPException, OSError) as e:
+            status, payload = 0, _offline(e)
+    print(json.dumps(payload, ensure_ascii=False))
+    print(f"HTTP_CODE={status}")
+    return 0
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__.strip())
+        return 0
+    cmd, args = argv[0], argv[1:]
+    if cmd == "snapshot-env" and len(args) == 1:
+        snap = Snapshot.load(args[0])
+        for k in SNAPSHOT_ENV_KEYS:
+            if snap.env.get(k):
+                print(f"{k}={snap.env[k]}")
+        print(f"QTLOG_VERIFY_DAY={snap.day}")
+        return 0
+    if cmd == "snapshot-diff" and len(args) == 2:
+        lines = diff_snapshots(Snapshot.load(args[0]), Snapshot.load(args[1]))
+        print("\n".join(lines) if lines else "SNAPSHOT_DIFF=none")
+        return 1 if lines else 0
+    c = client_from_env()
+    try:
+        if cmd == "request" and len(args) == 2:
+            return _cli_request(c, args[0], args[1])
+        if cmd == "find-toggle" and len(args) == 2:
+            print(c.find_toggle(args[0], args[1]))
+            return 0
+        if cmd == "find-heading" and len(args) >= 2:
+            print(c.find_heading(args[0], args[1], ignore_case="--ignore-case" in args[2:]))
+            return 0
+    except NotionError as e:
+        print(f"notion_api: {e}", file=sys.stderr)
+        return 1
+    finally:
+        flush_recording()
+    print(f"notion_api: bad usage: {' '.join(argv)}", file=sys.stderr)
+    return 2
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+End-to-end cost of qtlog's Notion operations, measured against tools/notion_fake_server.py.
+
+Each scenario runs the real command (qtlog.sh / verify_sop_automation.py) in a
+throwaway HOME with QT_NOTION_API_BASE pointing at a freshly seeded fake, and
+reports wall time and the HTTP requests the fake saw. Scenarios run in order
+against the same fake, so "log_write_warm" sees the ids "log_write_cold" cached.
+
+BUDGET is the request count each scenario is allowed; going over is a
+regression (exit 1). tests/test_notion_bench.py pins the same numbers, so an
+optimisation that lowers a count should lower its budget too. CONNECTIONS caps
+the TCP connections of the qtlog.sh write paths: all of a run's Notion calls go
+through one session process (tools/notion_session.py) and its keep-alive
+connection.
+
+    python tools/notion_bench.py [--latency 0.05] [--rate-limit-every 10] [--repeat 3] [--json]
+"""
+from __future__ import annotations
+import argparse, json, os, subprocess, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_fake_server import BIG_PICTURE_PAGE_ID, LOG_PAGE_ID, TODO_PAGE_ID, FakeNotion
+
+REPO = Path(__file__).resolve().parents[1]
+QTLOG = str(REPO / "qtlog.sh")
+VERIFY = str(REPO / "tools" / "verify_sop_automation.py")
+
+# name -> (argv, exit codes that count as success)
+SCENARIOS = {
+    "log_write_cold": (["bash", QTLOG, "--notion", "--no-git", "bench: cold write"], (0,)),
+    "log_write_warm": (["bash", QTLOG, "--notion", "--no-git", "bench: warm write"], (0,)),
+    "spool_flush_20": (["bash", "-c", 'for i in $(seq 20); do bash "$0" --spool --notion --no-git "bench: spooled $i" || exit; done; '
+                         'bash "$0" --flush --no-git', QTLOG], (0,)),
+    "big_payload":    (["bash", QTLOG, "--notion", "--no-git", "bench: big payload\n" + "\n".join(["x" * 200] * 20)], (0,)),
+    # ~350 KB QTLOG_APPEND_FILE: 250 code blocks, three 100-block batches
+    "big_file":       (["bash", "-c", 'seq 60000 > "$HOME/big.txt" && QTLOG_APPEND_FILE="$HOME/big.txt" '
+                         'bash "$0" --notion --no-git "bench: big file"', QTLOG], (0,)),
+    "todo":           (["bash", QTLOG, "--todo", "bench: todo item"], (0,)),
+    "todo_bulk_50":   (["bash", "-c", 'for i in $(seq 50); do echo "bench: \\"plan\\" item $i"; done | bash "$0" --todo-file -',
+                        QTLOG], (0,)),
+    "verify_all":     (["bash", QTLOG, "--verify-all"], (0,)),
+    "bootstrap":      (["bash", QTLOG, "--bootstrap"], (0,)),
+    "rollover":       (["bash", QTLOG, "--rollover"], (0,)),
+    # verify_sop_automation also checks repo files; only its Notion traffic is measured here.
+    "big_picture":    ([sys.executable, VERIFY], (0, 2)),
+}
+
+BUDGET = {
+    "log_write_cold": 6,   # list page + H1, create H1 __TOP__ and day, list day, create day __TOP__
+    "log_write_warm": 2,   # cached-id check + entry PATCH
+    "spool_flush_20": 2,   # 20 queued entries: cached-id check + one multi-child PATCH
+    "big_payload":    2,   # warm write; the code blocks ride inside the entry PATCH
+    "big_file":       6,   # warm write + find entry "Log" child + 3 batch PATCHes
+    "todo":           5,   # list ToDo page + heading, create today's day, list it, insert the item (children inline)
+    "todo_bulk_50":   4,   # same discovery, then all 50 items in one PATCH
+    "verify_all":     6,   # one listing per parent: Log page, H1, day; ToDo page, heading, __TOP__
+    "bootstrap":      6,   # days exist: the verify_all listings serve both ensures; the entry is queued
+    "rollover":       4,   # nothing old: Log page + H1, ToDo page + heading
+    "big_picture":    2,   # one listing per block with children
+}
+
+CONNECTIONS = {
+    "log_write_cold": 1,   # resolve + creates + entry PATCH on one connection
+    "log_write_warm": 1,
+    "spool_flush_20": 1,   # reconcile, resolve and chunk PATCHes
+    "big_payload":    1,
+    "big_file":       1,   # the QTLOG_APPEND_FILE upload too
+}
+
+def bench_env(base: str, home: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("NOTION_", "QT_", "QTLOG_"))}
+    env.update({
+        "HOME": home, "CI": "1", "QT_NOTION_RPS": "0",
+        "QT_NOTION_API_BASE": base, "NOTION_API_KEY": "fake",
+        "NOTION_LOG_PAGE_ID": LOG_PAGE_ID, "NOTION_TODO_PAGE_ID": TODO_PAGE_ID,
+        "QT_BIG_PICTURE_PAGE_ID": BIG_PICTURE_PAGE_ID,
+        "QTLOG_LOG_DIR": str(Path(home) / "Log"),
+    })
+    return env
+
+def run(names: list[str] | None = None, latency: float = 0.0, rate_limit_every: int = 0) -> list[dict]:
+    """Run scenarios in order against one fresh fake; one result dict per scenario."""
+    results = []
+    with FakeNotion(latency, rate_limit_every).seed() as fake, tempfile.TemporaryDirectory() as home:
+        env = bench_env(fake.base_url, home)
+        for name in names or list(SCENARIOS):
+            argv, ok_codes = SCENARIOS[name]
+            fake.reset()
+            t0 = time.perf_counter()
+            p = subprocess.run(argv, env=env, cwd=REPO, capture_output=True, text=True)
+            wall = time.perf_counter() - t0
+            st = fake.stats()
+            results.append({
+                "scenario": name, "wall_ms": round(wall * 1000, 1),
+                "requests": st["requests"] - st["throttled"], "throttled": st["throttled"],
+                "connections": st["connections"],
+                "by_method": st["by_method"], "budget": BUDGET[name],
+                "ok": p.returncode in ok_codes, "rc": p.returncode,
+                "output": "" if p.returncode in ok_codes else (p.stdout + p.stderr)[-2000:],
+            })
+    return results
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark qtlog Notion operations against the local fake")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added per fake API request")
+    ap.add_argument("--rate-limit-every", type=int, default=0, help="fake answers every Nth request with 429")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--json", action="store_true")
+    a = ap.parse_args()
+
+    runs = [run(None, a.latency, a.rate_limit_every) for _ in range(max(1, a.repeat))]
+    if a.json:
+        print(json.dumps(runs if a.repeat > 1 else runs[0], indent=2))
+    else:
+        print(f"{'scenario':<16} {'wall_ms':>9} {'requests':>8} {'budget':>6} {'conns':>5} {'429s':>5}  by_method")
+        for rs in runs:
+            for r in rs:
+                flag = "" if r["ok"] else f"  FAIL rc={r['rc']}"
+                if r["requests"] > r["budget"]:
+                    flag += "  OVER BUDGET"
+                if r["connections"] > CONNECTIONS.get(r["scenario"], r["connections"]):
+                    flag += "  EXTRA CONNECTIONS"
+                print(f"{r['scenario']:<16} {r['wall_ms']:>9} {r['requests']:>8} {r['budget']:>6} "
+                      f"{r['connections']:>5} {r['throttled']:>5}  {r['by_method']}{flag}")
+    bad = [r for rs in runs for r in rs if not r["ok"] or r["requests"] > r["budget"]
+           or r["connections"] > CONNECTIONS.get(r["scenario"], r["connections"])]
+    for r in bad:
+        if r["output"]:
+            print(f"--- {r['scenario']} output ---\n{r['output']}", file=sys.stderr)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
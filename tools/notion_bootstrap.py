@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Day bootstrap behind `qtlog.sh --bootstrap` (qtday --run): Log-day ensure,
+ToDo-day ensure and the --verify-all checks in one process.
+
+The Log and ToDo branches run concurrently on one client and one Listings
+(tools/notion_verify.py), so each parent is listed once for both the ensure and
+the verify step; only a parent that just got a new child is listed again.
+
+    Log:  H1 "Log" -> H1 __TOP__ (created) -> day toggle (created after it, with its
+          own __TOP__) -> day __TOP__ (created; must be the first child)
+          ENSURE_TODAY_TOP_OK|FAIL|SKIP, then VERIFY_* / H1_* / DAY_*
+    ToDo: "ToDo" heading -> __TOP__ (required) -> day toggle (created after __TOP__)
+          TODO_DAY_EXISTS|CREATED, TODO_ENSURE_FAIL|SKIP, then TODO_*
+
+Same markers as ensure_today_top, ensure_todo_day_toggle and notion_verify.py.
+Each ensure holds its tree's create-once lock (notion_api.tree_lock, shared
+with qtlog.sh), so a parallel writer never adds a second day toggle or __TOP__.
+The Log ids are printed as `NOTION_LOG_IDS=<h1> <day> <day __TOP__>` so the
+caller can fill its id cache.
+
+    notion_bootstrap.py [--day YYYY-MM-DD]
+Env: NOTION_API_KEY, NOTION_LOG_PAGE_ID, NOTION_TODO_PAGE_ID (missing -> *_SKIP=missing_env).
+"""
+from __future__ import annotations
+import argparse, http.client, os, sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_api import NotionError, _today_et, block_title, client_from_env, flush_recording, toggle_block, tree_lock
+from notion_verify import Listings, verify_log, verify_todo
+
+TOP = "__TOP__"
+
+def _toggle_id(children: list, title: str) -> str:
+    return next((b.get("id", "") for b in children
+                 if b.get("type") == "toggle" and block_title(b) == title), "")
+
+def _create(ls: Listings, parent: str, block: dict, after: str | None) -> str:
+    """Insert one block under parent (after `after`); returns its id, "" on failure."""
+    try:
+        res = ls.client.append(parent, [block], after=after or None)
+    except (NotionError, http.client.HTTPException, OSError) as e:
+        print(f"notion_bootstrap: create under {parent} failed: {e}", file=sys.stderr)
+        return ""
+    finally:
+        ls.forget(parent)
+    return (res[0].get("id", "") if res else "")
+
+def ensure_log(ls: Listings, page_id: str, day: str) -> tuple[list[str], int]:
+    """notion_log_resolve_day's slow path on shared listings, under the Log tree lock."""
+    if not os.getenv("NOTION_API_KEY") or not page_id:
+        return ["ENSURE_TODAY_TOP_SKIP=missing_env"], 0
+    with tree_lock(page_id):
+        return _ensure_log(ls, page_id, day)
+
+def _ensure_log(ls: Listings, page_id: str, day: str) -> tuple[list[str], int]:
+    h1 = next((b.get("id", "") for b in ls.get(page_id)
+               if b.get("type") == "heading_1" and block_title(b) == "Log"), "")
+    if not h1:
+        return ["ENSURE_TODAY_TOP_FAIL=missing_h1_log"], 1
+    out = []
+    kids = ls.get(h1)
+    h1_top = _toggle_id(kids, TOP)
+    if not h1_top:
+        h1_top = _create(ls, h1, toggle_block(TOP), kids[0].get("id") if kids else None)
+        if not h1_top:
+            return ["ENSURE_TODAY_TOP_FAIL=h1_top_create_failed"], 1
+        out.append("ENSURE_TODAY_TOP_NOTE=created_h1_top_anchor")
+    day_id = _toggle_id(ls.get(h1), day)
+    if not day_id:
+        day_id = _create(ls, h1, toggle_block(day, [toggle_block(TOP)]), h1_top)
+        if not day_id:
+            return out + ["ENSURE_TODAY_TOP_FAIL=day_create_failed"], 1
+        out.append(f"ENSURE_TODAY_TOP_NOTE=created_day_toggle_{day}")
+    kids = ls.get(day_id)
+    day_top = _toggle_id(kids, TOP)
+    if not day_top:
+        day_top = _create(ls, day_id, toggle_block(TOP), kids[0].get("id") if kids else None)
+        if not day_top:
+            return out + ["ENSURE_TODAY_TOP_FAIL=day_top_create_failed"], 1
+        out.append("ENSURE_TODAY_TOP_NOTE=created_day_top_anchor")
+        kids = ls.get(day_id)
+    if not kids or kids[0].get("id") != day_top:
+        print(f"ACTION: In Notion, open QT ▸ Log ▸ {day} and drag the '__TOP__' toggle to the very TOP "
+              "(first child), then retry.", file=sys.stderr)
+        return out + ["ENSURE_TODAY_TOP_FAIL=day_top_not_first"], 1
+    return out + [f"ENSURE_TODAY_TOP_OK={day}", f"NOTION_LOG_IDS={h1} {day_id} {day_top}"], 0
+
+def ensure_todo(ls: Listings, page_id: str, day: str) -> tuple[list[str], int]:
+    """ensure_todo_day_toggle on shared listings, under the ToDo tree lock."""
+    if not os.getenv("NOTION_API_KEY") or not page_id:
+        return ["TODO_ENSURE_SKIP=missing_env"], 0
+    with tree_lock(page_id):
+        return _ensure_todo(ls, page_id, day)
+
+def _ensure_todo(ls: Listings, page_id: str, day: str) -> tuple[list[str], int]:
+    heading = next((b.get("id", "") for b in ls.get(page_id)
+                    if b.get("type") in ("heading_1", "heading_2", "heading_3") and block_title(b) == "ToDo"), "")
+    if not heading:
+        return ["TODO_ENSURE_FAIL=todo_heading_missing"], 1
+    kids = ls.get(heading)
+    top = _toggle_id(kids, TOP)
+    if not top:
+        return ["TODO_ENSURE_FAIL=todo_top_anchor_missing"], 1
+    if _toggle_id(kids, day):
+        return [f"TODO_DAY_EXISTS={day}"], 0
+    if not _create(ls, heading, toggle_block(day, [toggle_block(TOP)]), top):
+        return ["TODO_ENSURE_FAIL=todo_day_create_failed"], 1
+    return [f"TODO_DAY_CREATED={day}"], 0
+
+def _branch(ensure, verify) -> tuple[list[str], int]:
+    lines, rc = ensure()
+    if rc:
+        return lines, rc
+    more, rc = verify()
+    return lines + more, rc
+
+def run(day: str | None = None) -> int:
+    """Both branches concurrently; output Log first, then ToDo. Returns the first non-zero code."""
+    day = day or _today_et()
+    log_page = os.getenv("NOTION_LOG_PAGE_ID", "").strip()
+    todo_page = os.getenv("NOTION_TODO_PAGE_ID", "").strip()
+    ls = Listings(client_from_env()) if os.getenv("NOTION_API_KEY") else None
+    rc = 0
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(_branch, lambda: ensure_log(ls, log_page, day), lambda: verify_log(ls, log_page, day)),
+                pool.submit(_branch, lambda: ensure_todo(ls, todo_page, day), lambda: verify_todo(ls, todo_page)),
+            ]
+            for f in futures:
+                lines, code = f.result()
+                print("\n".join(lines), flush=True)
+                rc = rc or code
+    finally:
+        flush_recording()
+    return rc
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="notion_bootstrap.py", description="Ensure and verify today's Log/ToDo days")
+    ap.add_argument("--day", help="day toggle to ensure (default today ET)")
+    a = ap.parse_args(argv)
+    return run(a.day)
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Notion blocks API (tests and benchmarks only).
+
+Serves an in-memory block tree on http://127.0.0.1:<port>/v1:
+    GET    /v1/blocks/<id>/children?page_size=&start_cursor=   (paginated, max 100)
+    PATCH  /v1/blocks/<id>/children   {"after": <id>?, "children": [...]}   (400 past 100 children per array)
+    PATCH  /v1/blocks/<id>            {"<type>": {"rich_text": [...]}}       (retitle)
+    GET    /v1/pages/<id>             {"object": "page", "id", "last_edited_time"}
+    DELETE /v1/blocks/<id>
+
+last_edited_time follows Notion: minute precision; a write stamps the block it
+changes and the parent whose children it changes, and the page for any change
+below it. `clock` (epoch seconds) can be replaced to control the stamps.
+
+Control endpoints (not counted as API requests):
+    GET  /_fake/stats   {"requests": N, "throttled": N, "connections": N, "by_method": {...},
+                         "log": [[method, path, status], ...]}   (connections: TCP connections accepted)
+    POST /_fake/reset   zero the counters (the tree is kept)
+
+Knobs: latency (seconds added to every API request) and rate_limit_every
+(every Nth API request answers 429 with Retry-After: 0).
+
+Point qtlog.sh / verify_sop_automation.py at it with QT_NOTION_API_BASE=<base>.
+
+    python tools/notion_fake_server.py --port 8765 --latency 0.05 --rate-limit-every 10
+"""
+from __future__ import annotations
+import argparse, json, threading, time, uuid, urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOG_PAGE_ID = "log-page"
+TODO_PAGE_ID = "todo-page"
+BIG_PICTURE_PAGE_ID = "big-picture"
+MAX_PAGE_SIZE = 100
+
+def _too_many(children: list) -> bool:
+    """Notion rejects any children array (top level or nested) longer than 100."""
+    return len(children) > MAX_PAGE_SIZE or any(
+        _too_many((c.get(c.get("type", "")) or {}).get("children") or []) for c in children if isinstance(c, dict))
+
+def _text(spec: dict) -> str:
+    body = spec.get(spec.get("type", ""), {}) or {}
+    return "".join((r.get("text") or {}).get("content", r.get("plain_text", ""))
+                   for r in body.get("rich_text") or [])
+
+def spec(type_: str, title: str, children: list | None = None) -> dict:
+    """Block in the shape Notion accepts on PATCH .../children."""
+    body = {"rich_text": [{"type": "text", "text": {"content": title}}]}
+    if children:
+        body["children"] = children
+    return {"object": "block", "type": type_, type_: body}
+
+class FakeNotion:
+    def __init__(self, latency: float = 0.0, rate_limit_every: int = 0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.blocks: dict[str, dict] = {}
+        self.kids: dict[str, list[str]] = {}
+        self.log: list[list] = []
+        self.throttled = 0
+        self.connections = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self.clock = time.time
+        self.parent: dict[str, str] = {}
+        self.page_edited: dict[str, str] = {}
+
+    # -- tree ----------------------------------------------------------------
+    def _touch(self, *bids: str):
+        now = time.strftime("%Y-%m-%dT%H:%M:00.000Z", time.gmtime(self.clock()))
+        for bid in bids:
+            if bid in self.blocks:
+                self.blocks[bid]["last_edited_time"] = now
+            while bid in self.parent:
+                bid = self.parent[bid]
+            self.page_edited[bid] = now
+
+    def _new_id(self) -> str:
+        self._seq += 1
+        return str(uuid.UUID(int=self._seq))
+
+    def add_page(self, page_id: str, children: list | None = None) -> str:
+        self.kids.setdefault(page_id, [])
+        self._touch(page_id)
+        self.insert(page_id, children or [])
+        return page_id
+
+    def insert(self, parent: str, specs: list, after: str | None = None) -> list[dict]:
+        lst = self.kids[parent]
+        pos = lst.index(after) + 1 if after and after in lst else len(lst)
+        out = []
+        for s in specs:
+            t = s["type"]
+            bid = self._new_id()
+            text = _text(s)
+            self.blocks[bid] = {
+                "object": "block", "id": bid, "type": t, "has_children": False, "archived": False,
+                t: {k: v for k, v in (s.get(t) or {}).items() if k != "children"} | {
+                    "rich_text": [{"type": "text", "text": {"content": text}, "plain_text": text}]},
+            }
+            self.kids[bid] = []
+            self.parent[bid] = parent
+            self._touch(bid, parent)
+            lst.insert(pos, bid)
+            pos += 1
+            self.insert(bid, (s.get(t) or {}).get("children") or [])
+            out.append(self.blocks[bid])
+        if parent in self.blocks and lst:
+            self.blocks[parent]["has_children"] = True
+        return out
+
+    def delete(self, bid: str) -> dict | None:
+        b = self.blocks.get(bid)
+        if b is None:
+            return None
+        for lst in self.kids.values():
+            if bid in lst:
+                lst.remove(bid)
+        b["archived"] = True
+        self._touch(bid, self.parent.get(bid, ""))
+        return b
+
+    def update(self, bid: str, body: dict) -> dict | None:
+        b = self.blocks.get(bid)
+        if b is None or b["archived"]:
+            return None
+        t = b["type"]
+        if (body.get(t) or {}).get("rich_text") is not None:
+            text = _text({"type": t, t: body[t]})
+            b[t]["rich_text"] = [{"type": "text", "text": {"content": text}, "plain_text": text}]
+            self._touch(bid)
+        return b
+
+    def find(self, parent: str, title: str) -> str | None:
+        for bid in self.kids.get(parent, []):
+            if _text(self.blocks[bid]) == title:
+                return bid
+        return None
+
+    def seed(self) -> "FakeNotion":
+        """Minimal qtlog layout: Log page with H1 "Log", ToDo page with heading "ToDo" + __TOP__, Big Picture."""
+        self.add_page(LOG_PAGE_ID, [spec("heading_1", "Log")])
+        self.add_page(TODO_PAGE_ID, [spec("heading_2", "ToDo", [spec("toggle", "__TOP__")])])
+        self.add_page(BIG_PICTURE_PAGE_ID, [
+            spec("heading_1", "QT - Big Picture"),
+            spec("toggle", "Governance", [spec("paragraph", f"item {i}") for i in range(3)]),
+            spec("paragraph", "New Navigation Block"),
+        ])
+        return self
+
+    # -- counters ------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            by_method: dict[str, int] = {}
+            for method, _, _ in self.log:
+                by_method[method] = by_method.get(method, 0) + 1
+            return {"requests": len(self.log), "throttled": self.throttled, "connections": self.connections,
+                    "by_method": by_method, "log": [list(x) for x in self.log]}
+
+    def reset(self):
+        with self._lock:
+            self.log.clear()
+            self.throttled = 0
+            self.connections = 0
+
+    # -- HTTP ----------------------------------------------------------------
+    def handle(self, method: str, path: str, body: dict | None) -> tuple[int, dict, dict]:
+        u = urllib.parse.urlsplit(path)
+        parts = u.path.strip("/").split("/")
+        if u.path == "/_fake/stats" and method == "GET":
+            return 200, self.stats(), {}
+        if u.path == "/_fake/reset" and method == "POST":
+            self.reset()
+            return 200, {"ok": True}, {}
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            n = len(self.log) + 1
+            if self.rate_limit_every and n % self.rate_limit_every == 0:
+                self.log.append([method, u.path, 429])
+                self.throttled += 1
+                return 429, {"object": "error", "status": 429, "code": "rate_limited"}, {"Retry-After": "0"}
+            status, payload = self._dispatch(method, parts, urllib.parse.parse_qs(u.query), body)
+            self.log.append([method, u.path, status])
+            return status, payload, {}
+
+    def _dispatch(self, method: str, parts: list, q: dict, body: dict | None) -> tuple[int, dict]:
+        missing = (404, {"object": "error", "status": 404, "code": "object_not_found"})
+        if len(parts) == 3 and parts[:2] == ["v1", "pages"] and method == "GET":
+            pid = parts[2]
+            if pid not in self.page_edited or pid in self.blocks:
+                return missing
+            return 200, {"object": "page", "id": pid, "last_edited_time": self.page_edited[pid]}
+        if len(parts) < 3 or parts[:2] != ["v1", "blocks"]:
+            return missing
+        bid = parts[2]
+        if len(parts) == 3 and method == "DELETE":
+            b = self.delete(bid)
+            return (200, b) if b else missing
+        if len(parts) == 3 and method == "PATCH":
+            b = self.update(bid, body or {})
+            return (200, b) if b else missing
+        if len(parts) != 4 or parts[3] != "children" or bid not in self.kids:
+            return missing
+        if method == "GET":
+            lst = self.kids[bid]
+            size = min(int((q.get("page_size") or [MAX_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+            cursor = (q.get("start_cursor") or [None])[0]
+            start = lst.index(cursor) if cursor in lst else 0
+            page = lst[start:start + size]
+            more = start + size < len(lst)
+            return 200, {"object": "list", "results": [self.blocks[i] for i in page],
+                         "has_more": more, "next_cursor": lst[start + size] if more else None}
+        if method == "PATCH":
+            children = (body or {}).get("children")
+            if not isinstance(children, list):
+                return 400, {"object": "error", "status": 400, "code": "validation_error",
+                             "message": "body.children should be an array"}
+            if _too_many(children):
+                return 400, {"object": "error", "status": 400, "code": "validation_error",
+                             "message": f"body.children.length should be ≤ `{MAX_PAGE_SIZE}`"}
+            return 200, {"object": "list", "results": self.insert(bid, children, (body or {}).get("after"))}
+        return 405, {"object": "error", "status": 405, "code": "invalid_request"}
+
+    def start(self, port: int = 0) -> str:
+        """Serve on 127.0.0.1:<port> (0 = any free port) in a daemon thread; returns the API base URL."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like api.notion.com
+            disable_nagle_algorithm = True  # headers and body are two writes: no 40 ms delayed-ACK stall
+
+            def log_message(self, *a):
+                pass
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def _serve(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(n) if n else b""
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    body = None
+                status, payload, headers = fake.handle(self.command, self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_PATCH = do_POST = do_DELETE = _serve
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        if self._server is None:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Local fake of the Notion blocks API")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every API request")
+    ap.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    a = ap.parse_args()
+    fake = FakeNotion(a.latency, a.rate_limit_every).seed()
+    base = fake.start(a.port)
+    print(f"export QT_NOTION_API_BASE={base}")
+    print(f"export NOTION_API_KEY=fake NOTION_LOG_PAGE_ID={LOG_PAGE_ID} NOTION_TODO_PAGE_ID={TODO_PAGE_ID} "
+          f"QT_BIG_PICTURE_PAGE_ID={BIG_PICTURE_PAGE_ID}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
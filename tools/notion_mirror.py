@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Local mirror of the Notion Log, ToDo and Big Picture pages (`qtlog.sh --mirror`).
+
+The mirror is a snapshot file (notion_api.Snapshot format,
+~/.cache/qt/notion_mirror.json, QT_NOTION_MIRROR), so everything that replays
+snapshots reads it as is: `qtlog.sh --verify-all --from-mirror`,
+`verify_sop_automation.py --from-mirror`, and `search` below.
+
+`sync` is incremental after the first full pull (state in <mirror>.state.json):
+  - one GET pages/<id> per root: Notion stamps a page's last_edited_time for any
+    change inside it, so an unchanged page is reused from the mirror with no listing
+    (last_edited_time has minute precision: a page stamped within QT_MIRROR_WINDOW
+    seconds, default 120, before the previous sync counts as changed)
+  - in a changed page, a block is listed again when its last_edited_time changed
+    (its children were added or removed), it is new, or it was hot: stamped within
+    QT_MIRROR_HOT_HOURS (default 48) before the previous sync. Block stamps do not
+    reach ancestors, so the hot set (H1 "Log", today's day, fresh archive containers)
+    is what finds new entries; cold subtrees (older days) are reused
+  - an edit inside a cold subtree is picked up by the full pull, every
+    QT_MIRROR_FULL_DAYS days (default 7) or with `sync --full`
+
+    notion_mirror.py sync [--full]
+    notion_mirror.py search TEXT [--limit N] [--json]   blocks whose text contains TEXT, with their path
+    notion_mirror.py status
+Env: NOTION_API_KEY, NOTION_LOG_PAGE_ID, NOTION_TODO_PAGE_ID, QT_BIG_PICTURE_PAGE_ID (missing roots are skipped).
+"""
+from __future__ import annotations
+import argparse, calendar, fcntl, http.client, json, os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_api import (SNAPSHOT_ENV_KEYS, NotionError, Snapshot, _today_et, block_title, client_from_env,
+                        compact_block)
+
+ROOTS = (("log", "NOTION_LOG_PAGE_ID"), ("todo", "NOTION_TODO_PAGE_ID"), ("big_picture", "QT_BIG_PICTURE_PAGE_ID"))
+
+def mirror_path() -> str:
+    cache = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.getenv("QT_NOTION_MIRROR") or os.path.join(cache, "qt", "notion_mirror.json")
+
+def _epoch(iso: str | None) -> float:
+    """Notion timestamp (2026-01-05T14:25:00.000Z) -> epoch seconds; 0 when absent."""
+    if not iso:
+        return 0.0
+    try:
+        return float(calendar.timegm(time.strptime(iso[:19], "%Y-%m-%dT%H:%M:%S")))
+    except ValueError:
+        return 0.0
+
+def load(path: str) -> tuple[Snapshot | None, dict]:
+    try:
+        snap = Snapshot.load(path)
+    except (FileNotFoundError, ValueError):
+        return None, {}
+    try:
+        with open(path + ".state.json", encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        state = {}
+    return snap, state
+
+def save(path: str, snap: Snapshot, state: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        for target, text in ((path, snap.dumps()), (path + ".state.json", json.dumps(state, sort_keys=True))):
+            tmp = f"{target}.{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, target)
+
+class Sync:
+    def __init__(self, client, old: Snapshot | None, state: dict, full: bool, window: float, hot: float):
+        self.client, self.full = client, full or old is None
+        self.old = old.children if old and not self.full else {}
+        self.old_let = {b["id"]: b.get("last_edited_time", "") for kids in self.old.values() for b in kids}
+        self.fresh_after = (state.get("synced_at") or 0) - window
+        self.hot_after = (state.get("synced_at") or 0) - hot
+        self.children: dict[str, list] = {}
+        self.listed = self.reused = 0
+        self._lock = threading.Lock()
+
+    def _stale(self, block_id: str, let: str) -> bool:
+        return (self.full or block_id not in self.old or self.old_let.get(block_id) != let
+                or _epoch(let) >= self.hot_after)
+
+    def _reuse(self, block_id: str):
+        stack = [block_id]
+        while stack:
+            bid = stack.pop()
+            kids = self.old.get(bid)
+            if kids is None:
+                continue
+            with self._lock:
+                self.children[bid] = kids
+                self.reused += 1
+            stack += [b["id"] for b in kids if b.get("has_children")]
+
+    def walk(self, block_id: str):
+        kids = [compact_block(b) for b in self.client.children(block_id)]
+        with self._lock:
+            self.children[block_id] = kids
+            self.listed += 1
+        for b in kids:
+            if not b.get("has_children") or b["id"] in self.children:
+                continue
+            if self._stale(b["id"], b.get("last_edited_time", "")):
+                self.walk(b["id"])
+            else:
+                self._reuse(b["id"])
+
+    def root(self, page_id: str, old_let: str | None) -> str:
+        """Sync one page; returns its last_edited_time ("" when the page endpoint failed)."""
+        try:
+            let = self.client.call("GET", f"pages/{page_id}").get("last_edited_time", "")
+        except NotionError:
+            let = ""
+        if let and not self.full and page_id in self.old and let == old_let and _epoch(let) < self.fresh_after:
+            self._reuse(page_id)
+        else:
+            self.walk(page_id)
+        return let
+
+def sync(full: bool = False, path: str | None = None) -> int:
+    path = path or mirror_path()
+    roots = [(name, os.getenv(var, "").strip()) for name, var in ROOTS]
+    roots = [(n, p) for n, p in roots if p]
+    if not os.getenv("NOTION_API_KEY") or not roots:
+        print("MIRROR_SKIP=missing_env")
+        return 0
+    old, state = load(path)
+    started = time.time()
+    if time.time() - (state.get("full_at") or 0) > float(os.getenv("QT_MIRROR_FULL_DAYS", "7")) * 86400:
+        full = True
+    s = Sync(client_from_env(), old, state, full, float(os.getenv("QT_MIRROR_WINDOW", "120")),
+             float(os.getenv("QT_MIRROR_HOT_HOURS", "48")) * 3600)
+    try:
+        with ThreadPoolExecutor(max_workers=len(roots)) as pool:
+            lets = dict(zip((p for _, p in roots),
+                            pool.map(lambda r: s.root(r[1], (state.get("roots") or {}).get(r[1])), roots)))
+    except (NotionError, http.client.HTTPException, OSError) as e:
+        print(f"MIRROR_FAIL={e}")
+        return 1
+    env = {k: os.getenv(k, "").strip() for k in SNAPSHOT_ENV_KEYS}
+    save(path, Snapshot(s.children, day=_today_et(), env={k: v for k, v in env.items() if v}), {
+        "roots": lets, "synced_at": started, "full_at": started if s.full else state.get("full_at", 0)})
+    print(f"MIRROR_SYNC={'full' if s.full else 'incremental'} roots={len(roots)} listed={s.listed} "
+          f"reused={s.reused} listings={len(s.children)} file={path}")
+    return 0
+
+def _index(snap: Snapshot) -> tuple[dict, dict, dict]:
+    """(block by id, parent by id, root name by page id)."""
+    blocks, parent = {}, {}
+    for pid, kids in snap.children.items():
+        for b in kids:
+            blocks[b["id"]] = b
+            parent[b["id"]] = pid
+    names = {snap.env.get(var, ""): name for name, var in ROOTS if snap.env.get(var)}
+    return blocks, parent, names
+
+def search(text: str, limit: int = 50, path: str | None = None) -> list[dict]:
+    snap, _ = load(path or mirror_path())
+    if snap is None:
+        raise SystemExit(f"notion_mirror: no mirror at {path or mirror_path()} (run: qtlog.sh --mirror sync)")
+    blocks, parent, names = _index(snap)
+    want = text.lower()
+    out = []
+    for bid, b in blocks.items():
+        title = block_title(b)
+        if want not in title.lower():
+            continue
+        trail, cur = [], parent.get(bid)
+        while cur in blocks:
+            trail.append(block_title(blocks[cur]))
+            cur = parent.get(cur)
+        out.append({"root": names.get(cur, cur), "path": " > ".join(reversed(trail)), "text": title,
+                    "id": bid, "type": b.get("type", ""), "last_edited_time": b.get("last_edited_time", "")})
+    out.sort(key=lambda r: r["last_edited_time"], reverse=True)
+    return out[:limit] if limit > 0 else out
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="notion_mirror.py", description="Local mirror of the Log/ToDo/Big Picture pages")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("sync", help="pull changes since the last sync (full pull the first time)")
+    s.add_argument("--full", action="store_true", help="re-list every block")
+    q = sub.add_parser("search", help="blocks whose text contains TEXT (case-insensitive), newest first")
+    q.add_argument("text")
+    q.add_argument("--limit", type=int, default=50)
+    q.add_argument("--json", action="store_true")
+    sub.add_parser("status", help="mirror file, age and size")
+    a = ap.parse_args(argv)
+    if a.cmd == "sync":
+        return sync(a.full)
+    if a.cmd == "search":
+        rows = search(a.text, a.limit)
+        for r in rows:
+            print(json.dumps(r, ensure_ascii=False) if a.json else
+                  f"{r['last_edited_time'][:16]}  {r['root']}: {r['path'] + ' > ' if r['path'] else ''}{r['text']}")
+        return 0 if rows else 1
+    snap, state = load(mirror_path())
+    if snap is None:
+        print(f"MIRROR_STATUS=missing file={mirror_path()}")
+        return 1
+    age = int(time.time() - (state.get("synced_at") or 0))
+    print(f"MIRROR_STATUS=ok file={mirror_path()} day={snap.day} age_s={age} listings={len(snap.children)} "
+          f"blocks={sum(len(k) for k in snap.children.values())}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Rollover of the Notion Log and ToDo trees behind `qtlog.sh --rollover` (run by qtday).
+
+The active level (H1 "Log", the "ToDo" heading) keeps `__TOP__`, the newest
+QTLOG_ROLLOVER_KEEP day toggles (default 14; today always stays) and one
+"Archive" toggle, appended last. Older days move down into
+    Archive -> YYYY -> YYYY-MM -> YYYY-MM-DD
+where every container starts with its own `__TOP__` and new children go right
+after it, so each level reads newest-at-top like the active one
+(docs/SOP_NOTION_LOG_ORDERING.md) and every listing stays one small page.
+
+Notion cannot move blocks, so a day is copied and then deleted:
+    1. read the day's subtree (one listing per block with children) and check every
+       block type can be re-created (otherwise the day stays: ROLLOVER_SKIP)
+    2. create "<day> (copying)" in the month after its __TOP__, append the children
+       in order (a block whose children have none carries them inline)
+    3. retitle the copy "<day>", then DELETE the original
+A run that dies in between is finished by the next one: a "(copying)" leftover
+is deleted and redone; a finished copy only gets its original deleted.
+
+Copies have new block ids. Each moved day appends "<old id>\t<new id>\t<day>" for
+the day and every copied block to $QTLOG_STATE_DIR/notion_moved.tsv, so the
+notion_block_id of a JSONL log record still leads to its entry, and
+ROLLOVER_MOVED carries the original day id (id=...) so qtlog.sh drops it from
+the Log id cache.
+
+    notion_rollover.py [log|todo|all] [--keep N] [--max N] [--dry-run]
+Env: NOTION_API_KEY, NOTION_LOG_PAGE_ID, NOTION_TODO_PAGE_ID (missing -> ROLLOVER_SKIP=<tree>:missing_env);
+QTLOG_ROLLOVER_KEEP, QTLOG_ROLLOVER_MAX (days moved per tree per run, default 10; 0 = all).
+"""
+from __future__ import annotations
+import argparse, http.client, json, os, re, sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_api import NotionError, _today_et, block_title, client_from_env, state_dir, toggle_block, tree_lock
+
+TOP = "__TOP__"
+ARCHIVE = "Archive"
+COPYING = " (copying)"
+DAY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Types whose read shape can be sent back on create (child pages, databases, synced
+# blocks and Notion-hosted files cannot be re-created, so such a day is left in place).
+COPYABLE = {"paragraph", "heading_1", "heading_2", "heading_3", "toggle", "code", "quote", "callout",
+            "bulleted_list_item", "numbered_list_item", "to_do", "divider", "bookmark", "equation"}
+_TEXT_KEYS = ("rich_text", "caption")
+MAX_BATCH_BLOCKS = 900
+MAX_BATCH_BYTES = 400_000
+
+class RolloverError(Exception):
+    pass
+
+def _toggles(children: list) -> dict[str, str]:
+    """title -> id of the first toggle with that title."""
+    out: dict[str, str] = {}
+    for b in children:
+        if b.get("type") == "toggle":
+            out.setdefault(block_title(b), b.get("id", ""))
+    return out
+
+def _text_item(r: dict) -> dict:
+    t = r.get("type") or "text"
+    item = {"type": t, t: r.get(t) or {}}
+    if r.get("annotations"):
+        item["annotations"] = r["annotations"]
+    return item
+
+def creatable(b: dict) -> dict:
+    """A read block as a create payload (same type, text with its annotations/links, no children)."""
+    t = b["type"]
+    body = {k: v for k, v in (b.get(t) or {}).items() if k != "children"}
+    for k in _TEXT_KEYS:
+        if isinstance(body.get(k), list):
+            body[k] = [_text_item(r) for r in body[k]]
+    if (body.get("icon") or {}).get("type") == "file":
+        body.pop("icon")
+    return {"object": "block", "type": t, t: body}
+
+class Tree:
+    """One heading's rollover: its archive containers and the copy of each old day."""
+    def __init__(self, client, name: str, heading: str, dry_run: bool = False):
+        self.client, self.name, self.heading, self.dry_run = client, name, heading, dry_run
+        self.moved: list[tuple[str, str]] = []   # (original id, copy id) of the day being copied
+
+    def container(self, parent: str, title: str, kids: list | None = None, at_end: bool = False) -> str:
+        """Id of toggle `title` under parent, created (with a __TOP__) after parent's __TOP__ or at the end."""
+        kids = self.client.children(parent) if kids is None else kids
+        have = _toggles(kids)
+        if title in have:
+            return have[title]
+        after = None if at_end else have.get(TOP)
+        if not at_end and not after:
+            after = self.client.append(parent, [toggle_block(TOP)], after=None)[0]["id"]
+        return self.client.append(parent, [toggle_block(title, [toggle_block(TOP)])], after=after)[0]["id"]
+
+    # -- copy ----------------------------------------------------------------
+    def read_tree(self, block_id: str) -> list:
+        """[(block, children tree)] for block_id's whole subtree; RolloverError on a block that cannot be copied."""
+        out = []
+        for b in self.client.children(block_id):
+            if b.get("type") not in COPYABLE:
+                raise RolloverError(f"uncopyable_{b.get('type')}")
+            out.append((b, self.read_tree(b["id"]) if b.get("has_children") else []))
+        return out
+
+    def write_tree(self, parent: str, tree: list):
+        """Append `tree` under parent in order; leaf-only children ride inline, deeper ones recurse."""
+        batch: list[tuple[dict, list, str]] = []
+        size = [0, 0]   # blocks, bytes in the pending request
+
+        def flush():
+            if not batch:
+                return
+            made = self.client.append(parent, [p for p, _, _ in batch])
+            for (_, deeper, old), nb in zip(batch, made):
+                self.moved.append((old, nb["id"]))
+                if deeper:
+                    self.write_tree(nb["id"], deeper)
+            batch.clear()
+            size[0] = size[1] = 0
+
+        for b, kids in tree:
+            payload, deeper = creatable(b), kids
+            if kids and len(kids) <= 100 and not any(k for _, k in kids):
+                payload[payload["type"]]["children"] = [creatable(k) for k, _ in kids]
+                deeper = []
+            n, nbytes = 1 + len(payload[payload["type"]].get("children") or []), len(json.dumps(payload))
+            if batch and (len(batch) >= 100 or size[0] + n > MAX_BATCH_BLOCKS or size[1] + nbytes > MAX_BATCH_BYTES):
+                flush()
+            batch.append((payload, deeper, b.get("id", "")))
+            size[0] += n
+            size[1] += nbytes
+        flush()
+
+    def move_day(self, archive: str, day: str, day_id: str) -> str:
+        """Copy day_id into Archive/YYYY/YYYY-MM and delete it; returns the month path."""
+        year = self.container(archive, day[:4])
+        month = self.container(year, day[:7])
+        kids = self.client.children(month)
+        have = _toggles(kids)
+        path = f"{ARCHIVE}/{day[:4]}/{day[:7]}"
+        self.moved = [(day_id, have.get(day, ""))]
+        if day not in have:
+            tree = self.read_tree(day_id)
+            if day + COPYING in have:
+                self.client.call("DELETE", f"blocks/{have[day + COPYING]}")
+            copy = self.client.append(month, [toggle_block(day + COPYING)], after=have.get(TOP))[0]["id"]
+            self.moved[0] = (day_id, copy)
+            self.write_tree(copy, tree)
+            self.client.call("PATCH", f"blocks/{copy}", {"toggle": {"rich_text": toggle_block(day)["toggle"]["rich_text"]}})
+        self.client.call("DELETE", f"blocks/{day_id}")
+        record_moved(self.moved, day)
+        return path
+
+    def run(self, keep: int, limit: int, today: str) -> tuple[list[str], int]:
+        kids = self.client.children(self.heading)
+        days = sorted(((block_title(b), b["id"]) for b in kids
+                       if b.get("type") == "toggle" and DAY.match(block_title(b))), reverse=True)
+        recent = {d for d, _ in days[:keep]} | {today}
+        titles = [d for d, _ in days]
+        old = [(d, i) for d, i in reversed(days) if d not in recent and d < today and titles.count(d) == 1]
+        dupes = sorted({d for d in titles if titles.count(d) > 1 and d not in recent})
+        todo = old[:limit] if limit > 0 else old
+        out = [f"ROLLOVER_TREE={self.name} days={len(days)} keep={keep} old={len(old)}"
+               f"{' dry_run=1' if self.dry_run else ''}"]
+        if not todo or self.dry_run:
+            out += [f"ROLLOVER_WOULD_MOVE={self.name}:{d}" for d, _ in todo]
+            return out + [f"ROLLOVER_SKIP={self.name}:{d}:duplicate_day" for d in dupes], 0
+        rc = moved = 0
+        archive = self.container(self.heading, ARCHIVE, kids, at_end=True)
+        for d, i in todo:
+            try:
+                out.append(f"ROLLOVER_MOVED={self.name}:{d} -> {self.move_day(archive, d, i)} id={i}")
+                moved += 1
+            except RolloverError as e:
+                out.append(f"ROLLOVER_SKIP={self.name}:{d}:{e}")
+            except (NotionError, http.client.HTTPException, OSError, KeyError, IndexError) as e:
+                out.append(f"ROLLOVER_FAIL={self.name}:{d}:{e}")
+                rc = 1
+                break   # Notion is failing: stop; the next run resumes
+        out += [f"ROLLOVER_SKIP={self.name}:{d}:duplicate_day" for d in dupes]
+        out.append(f"ROLLOVER_REMAINING={self.name}:{len(old) - moved}")
+        return out, rc
+
+def record_moved(pairs: list[tuple[str, str]], day: str):
+    """Append the (original id, copy id) pairs of one moved day to notion_moved.tsv (one write)."""
+    lines = "".join(f"{old}\t{new}\t{day}\n" for old, new in pairs if old and new)
+    if not lines:
+        return
+    os.makedirs(state_dir(), exist_ok=True)
+    with open(os.path.join(state_dir(), "notion_moved.tsv"), "a", encoding="utf-8") as fh:
+        fh.write(lines)
+
+def _heading(client, page_id: str, name: str) -> str:
+    kinds = ("heading_1",) if name == "log" else ("heading_1", "heading_2", "heading_3")
+    title = "Log" if name == "log" else "ToDo"
+    return next((b.get("id", "") for b in client.children(page_id)
+                 if b.get("type") in kinds and block_title(b) == title), "")
+
+def rollover(name: str, page_id: str, keep: int, limit: int, dry_run: bool, today: str) -> tuple[list[str], int]:
+    if not os.getenv("NOTION_API_KEY") or not page_id:
+        return [f"ROLLOVER_SKIP={name}:missing_env"], 0
+    client = client_from_env()
+    with tree_lock(page_id):     # no day toggle is created while days move
+        try:
+            heading = _heading(client, page_id, name)
+        except (NotionError, http.client.HTTPException, OSError) as e:
+            return [f"ROLLOVER_FAIL={name}:{e}"], 1
+        if not heading:
+            return [f"ROLLOVER_FAIL={name}:heading_missing"], 1
+        return Tree(client, name, heading, dry_run).run(keep, limit, today)
+
+def run(which: str = "all", keep: int | None = None, limit: int | None = None, dry_run: bool = False) -> int:
+    """Roll the selected trees over concurrently; output Log first. Returns the first non-zero code."""
+    keep = int(os.getenv("QTLOG_ROLLOVER_KEEP", "14")) if keep is None else keep
+    limit = int(os.getenv("QTLOG_ROLLOVER_MAX", "10")) if limit is None else limit
+    if not 1 <= keep <= 90:
+        raise SystemExit("notion_rollover: --keep must be 1..90 (the active level must stay one listing page)")
+    today = _today_et()
+    trees = [(n, os.getenv(v, "").strip()) for n, v in (("log", "NOTION_LOG_PAGE_ID"), ("todo", "NOTION_TODO_PAGE_ID"))
+             if which in (n, "all")]
+    rc = 0
+    with ThreadPoolExecutor(max_workers=len(trees)) as pool:
+        futures = [pool.submit(rollover, n, p, keep, limit, dry_run, today) for n, p in trees]
+        for f in futures:
+            lines, code = f.result()
+            print("\n".join(lines), flush=True)
+            rc = rc or code
+    return rc
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="notion_rollover.py", description="Move old Log/ToDo days into Archive/YYYY/YYYY-MM")
+    ap.add_argument("which", nargs="?", choices=("log", "todo", "all"), default="all")
+    ap.add_argument("--keep", type=int, help="recent days left at the top level (default QTLOG_ROLLOVER_KEEP or 14)")
+    ap.add_argument("--max", type=int, dest="limit", help="days moved per tree this run (default QTLOG_ROLLOVER_MAX or 10; 0 = all)")
+    ap.add_argument("--dry-run", action="store_true", help="list the days that would move")
+    a = ap.parse_args(argv)
+    return run(a.which, a.keep, a.limit, a.dry_run)
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+One Python process for the Notion calls of one qtlog.sh run (notion_session_start).
+
+Without it every notion_http call and every big-payload upload started its own
+`notion_api.py request` / `notion_upload.py` process: interpreter start-up and a
+TLS handshake per call, and no keep-alive connection outlived one call. The
+session runs those same CLIs in-process, one request at a time, on the shared
+client (notion_api.client_for), so a log write (resolve, entry insert, upload)
+or a whole --flush/--sync (reconcile, resolve per day, chunk PATCHes) goes over
+one connection.
+
+Protocol, on the stdin/stdout pipes of a bash coprocess:
+    request   {"argv": ["notion_api" | "notion_upload", <CLI args>...], "stdin": "<text>"}\\n
+    reply     "<exit code> <byte length>\\n" followed by that many bytes of the CLI's stdout
+stderr passes straight through. The session ends at EOF on stdin, or once the
+qtlog.sh that started it is gone.
+
+    notion_session.py
+"""
+from __future__ import annotations
+import contextlib, io, json, os, sys, threading, time, traceback
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import notion_api, notion_upload
+
+TOOLS = {"notion_api": notion_api.main, "notion_upload": notion_upload.main}
+
+def call(argv: list[str], stdin: str = "") -> tuple[int, bytes]:
+    """Run one CLI invocation in-process: (exit code, its stdout)."""
+    tool = TOOLS.get(argv[0] if argv else "")
+    if tool is None:
+        print(f"notion_session: unknown tool: {' '.join(argv[:1])}", file=sys.stderr)
+        return 2, b""
+    out, saved = io.StringIO(), sys.stdin
+    sys.stdin = io.TextIOWrapper(io.BytesIO(stdin.encode("utf-8")), encoding="utf-8")
+    try:
+        with contextlib.redirect_stdout(out):
+            rc = tool(argv[1:])
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            print(e.code, file=sys.stderr)
+        rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        rc = 1
+    finally:
+        sys.stdin = saved
+    return rc, out.getvalue().encode("utf-8")
+
+def _exit_with(parent: int):
+    # A background child of qtlog.sh may still hold the write end of our stdin.
+    while os.getppid() == parent:
+        time.sleep(0.5)
+    os._exit(0)
+
+def serve(inp, out) -> int:
+    threading.Thread(target=_exit_with, args=(os.getppid(),), daemon=True).start()
+    for line in iter(inp.readline, b""):
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+            rc, data = call([str(a) for a in req.get("argv") or []], req.get("stdin") or "")
+        except ValueError as e:
+            print(f"notion_session: bad request: {e}", file=sys.stderr)
+            rc, data = 2, b""
+        out.write(f"{rc} {len(data)}\n".encode() + data)
+        out.flush()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(serve(sys.stdin.buffer, sys.stdout.buffer))
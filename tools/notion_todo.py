@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+ToDo items behind `qtlog.sh --todo ITEM` and `qtlog.sh --todo-file FILE|-`.
+
+Each item becomes a CEI entry toggle
+    YYYY-MM-DD HHMM <STATUS_EMOJI> <text> [DEVICE]
+with empty Work done / Notes / Next steps toggles inline, inserted after the
+day __TOP__ of today's toggle under the "ToDo" heading (newest-at-top,
+docs/SOP_NOTION_LOG_ORDERING.md). A text that already starts with
+"YYYY-MM-DD HHMM " keeps its own timestamp.
+
+One discovery (ToDo page, heading and day listings; a missing __TOP__ or day
+toggle is created as before, under the ToDo tree's create-once lock), then one
+PATCH per 100 items. Chunks go oldest
+first and each lists its items newest first, so the day reads exactly as if
+the items had been added one by one in input order. Titles are JSON-encoded,
+so quotes and backslashes in an item are kept as typed.
+
+Input file: one item per line (blank lines skipped), or JSON lines
+{"text": ..., "status_emoji": ..., "device": ...} (STATUS_EMOJI / DEVICE also accepted).
+If a PATCH fails, TODO_FAIL reports how many items went in; `--skip N` resumes
+the same input without duplicating them.
+
+    notion_todo.py [ITEM ...] [--file FILE|-] [--device D] [--emoji E] [--day YYYY-MM-DD] [--skip N] [--dry-run]
+Env: NOTION_API_KEY, NOTION_TODO_PAGE_ID, STATUS_EMOJI (default 🟦).
+"""
+from __future__ import annotations
+import argparse, http.client, json, os, re, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_api import NotionError, block_title, client_from_env, toggle_block, tree_lock
+
+TOP = "__TOP__"
+CHUNK = 100
+SECTIONS = ("Work done", "Notes", "Next steps")
+STAMPED = re.compile(r"^(\d{4}-\d{2}-\d{2}) ?(\d{4})\s+(.*)$", re.S)
+
+class TodoError(Exception):
+    pass
+
+def _ts_et() -> str:
+    try:
+        from zoneinfo import ZoneInfo
+        return __import__("datetime").datetime.now(ZoneInfo("America/Toronto")).strftime("%Y-%m-%d %H%M")
+    except Exception:
+        return time.strftime("%Y-%m-%d %H%M")
+
+def cei_title(text: str, ts: str, emoji: str, device: str) -> str:
+    """'YYYY-MM-DD HHMM <emoji> <text> [DEVICE]' (first line of text, capped like Log titles)."""
+    text = text.splitlines()[0].strip() if text.strip() else ""
+    m = STAMPED.match(text)
+    if m:
+        ts, text = f"{m.group(1)} {m.group(2)}", m.group(3)
+    return f"{ts} {emoji} {text[:1800]} [{device}]"
+
+def entry_block(title: str) -> dict:
+    return toggle_block(title, [toggle_block(s) for s in SECTIONS])
+
+def parse_items(lines, emoji: str, device: str) -> list[dict]:
+    """Input lines -> [{text, emoji, device}]; TodoError names the first bad JSON line."""
+    out = []
+    for n, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if line.lstrip().startswith("{"):
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                raise TodoError(f"line {n}: bad JSON ({e})")
+            text = str(rec.get("text") or rec.get("item") or "")
+            if not text.strip():
+                raise TodoError(f"line {n}: no text")
+            out.append({"text": text,
+                        "emoji": str(rec.get("status_emoji") or rec.get("STATUS_EMOJI") or emoji),
+                        "device": str(rec.get("device") or rec.get("DEVICE") or device)})
+        else:
+            out.append({"text": line, "emoji": emoji, "device": device})
+    return out
+
+def resolve_day(client, page_id: str, day: str, err=None) -> tuple[str, str]:
+    """(day toggle id, day __TOP__ id) under the ToDo heading, creating what is missing."""
+    heading = client.find_heading(page_id, "todo", ignore_case=True)
+    if not heading:
+        raise TodoError("todo_heading_missing")
+    kids = client.children(heading)
+    ids = {block_title(b): b.get("id", "") for b in reversed(kids) if b.get("type") == "toggle"}
+    top = ids.get(TOP)
+    if not top:
+        top = client.append(heading, [toggle_block(TOP)])[0]["id"]
+        print("qtlog: created ToDo __TOP__ anchor (please drag it to FIRST under 'ToDo' if verify fails)",
+              file=err or sys.stderr)
+    day_id = ids.get(day)
+    if not day_id:
+        day_id = client.append(heading, [toggle_block(day, [toggle_block(TOP)])], after=top)[0]["id"]
+    # The day __TOP__ is normally its first child: one page_size=1 read; else search the whole day.
+    day_top = ""
+    for limit in (1, None):
+        day_top = next((b.get("id", "") for b in client.children(day_id, limit)
+                        if b.get("type") == "toggle" and block_title(b) == TOP), "")
+        if day_top:
+            break
+    if not day_top:
+        day_top = client.append(day_id, [toggle_block(TOP)])[0]["id"]
+        print(f"qtlog: created day __TOP__ anchor (please drag it to FIRST inside {day} if verify fails)",
+              file=err or sys.stderr)
+    return day_id, day_top
+
+def add(items: list[dict], day: str, ts: str, dry_run: bool = False, env: dict | None = None,
+        out=None, err=None) -> int:
+    """
+    Write items under the day toggle; returns the exit code. env (default os.environ) and
+    out/err (default stdout/stderr) are explicit so the daemon can run it on its warm client.
+    """
+    env = os.environ if env is None else env
+    out = out or sys.stdout
+    titles = [cei_title(i["text"], ts, i["emoji"], i["device"]) for i in items]
+    page_id = env.get("NOTION_TODO_PAGE_ID", "").strip()
+    if dry_run:
+        print("qtlog DRY-RUN (todo)", file=out)
+        print(f"  Notion ToDo page id: {page_id}", file=out)
+        for t in titles:
+            print(f"  CEI_TITLE: {t}", file=out)
+        print(f"  DRY-RUN OK: Notion write skipped ({len(titles)} item(s), {-(-len(titles) // CHUNK)} PATCH)",
+              file=out)
+        return 0
+    if not titles:
+        print("TODO_ADDED=0", file=out)
+        return 0
+    client = client_from_env(env)
+    written = 0
+    try:
+        with tree_lock(page_id, env):
+            day_id, day_top = resolve_day(client, page_id, day, err)
+        for i in range(0, len(titles), CHUNK):
+            chunk = titles[i:i + CHUNK]
+            client.append(day_id, [entry_block(t) for t in reversed(chunk)], after=day_top)
+            written += len(chunk)
+    except TodoError as e:
+        print(f"TODO_FAIL={e}", file=out)
+        return 1
+    except (NotionError, http.client.HTTPException, OSError, KeyError, IndexError) as e:
+        print(f"TODO_FAIL={e} written={written} (resume: notion_todo.py ... --skip {written})", file=out)
+        return 1
+    print(f"TODO_ADDED={written} day={day}", file=out)
+    return 0
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="notion_todo.py", description="Add CEI items under today's ToDo day toggle")
+    ap.add_argument("items", nargs="*", help="item texts (added in order)")
+    ap.add_argument("--file", help="one item (or JSON object) per line; - reads stdin")
+    ap.add_argument("--device", default=os.getenv("DEVICE") or "Device")
+    ap.add_argument("--emoji", default=os.getenv("STATUS_EMOJI") or "🟦")
+    ap.add_argument("--day", help="day toggle (default: the ET day of the timestamp)")
+    ap.add_argument("--skip", type=int, default=0, help="leave out the first N items (resume)")
+    ap.add_argument("--dry-run", action="store_true")
+    a = ap.parse_args(argv)
+    items = [{"text": t, "emoji": a.emoji, "device": a.device} for t in a.items]
+    try:
+        if a.file:
+            fh = sys.stdin if a.file == "-" else open(a.file, encoding="utf-8")
+            with fh:
+                items += parse_items(fh, a.emoji, a.device)
+    except (OSError, TodoError) as e:
+        print(f"notion_todo: {e}", file=sys.stderr)
+        return 2
+    ts = _ts_et()
+    return add(items[a.skip:], a.day or ts[:10], ts, a.dry_run)
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
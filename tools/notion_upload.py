@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Streaming big-text uploader: text -> Notion "plain text" code blocks under one parent.
+
+The source is read incrementally and cut on line boundaries into chunks of at
+most CHUNK_CHARS characters (a longer line is split between characters, never
+inside a UTF-8 sequence). Chunks are sent in batches of at most 100 blocks /
+BATCH_BYTES of JSON (Notion's per-request limits), in order. The next batches
+are read and encoded while the current PATCH is in flight (QT_NOTION_UPLOAD_AHEAD
+batches ahead, default 2). Sends themselves stay sequential so the blocks keep
+their order.
+
+Resume: with --state FILE, progress (blocks done, batch in flight) is written
+after every batch. Rerunning the same command skips what landed. A batch whose
+response was lost is checked against the parent's tail before being re-sent.
+The state records its parent and source (--source, default "file:<real path>" or
+"stdin"); a state left by another upload is ignored rather than resumed.
+The state file is removed on success.
+
+    notion_upload.py append <parent_id> [--file F | stdin] [--skip-first-line] [--skip-blocks N] [--state FILE] [--source ID]
+    notion_upload.py blocks [--file F | stdin] [--skip-first-line] [--limit 100]
+        -> {"blocks": [first batch], "more": bool}, for sending the first batch inline with an insert
+"""
+from __future__ import annotations
+import argparse, http.client, io, json, os, queue, sys, threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_api import MAX_PAGE_SIZE, NotionError, client_from_env, flush_recording
+
+CHUNK_CHARS = 1400
+BATCH_BYTES = 400_000   # Notion caps a request body at 500 KB
+
+def iter_chunks(stream, size: int = CHUNK_CHARS, skip_first_line: bool = False):
+    """Yield text chunks of <= size chars, cut after a newline whenever a line fits."""
+    buf = ""
+    for n, line in enumerate(stream):
+        if skip_first_line and n == 0:
+            continue
+        while len(line) > size:                      # a single over-long line
+            if buf:
+                yield buf
+                buf = ""
+            yield line[:size]
+            line = line[size:]
+        if len(buf) + len(line) > size:
+            yield buf
+            buf = ""
+        buf += line
+    if buf.strip():
+        yield buf
+
+def code_block(text: str) -> dict:
+    return {"object": "block", "type": "code",
+            "code": {"rich_text": [{"type": "text", "text": {"content": text}}], "language": "plain text"}}
+
+def iter_batches(chunks, max_blocks: int = MAX_PAGE_SIZE, max_bytes: int = BATCH_BYTES):
+    """Group chunks into lists of code blocks that fit in one PATCH."""
+    batch, used = [], 0
+    for c in chunks:
+        b = code_block(c)
+        n = len(json.dumps(b, ensure_ascii=False).encode("utf-8"))
+        if batch and (len(batch) >= max_blocks or used + n > max_bytes):
+            yield batch
+            batch, used = [], 0
+        batch.append(b)
+        used += n
+    if batch:
+        yield batch
+
+def _code_text(b: dict) -> str:
+    # plain_text on blocks read back from Notion, text.content on the blocks we build
+    if b.get("type") != "code":
+        return ""
+    return "".join(x.get("plain_text") or (x.get("text") or {}).get("content", "")
+                   for x in b["code"].get("rich_text") or [])
+
+class Uploader:
+    def __init__(self, client, parent_id: str, state_path: str | None = None, ahead: int | None = None,
+                 source: str = ""):
+        self.client = client
+        self.parent = parent_id
+        self.source = source
+        self.state_path = state_path
+        self.ahead = max(1, int(os.getenv("QT_NOTION_UPLOAD_AHEAD", "2")) if ahead is None else ahead)
+        self.state = {"parent": parent_id, "source": source, "done": 0, "pending": None}
+
+    # -- resume state ----------------------------------------------------------
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding="utf-8") as fh:
+            st = json.load(fh)
+        # Resume only the same upload: another source under the same parent starts from 0.
+        if st.get("parent") == self.parent and st.get("source", "") == self.source:
+            self.state = st
+
+    def _save(self):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp = f"{self.state_path}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.state, fh)
+        os.replace(tmp, self.state_path)
+
+    def _pending_landed(self) -> bool:
+        """Did the batch whose response was lost make it? Compare the parent's tail with it."""
+        texts = self.state["pending"]
+        tail = [_code_text(b) for b in self.client.children(self.parent)[-len(texts):]]
+        return tail == texts
+
+    # -- upload ----------------------------------------------------------------
+    def upload(self, chunks, skip_blocks: int = 0) -> int:
+        """Send every chunk after the first skip_blocks (plus whatever a previous run finished). Returns blocks sent."""
+        self._load()
+        if self.state["pending"]:
+            if self._pending_landed():
+                self.state["done"] += len(self.state["pending"])
+            self.state["pending"] = None
+            self._save()
+        skip = skip_blocks + self.state["done"]
+
+        q: queue.Queue = queue.Queue(maxsize=self.ahead)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                seen = 0
+                for batch in iter_batches(chunks):
+                    if seen + len(batch) <= skip:
+                        seen += len(batch)
+                        continue
+                    if seen < skip:                      # batch straddles the resume point
+                        batch, seen = batch[skip - seen:], skip
+                    seen += len(batch)
+                    if not put(batch):
+                        return
+            except BaseException as e:                   # surfaced by the sender
+                put(e)
+                return
+            put(None)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        sent = 0
+        try:
+            while True:
+                batch = q.get()
+                if batch is None:
+                    break
+                if isinstance(batch, BaseException):
+                    raise batch
+                self.state["pending"] = [_code_text(b) for b in batch]
+                self._save()
+                self.client.append(self.parent, batch)
+                self.state["done"] += len(batch)
+                self.state["pending"] = None
+                self._save()
+                sent += len(batch)
+        finally:
+            stop.set()
+            worker.join(timeout=5)
+        if self.state_path and os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        return sent
+
+def _open_source(path: str | None):
+    if path:
+        return open(path, encoding="utf-8", errors="replace", newline="")
+    return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace", newline="")
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="notion_upload.py", description="Stream big text into Notion code blocks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a_ = sub.add_parser("append", help="append the text under a block, in 100-block batches")
+    a_.add_argument("parent_id")
+    a_.add_argument("--state", help="resume file (progress is kept there until the upload completes)")
+    a_.add_argument("--skip-blocks", type=int, default=0, help="chunks already written elsewhere (e.g. inline)")
+    a_.add_argument("--source", help='what is uploaded, kept in the state (default "file:<real path>" or "stdin")')
+    b = sub.add_parser("blocks", help="print the first batch of code blocks (and whether more follow) as JSON")
+    b.add_argument("--limit", type=int, default=MAX_PAGE_SIZE)
+    for p in (a_, b):
+        p.add_argument("--file", help="source file (default stdin)")
+        p.add_argument("--skip-first-line", action="store_true", help="drop line 1 (the entry title)")
+    a = ap.parse_args(argv)
+
+    with _open_source(a.file) as src:
+        chunks = iter_chunks(src, skip_first_line=a.skip_first_line)
+        if a.cmd == "blocks":
+            batches = iter_batches(chunks, a.limit)
+            first = next(batches, [])
+            more = next(batches, None) is not None
+            print(json.dumps({"blocks": first, "more": more}, ensure_ascii=False))
+            return 0
+        source = a.source or (f"file:{os.path.realpath(a.file)}" if a.file else "stdin")
+        up = Uploader(client_from_env(), a.parent_id, a.state, source=source)
+        try:
+            n = up.upload(chunks, a.skip_blocks)
+        except (NotionError, http.client.HTTPException, OSError) as e:
+            print(f"notion_upload: stopped after {up.state['done']} blocks: {e}", file=sys.stderr)
+            if a.state:
+                print(f"notion_upload: rerun the same command to resume (state: {a.state})", file=sys.stderr)
+            return 1
+        finally:
+            flush_recording()
+    print(f"notion_upload: {n} code blocks appended to {a.parent_id}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
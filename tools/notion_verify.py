@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Read-only Notion structure checks behind `qtlog.sh --verify`, `--verify-all` and
+`--verify-todo` (same VERIFY_* / H1_* / DAY_* / TODO_* key=value output as the
+old per-check curl+jq pipelines).
+
+Every parent's children are listed once per run (Listings), and the Log and
+ToDo checks run concurrently on the shared client; output is still printed Log
+first, and a failing Log check stops before the ToDo output, as before.
+
+    Log:  page -> H1 "Log" (H1_FIRST, today's day toggle) -> day toggle (DAY_FIRST, DAY_SECOND)
+    ToDo: page -> "ToDo" heading (TODO_FIRST, TODO_SECOND) -> __TOP__ (TODO_TOP_CHILDREN)
+
+    notion_verify.py [log|todo|all] [--day YYYY-MM-DD]
+Env: NOTION_API_KEY, NOTION_LOG_PAGE_ID, NOTION_TODO_PAGE_ID (missing -> VERIFY_SKIP=missing_env);
+QTLOG_VERIFY_DAY pins the Log day (snapshot replay).
+"""
+from __future__ import annotations
+import argparse, http.client, os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from notion_api import NotionError, _today_et, block_title, client_from_env, flush_recording
+
+class Listings:
+    """Children per parent, fetched once and shared between threads (a limit-N read serves any N' <= N)."""
+    def __init__(self, client, err=None):
+        self.client, self.err = client, err
+        self._lock = threading.Lock()
+        self._keys: dict[str, threading.Lock] = {}
+        self._got: dict[str, tuple[list, int | None]] = {}
+
+    def get(self, block_id: str, limit: int | None = None) -> list:
+        with self._lock:
+            key_lock = self._keys.setdefault(block_id, threading.Lock())
+        with key_lock:
+            have = self._got.get(block_id)
+            if have and (have[1] is None or (limit is not None and limit <= have[1])):
+                return have[0] if limit is None else have[0][:limit]
+            try:
+                out = self.client.children(block_id, limit)
+            except (NotionError, http.client.HTTPException, OSError) as e:
+                # Same outcome as the jq pipelines on an error body: an empty listing.
+                print(f"notion_verify: listing {block_id} failed: {e}", file=self.err or sys.stderr)
+                out = []
+            self._got[block_id] = (out, limit)
+            return out
+
+    def forget(self, block_id: str):
+        """Drop a listing that a write just changed (the next get() lists it again)."""
+        with self._lock:
+            self._got.pop(block_id, None)
+
+def _now_et() -> str:
+    try:
+        from zoneinfo import ZoneInfo
+        return __import__("datetime").datetime.now(ZoneInfo("America/Toronto")).strftime("%Y-%m-%d %H%M ET")
+    except Exception:
+        return time.strftime("%Y-%m-%d %H%M ET")
+
+def _first_text(b: dict) -> str:
+    rt = (b.get(b.get("type", ""), {}) or {}).get("rich_text") or []
+    return (rt[0].get("plain_text") or "") if rt else ""
+
+def _toggle_title(b: dict | None, default: str) -> str:
+    return block_title(b) if b and b.get("type") == "toggle" else default
+
+def verify_log(ls: Listings | None, page_id: str, day: str) -> tuple[list[str], int]:
+    out = [f"VERIFY_TIME={_now_et()}"]
+    if ls is None or not page_id:
+        return out + ["VERIFY_SKIP=missing_env"], 0
+    h1 = next((b.get("id", "") for b in ls.get(page_id)
+               if b.get("type") == "heading_1" and block_title(b) == "Log"), "")
+    if not h1:
+        return out + ["VERIFY_FAIL: missing H1 Log"], 1
+    h1_children = ls.get(h1)
+    h1_first = _toggle_title(h1_children[0] if h1_children else None, "NOT_TOGGLE")
+    day_id = next((b.get("id", "") for b in h1_children
+                   if b.get("type") == "toggle" and _first_text(b) == day), "")
+    if not day_id:
+        return out + ["VERIFY_FAIL: missing day toggle"], 1
+    day_children = ls.get(day_id, 3)
+    day_first = _toggle_title(day_children[0] if day_children else None, "NOT_TOGGLE")
+    day_second = _toggle_title(day_children[1] if len(day_children) > 1 else None, "")
+    return out + [f"H1_FIRST={h1_first}", f"DAY_FIRST={day_first}", f"DAY_SECOND={day_second}"], 0
+
+def verify_todo(ls: Listings | None, page_id: str) -> tuple[list[str], int]:
+    out = [f"VERIFY_TIME={_now_et()}"]
+    if ls is None or not page_id:
+        return out + ["VERIFY_SKIP=missing_env"], 0
+    heading = next((b.get("id", "") for b in ls.get(page_id)
+                    if b.get("type") in ("heading_1", "heading_2", "heading_3") and block_title(b) == "ToDo"), "")
+    out.append(f"TODO_H_ID={heading}")
+    if not heading:
+        return out + ["VERIFY_FAIL=todo_heading_missing"], 1
+    kids = ls.get(heading, 3)
+    first = _toggle_title(kids[0] if kids else None, "NOT_TOGGLE")
+    second = _toggle_title(kids[1] if len(kids) > 1 else None, "EMPTY")
+    out += [f"TODO_FIRST={first}", f"TODO_SECOND={second}"]
+    if first != "__TOP__":
+        return out + ["VERIFY_FAIL=todo_top_anchor_missing_or_not_first"], 1
+    if second == "NOT_TOGGLE":
+        return out + ["VERIFY_FAIL=todo_second_not_toggle"], 1
+    top_id = kids[0].get("id", "")
+    if top_id:
+        n = len(ls.get(top_id, 1))
+        out.append(f"TODO_TOP_CHILDREN={n}")
+        if n:
+            return out + ["VERIFY_FAIL=todo_top_anchor_not_empty"], 1
+    return out, 0
+
+def run(which: str = "all", day: str | None = None, env: dict | None = None, out=None, err=None) -> int:
+    """
+    Run the selected checks, print their output in Log, ToDo order; returns the exit code.
+    env (default os.environ) and out/err (default stdout/stderr) are explicit so the
+    daemon can serve a request's environment from any thread without touching the process's.
+    """
+    env = os.environ if env is None else env
+    day = day or env.get("QTLOG_VERIFY_DAY", "").strip() or _today_et()
+    log_page = env.get("NOTION_LOG_PAGE_ID", "").strip()
+    todo_page = env.get("NOTION_TODO_PAGE_ID", "").strip()
+    ls = Listings(client_from_env(env), err) if env.get("NOTION_API_KEY") else None
+    checks = []
+    if which in ("log", "all"):
+        checks.append(lambda: verify_log(ls, log_page, day))
+    if which in ("todo", "all"):
+        checks.append(lambda: verify_todo(ls, todo_page))
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+            futures = [pool.submit(c) for c in checks]
+            for f in futures:
+                lines, rc = f.result()
+                print("\n".join(lines), file=out or sys.stdout, flush=True)
+                if rc:
+                    return rc
+    finally:
+        flush_recording(env)
+    return 0
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="notion_verify.py", description="Read-only Notion Log/ToDo structure checks")
+    ap.add_argument("which", nargs="?", choices=("log", "todo", "all"), default="all")
+    ap.add_argument("--day", help="Log day toggle to check (default QTLOG_VERIFY_DAY or today ET)")
+    a = ap.parse_args(argv)
+    return run(a.which, a.day)
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
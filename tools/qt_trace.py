@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Opt-in run tracing (QTLOG_TRACE=1): timed spans appended to a JSONL file.
+
+One object per span, written with a single O_APPEND write (bash and every
+Python tool of a run append to the same file):
+    {"run": "<id>", "span": "notion.request", "ts": 1760000000.123, "ms": 84.2, "pid": 4242, ...attrs}
+`run` comes from QTLOG_TRACE_RUN (qtlog.sh exports it, so child tools join the
+run); the file is QTLOG_TRACE_FILE (default <QTLOG_STATE_DIR>/trace.jsonl) and
+is rotated to trace.jsonl.1 past QTLOG_TRACE_MAX_BYTES (default 2 MB).
+
+Spans: run, env.load, sop_env_check, log.append, notion.write, notion.request
+(method, endpoint, status, bytes, attempts), git.pull, git.commit, git.push,
+daemon.request, verify.* (tools/verify_sop_automation.py).
+
+    qt_trace.py summary [--runs 20] [--json] [--file F]   p50/p95 per span over the last N runs
+"""
+from __future__ import annotations
+import argparse, contextlib, json, os, re, sys, time
+
+_ID = re.compile(r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}")
+_own_run = f"{os.getpid()}-{int(time.time() * 1000)}"
+
+def enabled(env=None) -> bool:
+    return (env or os.environ).get("QTLOG_TRACE", "0") == "1"
+
+def trace_file(env=None) -> str:
+    env = env or os.environ
+    state = env.get("QTLOG_STATE_DIR") or os.path.join(
+        env.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"), "qt")
+    return env.get("QTLOG_TRACE_FILE") or os.path.join(state, "trace.jsonl")
+
+def endpoint(path: str) -> str:
+    """Notion path with block/page ids and the query string dropped: blocks/:id/children."""
+    return _ID.sub(":id", path.split("?", 1)[0].lstrip("/"))
+
+def record(span: str, start: float, ms: float, env=None, **attrs):
+    """Append one finished span (start: epoch seconds). No-op unless QTLOG_TRACE=1."""
+    if not enabled(env):
+        return
+    env = env or os.environ
+    rec = {"run": env.get("QTLOG_TRACE_RUN") or _own_run, "span": span, "ts": round(start, 3),
+           "ms": round(ms, 1), "pid": os.getpid(), **attrs}
+    path = trace_file(env)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, (json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass                                         # tracing never breaks a run
+
+@contextlib.contextmanager
+def span(name: str, env=None, **attrs):
+    """Time the block; attributes can be filled in while it runs (`with span(..) as s: s["status"] = 200`)."""
+    if not enabled(env):
+        yield attrs
+        return
+    t0, p0 = time.time(), time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        record(name, t0, (time.perf_counter() - p0) * 1000, env, **attrs)
+
+def read_spans(path: str):
+    for p in (f"{path}.1", path):
+        try:
+            with open(p, encoding="utf-8", errors="replace") as fh:
+                for line in fh:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue                     # torn line from a crashed writer
+        except FileNotFoundError:
+            continue
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    v = sorted(values)
+    return v[max(0, min(len(v) - 1, int(-(-q * len(v) // 100)) - 1))]
+
+def summary(path: str, runs: int = 20) -> dict:
+    """{"runs": n, "spans": [{span, n, p50, p95, max}]} over the last `runs` runs (by first appearance)."""
+    order: dict[str, None] = {}
+    spans = []
+    for s in read_spans(path):
+        if "run" in s and "span" in s and isinstance(s.get("ms"), (int, float)):
+            order.setdefault(s["run"], None)
+            spans.append(s)
+    keep = set(list(order)[-runs:]) if runs > 0 else set(order)
+    per: dict[str, list[float]] = {}
+    for s in spans:
+        if s["run"] in keep:
+            per.setdefault(s["span"], []).append(float(s["ms"]))
+    rows = [{"span": k, "n": len(v), "p50": percentile(v, 50), "p95": percentile(v, 95), "max": max(v)}
+            for k, v in per.items()]
+    rows.sort(key=lambda r: -r["p95"])
+    return {"runs": len(keep), "spans": rows}
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="qt_trace.py", description="Summarise qtlog trace spans")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("summary", help="p50/p95 per span over the last N runs")
+    s.add_argument("--runs", type=int, default=20)
+    s.add_argument("--file", default=None)
+    s.add_argument("--json", action="store_true")
+    a = ap.parse_args(argv)
+    res = summary(a.file or trace_file(), a.runs)
+    if a.json:
+        print(json.dumps(res))
+        return 0
+    if not res["spans"]:
+        print(f"trace runs=0 (no spans in {a.file or trace_file()}; enable with QTLOG_TRACE=1)")
+        return 0
+    for r in res["spans"]:
+        print(f"trace runs={res['runs']} span={r['span']} n={r['n']} p50={r['p50']:.0f}ms p95={r['p95']:.0f}ms max={r['max']:.0f}ms")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
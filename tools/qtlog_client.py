@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Thin client for tools/qtlog_daemon.py: sends qtlog.sh's argv over the daemon's
+Unix socket and prints its answer. Stdlib only and no site import (run with
+`python -S`), so a logged line costs a socket round trip instead of a full
+qtlog.sh run.
+
+    qtlog_client.py <qtlog.sh arguments...>
+
+Exit 75 (EX_TEMPFAIL) means "not handled": no daemon, a stale socket, or a
+request the daemon does not serve. qtlog.sh then runs the request in-process.
+Once the request was sent it is never handed back (it may already be logged).
+"""
+import json, os, socket, sys
+
+NOT_HANDLED = 75
+FORWARD_ENV = ("QTLOG_", "QT_", "NOTION_")
+FORWARD_KEYS = ("LOG_MODE", "STATUS_EMOJI")
+
+def socket_path() -> str:
+    state = os.environ.get("QTLOG_STATE_DIR") or os.path.join(
+        os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"), "qt")
+    return os.environ.get("QTLOG_DAEMON_SOCKET") or os.path.join(state, "qtlog.sock")
+
+def main(argv: list) -> int:
+    if os.environ.get("QTLOG_DAEMON", "1") == "0":
+        return NOT_HANDLED
+    env = {k: v for k, v in os.environ.items() if k.startswith(FORWARD_ENV) or k in FORWARD_KEYS}
+    req = json.dumps({"argv": argv, "env": env, "cwd": os.getcwd()}).encode("utf-8") + b"\n"
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.settimeout(float(os.environ.get("QTLOG_DAEMON_TIMEOUT", "120")))
+        s.connect(socket_path())
+    except OSError:
+        s.close()
+        return NOT_HANDLED
+    # Past this point the daemon may have acted on the request: never fall back (no double log).
+    buf = b""
+    try:
+        s.sendall(req)
+        while not buf.endswith(b"\n"):
+            part = s.recv(65536)
+            if not part:
+                break
+            buf += part
+        resp = json.loads(buf)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"qtlog: daemon request failed ({e}); check with: qtlog.sh --status\n")
+        return 1
+    finally:
+        s.close()
+    if resp.get("fallback"):
+        return NOT_HANDLED
+    sys.stdout.write(resp.get("out", ""))
+    sys.stderr.write(resp.get("err", ""))
+    return int(resp.get("rc", 1))
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Resident qtlog service: `qtlog.sh --daemon-start` / `--daemon-stop` / `--daemon` (foreground).
+
+Listens on a Unix socket ($QTLOG_STATE_DIR/qtlog.sock, QTLOG_DAEMON_SOCKET;
+mode 0600). qtlog.sh hands each run to it through tools/qtlog_client.py before
+doing any work of its own. The daemon keeps what every qtlog.sh run otherwise
+rebuilds:
+  - the environment: ~/.config/qt/.env is parsed once (re-read when it changes);
+  - the SOP gate: `qtlog.sh --sop-verify` runs at start-up, and the daemon will
+    not start if it fails;
+  - the Notion client: one warm keep-alive connection, reused by every verify.
+
+Served requests (anything else gets "fallback" and qtlog.sh runs in-process):
+  log     MESSAGE [--local|--notion|--both|--git|--log M|--mode M] [--no-git] [--device D] [--spool]
+          The local line (text or QTLOG_LOG_FORMAT=jsonl) is written and the entry
+          is queued in the outbox (same spool.jsonl format as --spool) before the
+          reply. Notion and git follow in the background: a burst is coalesced
+          and drained by one `qtlog.sh --sync` run (multi-child PATCH + one commit).
+  todo    --todo ITEM                    (tools/notion_todo.py on the warm client)
+  verify  --verify | --verify-all | --verify-todo   (tools/notion_verify.py on the warm client)
+
+The daemon also acts as the outbox sync worker: it records its pid in
+sync.pid when no worker is running, so `--sync-stop` stops it too.
+
+    qtlog_daemon.py serve
+"""
+from __future__ import annotations
+import contextlib, fcntl, io, json, os, re, signal, socket, subprocess, sys, threading, time, uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import qt_trace
+
+REPO = Path(__file__).resolve().parents[1]
+QTLOG = str(REPO / "qtlog.sh")
+MODES = ("local", "notion", "git", "both")
+
+def _now_et(fmt: str) -> str:
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo("America/Toronto")).strftime(fmt)
+    except Exception:
+        return time.strftime(fmt)
+
+def state_dir(env: dict) -> str:
+    return env.get("QTLOG_STATE_DIR") or os.path.join(
+        env.get("XDG_STATE_HOME") or os.path.join(env.get("HOME") or os.path.expanduser("~"), ".local", "state"), "qt")
+
+def socket_path(env: dict) -> str:
+    return env.get("QTLOG_DAEMON_SOCKET") or os.path.join(state_dir(env), "qtlog.sock")
+
+def load_dotenv(path: str) -> dict:
+    """KEY=VALUE lines of ~/.config/qt/.env (optional `export`, quotes stripped; no expansion)."""
+    out = {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("export "):
+                    line = line[7:].lstrip()
+                k, sep, v = line.partition("=")
+                if not sep or not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", k):
+                    continue
+                v = v.strip()
+                if len(v) >= 2 and v[0] == v[-1] and v[0] in "'\"":
+                    v = v[1:-1]
+                out[k] = v
+    except OSError:
+        pass
+    return out
+
+# -- entries (same shape as qtlog.sh's notion_entry_title / spool_entry) --------
+def entry_title(message: str, ts_min: str) -> str:
+    desc = message.split("\n", 1)[0]
+    desc = re.sub(r"\s+—\s+\d{4}-\d{2}-\d{2}\s+\d{4,6}$", "", desc)[:1800]
+    return f"{ts_min} ET — {desc}"
+
+def entry_is_big(message: str, env: dict) -> bool:
+    return env.get("QTLOG_FORCE_BIGPAYLOAD", "0") == "1" or message.count("\n") > 1
+
+def parse_log_argv(argv: list[str]) -> dict | None:
+    """qtlog.sh log flags -> {mode, no_git, device, spool, message}; None when not served here."""
+    opts = {"mode": None, "no_git": False, "device": None, "spool": False}
+    words, i = [], 0
+    while i < len(argv):
+        a = argv[i]
+        if a in ("--local", "--notion", "--git", "--both"):
+            opts["mode"] = a[2:]
+        elif a in ("--log", "--mode") and i + 1 < len(argv) and argv[i + 1] in MODES:
+            opts["mode"] = argv[i + 1]
+            i += 1
+        elif a in ("--no-git", "--offline"):
+            opts["no_git"] = True
+        elif a == "--device" and i + 1 < len(argv):
+            opts["device"] = argv[i + 1]
+            i += 1
+        elif a == "--spool":
+            opts["spool"] = True
+        elif a == "--":
+            words += argv[i + 1:]
+            break
+        elif a.startswith("-"):
+            return None
+        else:
+            words.append(a)
+        i += 1
+    # Positional aliases ("notion ...", "sop ...") keep their special handling in qtlog.sh.
+    if not words or words[0] in ("notion", "both", "file", "sop"):
+        return None
+    opts["message"] = " ".join(words)
+    return opts
+
+class Daemon:
+    def __init__(self, env: dict | None = None):
+        self.base_env = dict(os.environ if env is None else env)
+        self.base_env.setdefault("TZ", "America/Toronto")
+        self.envfile = os.path.join(self.base_env.get("HOME", os.path.expanduser("~")), ".config", "qt", ".env")
+        self._dotenv: tuple[float, dict] = (-1.0, {})
+        self.lock = threading.Lock()          # one request at a time (they share the client)
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.sock: socket.socket | None = None
+        self.owns_sync_pid = False
+        self._version: str | None = None
+        self._device: str | None = None
+
+    # -- environment -----------------------------------------------------------
+    def dotenv(self) -> dict:
+        try:
+            mtime = os.stat(self.envfile).st_mtime
+        except OSError:
+            mtime = 0.0
+        if mtime != self._dotenv[0]:
+            self._dotenv = (mtime, load_dotenv(self.envfile))
+        return self._dotenv[1]
+
+    def env_for(self, req_env: dict | None = None) -> dict:
+        # Same precedence as qtlog.sh: caller's environment, then .env on top.
+        return {**self.base_env, **(req_env or {}), **self.dotenv()}
+
+    def run_qtlog(self, args: list[str], env: dict, timeout: float | None = None) -> subprocess.CompletedProcess:
+        env = {**env, "QTLOG_DAEMON": "0", "QTLOG_SPOOL": "0"}
+        return subprocess.run(["bash", QTLOG, *args], env=env, cwd=str(REPO), capture_output=True,
+                              text=True, timeout=timeout)
+
+    # -- requests --------------------------------------------------------------
+    def handle(self, req: dict) -> dict:
+        argv = [str(a) for a in req.get("argv") or []]
+        env = self.env_for(req.get("env"))
+        env.setdefault("QTLOG_TRACE_RUN", f"{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        with qt_trace.span("daemon.request", env, op=argv[0] if argv else "") as s:
+            resp = self._handle(argv, env)
+            s["rc"] = resp.get("rc", "fallback" if "fallback" in resp else None)
+        return resp
+
+    def _handle(self, argv: list[str], env: dict) -> dict:
+        if argv and argv[0] in ("--verify", "--verify-all", "--verify-todo") and len(argv) == 1:
+            return self._verify("todo" if argv[0] == "--verify-todo" else "all", env)
+        if len(argv) == 2 and argv[0] == "--todo":
+            return self._todo(argv[1], env)
+        opts = parse_log_argv(argv)
+        if opts is None:
+            return {"fallback": "not served"}
+        return self._log(opts, env)
+
+    def _verify(self, which: str, env: dict) -> dict:
+        import notion_verify
+        if env.get("QT_NOTION_SNAPSHOT") or env.get("QT_NOTION_RECORD"):
+            return {"fallback": "snapshot"}
+        # The request's env and output buffers are passed down, never swapped into the
+        # process: verifies run on connection threads next to sync_loop.
+        out, err = io.StringIO(), io.StringIO()
+        rc = notion_verify.run(which, env=env, out=out, err=err)
+        return {"rc": rc, "out": out.getvalue(), "err": err.getvalue()}
+
+    def _todo(self, item: str, env: dict) -> dict:
+        """qtlog.sh's TODO DISPATCH, in-process (same checks, device default and messages)."""
+        import notion_todo
+        if env.get("QT_NOTION_SNAPSHOT") or env.get("QT_NOTION_RECORD"):
+            return {"fallback": "snapshot"}
+        if not env.get("NOTION_TODO_PAGE_ID"):
+            return {"rc": 1, "err": "qtlog: TODO write failed — NOTION_TODO_PAGE_ID is empty at runtime\n"}
+        if not env.get("NOTION_API_KEY"):
+            return {"rc": 1, "err": "qtlog: --todo requires NOTION_API_KEY and NOTION_TODO_PAGE_ID in .env\n"}
+        entry = {"text": item, "emoji": env.get("STATUS_EMOJI") or "🟦", "device": env.get("DEVICE") or self.device()}
+        ts = _now_et("%Y-%m-%d %H%M")
+        out, err = io.StringIO(), io.StringIO()
+        rc = notion_todo.add([entry], ts[:10], ts, env=env, out=out, err=err)
+        if rc:
+            err.write("qtlog: TODO write failed\n")
+        else:
+            out.write("qtlog: TODO written to Notion\n")
+        return {"rc": rc, "out": out.getvalue(), "err": err.getvalue()}
+
+    def device(self) -> str:
+        """qtlog.sh's DEVICE fallback: the Android model name (spaces -> _), else "Device"."""
+        if self._device is None:
+            try:
+                model = subprocess.run(["getprop", "ro.product.model"], capture_output=True, text=True).stdout
+            except OSError:
+                model = ""
+            self._device = model.strip().replace(" ", "_") or "Device"
+        return self._device
+
+    def _log(self, o: dict, env: dict) -> dict:
+        mode = o["mode"] if o["mode"] is not None else env.get("LOG_MODE", "")
+        err = ""
+        if mode in ("notion", "both") and not (env.get("NOTION_API_KEY") and env.get("NOTION_LOG_PAGE_ID")):
+            err += ("qtlog: WARNING: Notion logging requested but NOTION_API_KEY or NOTION_LOG_PAGE_ID is missing. "
+                    "Falling back to local.\n")
+            mode = "local"
+        no_git = o["no_git"] or mode in ("local", "notion")
+        if no_git and mode in ("", "git"):
+            mode = "local"
+        elif no_git and mode == "both":
+            mode = "notion"
+
+        log_dir = env.get("QTLOG_LOG_DIR") or str(REPO / "Log")
+        day = _now_et("%Y-%m-%d")
+        jsonl = env.get("QTLOG_LOG_FORMAT", "text") == "jsonl"
+        log_file = os.path.join(log_dir, f"{day}.{'jsonl' if jsonl else 'log'}")
+        device = o["device"] if o["device"] is not None else env.get("QTLOG_DEVICE", "")
+        msg = o["message"]
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            import log_format
+            if jsonl:
+                log_format.append(log_file, msg, device=device, mode=mode or "git", version=self.version())
+            else:
+                log_format.append_line(log_file, msg)
+        except OSError as e:
+            return {"rc": 1, "err": err + f"qtlog: failed to write {log_file}: {e}\n"}
+        if mode == "local":
+            return {"rc": 0, "err": err, "out": f"qtlog: logged to {log_file} (no git actions)\n"}
+        try:
+            n = self.enqueue(env, msg, log_file, mode)
+        except OSError as e:
+            return {"rc": 1, "err": err + f"qtlog: failed to queue entry: {e}\n"}
+        self.wake.set()
+        return {"rc": 0, "err": err, "out": f"qtlog: logged to {log_file} (queued; daemon syncing: {n} pending)\n"}
+
+    def version(self) -> str:
+        if self._version is None:
+            m = re.search(r'^VERSION="([^"]+)"', Path(QTLOG).read_text(encoding="utf-8", errors="replace"), re.M)
+            self._version = m.group(1) if m else ""
+        return self._version
+
+    def enqueue(self, env: dict, msg: str, log_file: str, mode: str) -> int:
+        """Append one spool entry under the spool lock (flock, shared with qtlog.sh); returns the queue length."""
+        spool = env.get("QTLOG_SPOOL_FILE") or os.path.join(state_dir(env), "spool.jsonl")
+        ts_min = _now_et("%Y-%m-%d %H%M")
+        line = json.dumps({"key": str(uuid.uuid4()), "day": ts_min[:10], "ts": ts_min,
+                           "title": entry_title(msg, ts_min), "message": msg,
+                           "big": entry_is_big(msg, env), "log_file": log_file, "mode": mode},
+                          ensure_ascii=False, separators=(",", ":"))
+        os.makedirs(os.path.dirname(spool), exist_ok=True)
+        with open(spool + ".lock", "a") as lk:
+            fcntl.flock(lk, fcntl.LOCK_EX)
+            with open(spool, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+            with open(spool, encoding="utf-8") as fh:
+                return sum(1 for _ in fh)
+
+    # -- background sync (outbox worker) -----------------------------------------
+    def sync_loop(self):
+        env = self.env_for()
+        interval = float(env.get("QTLOG_SYNC_INTERVAL", "30"))
+        retry = delay = float(env.get("QTLOG_SYNC_RETRY", "15"))
+        cap = float(env.get("QTLOG_SYNC_MAX_BACKOFF", "1800"))
+        settle = float(env.get("QTLOG_DAEMON_FLUSH_DELAY", "2"))
+        pause = 0.0
+        while not self.stopping.is_set():
+            if self.wake.wait(pause):
+                self.wake.clear()
+                if self.stopping.is_set():
+                    break
+                time.sleep(settle)                 # let a burst of log calls land in one flush
+                self.wake.clear()
+            p = self.run_qtlog(["--sync"], self.env_for())
+            if p.returncode == 0:
+                delay, pause = retry, interval
+            else:
+                print(f"qtlog daemon: sync pending; retry in {delay:.0f}s\n{p.stdout[-500:]}{p.stderr[-500:]}",
+                      flush=True)
+                pause, delay = delay, min(delay * 2, cap)
+
+    # -- server ----------------------------------------------------------------
+    def serve(self) -> int:
+        env = self.env_for()
+        gate = self.run_qtlog(["--sop-verify"], env)
+        if gate.returncode != 0:
+            sys.stderr.write(gate.stdout + gate.stderr + "qtlog daemon: SOP gate failed; not starting\n")
+            return 1
+        path = socket_path(env)
+        sdir = state_dir(env)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            print(f"qtlog daemon: already running ({path})")
+            return 0
+        except OSError:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)                    # stale socket from a dead daemon
+        finally:
+            probe.close()
+        old_umask = os.umask(0o177)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        os.umask(old_umask)
+        self.sock.listen(16)
+        self.sock.settimeout(0.5)
+        pid_file = os.path.join(sdir, "qtlog_daemon.pid")
+        Path(pid_file).write_text(f"{os.getpid()}\n")
+        sync_pid = os.path.join(sdir, "sync.pid")
+        if not _pid_alive(sync_pid):
+            Path(sync_pid).write_text(f"{os.getpid()}\n")
+            self.owns_sync_pid = True
+            threading.Thread(target=self.sync_loop, daemon=True).start()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: self.stopping.set())
+        print(f"qtlog daemon: up (pid {os.getpid()}, socket {path}, sync={'own' if self.owns_sync_pid else 'worker'}) "
+              f"{_now_et('%Y-%m-%d %H%M ET')}", flush=True)
+        try:
+            while not self.stopping.is_set():
+                try:
+                    conn, _ = self.sock.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    if self.stopping.is_set():
+                        break
+                    raise
+                threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+        finally:
+            self.sock.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(pid_file)
+            if self.owns_sync_pid and _pid_in(sync_pid) == os.getpid():
+                os.unlink(sync_pid)
+            print("qtlog daemon: stopped", flush=True)
+        return 0
+
+    def _serve_conn(self, conn: socket.socket):
+        with conn:
+            try:
+                conn.settimeout(10)
+                buf = b""
+                while not buf.endswith(b"\n"):
+                    part = conn.recv(65536)
+                    if not part:
+                        return
+                    buf += part
+                conn.settimeout(None)
+                req = json.loads(buf)
+                with self.lock:
+                    resp = self.handle(req)
+            except Exception as e:                # a bad request must not take the daemon down
+                resp = {"rc": 1, "err": f"qtlog daemon: {type(e).__name__}: {e}\n"}
+            with contextlib.suppress(OSError):
+                conn.sendall(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+
+def _pid_in(path: str) -> int:
+    try:
+        return int(Path(path).read_text().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _pid_alive(path: str) -> bool:
+    pid = _pid_in(path)
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+def main(argv: list[str]) -> int:
+    if argv[:1] == ["serve"]:
+        return Daemon().serve()
+    print(__doc__.strip())
+    return 0 if argv[:1] in ([], ["-h"], ["--help"]) else 2
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
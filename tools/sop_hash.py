@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SOP hash engine: the digest of the SOP-critical regions of qtlog.sh.
+
+Every marked region is cut out of one read of qtlog.sh (the same regions and
+the same digest as the original awk-per-marker bin/sop_hash.sh):
+  - "block" markers: from the marker line through the first line that is just `}`;
+  - "lines" markers: the marker line and the next 159.
+`write` records the digest in .sop_hash and a per-region manifest in
+.sop_hash.json (marker, line range, sha256), so a stale .sop_hash is reported
+region by region.
+
+`check` answers "is .sop_hash current?" from a stat cache
+(~/.cache/qt/sop_hash.json, QT_SOP_HASH_CACHE) while qtlog.sh, .sop_hash and
+the manifest keep their mtime and size; only then is qtlog.sh read again.
+`check --no-cache-write` reads the cache but never writes it (read-only
+callers: qtlog.sh --status and --sop-version).
+
+    sop_hash.py [print]          print the digest (bin/sop_hash.sh)
+    sop_hash.py write            update .sop_hash and .sop_hash.json
+    sop_hash.py check [--staged] [--no-cache-write]
+                                 exit 0 when .sop_hash is current; 1 with SOP_HASH_DRIFT lines
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, re, subprocess, sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+SOURCE = "qtlog.sh"
+HASH_FILE = ".sop_hash"
+MANIFEST_FILE = ".sop_hash.json"
+LINES_REGION = 160
+
+# Order is part of the digest.
+MARKERS = (
+    ("QTLOG_CONFIG_BLOCK", "lines"),
+    ("QTLOG_CODING_SOP", "lines"),
+    ("QTLOG_SOP_ENV_CHECK", "block"),
+    ("QTLOG_SOP_FAIL_NOTION_LOG", "block"),
+    ("QTLOG_SOP_ENV_CHECK_CALL", "block"),
+    ("QTLOG_ENSURE_TODAY_TOP", "block"),
+    ("QTLOG_NOTION_LOG_RESOLVE", "block"),
+)
+_BLOCK_END = re.compile(rb"^\}\s*$")
+
+class SopHashError(Exception):
+    pass
+
+def regions(data: bytes) -> list[dict]:
+    """[{marker, start, end (1-based, inclusive), text}] in MARKERS order, from one scan of the file."""
+    lines = data.split(b"\n")
+    if data.endswith(b"\n"):
+        lines.pop()
+    tags = {f"### {m} ###".encode(): m for m, _ in MARKERS}
+    first: dict[str, int] = {}
+    for i, line in enumerate(lines):
+        if b"### QTLOG_" in line:
+            for tag, m in tags.items():
+                if m not in first and tag in line:
+                    first[m] = i
+    out = []
+    for m, kind in MARKERS:
+        if m not in first:
+            raise SopHashError(f"marker missing: ### {m} ###")
+        start = end = first[m]
+        if kind == "lines":
+            end = min(start + LINES_REGION, len(lines)) - 1
+        else:
+            end = next((j for j in range(start, len(lines)) if _BLOCK_END.match(lines[j])), len(lines) - 1)
+        text = b"".join(l + b"\n" for l in lines[start:end + 1])
+        out.append({"marker": m, "start": start + 1, "end": end + 1,
+                    "text": f"=== ### {m} ### ===\n".encode() + text})
+    return out
+
+def digest(data: bytes) -> tuple[str, list[dict]]:
+    """(SOP hash, manifest regions) for the contents of qtlog.sh."""
+    regs = regions(data)
+    h = hashlib.sha256(f"FILE={SOURCE}\n".encode())
+    for r in regs:
+        h.update(r["text"])
+    return h.hexdigest(), [{"marker": r["marker"], "lines": [r["start"], r["end"]],
+                            "sha256": hashlib.sha256(r["text"]).hexdigest()} for r in regs]
+
+def drift(manifest: dict | None, regs: list[dict]) -> list[str]:
+    """Markers whose region digest differs from the manifest (None when the manifest cannot tell)."""
+    if not manifest or not manifest.get("regions"):
+        return None
+    old = {r["marker"]: r["sha256"] for r in manifest["regions"]}
+    return [r["marker"] for r in regs if old.get(r["marker"]) != r["sha256"]]
+
+def _read(root: Path, name: str, staged: bool) -> bytes | None:
+    if staged:
+        p = subprocess.run(["git", "-C", str(root), "cat-file", "blob", f":{name}"], capture_output=True)
+        return p.stdout if p.returncode == 0 else None
+    try:
+        return (root / name).read_bytes()
+    except FileNotFoundError:
+        return None
+
+def _cache_path() -> str:
+    cache = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.getenv("QT_SOP_HASH_CACHE") or os.path.join(cache, "qt", "sop_hash.json")
+
+def _stat_key(root: Path) -> list:
+    out = []
+    for name in (SOURCE, HASH_FILE, MANIFEST_FILE):
+        try:
+            st = os.stat(root / name)
+            out.append([name, st.st_size, st.st_mtime_ns])
+        except FileNotFoundError:
+            out.append([name, None, None])
+    return out
+
+def _cache_load() -> dict:
+    try:
+        with open(_cache_path(), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _cache_store(root: Path, key: list, result: dict):
+    cache = _cache_load()
+    cache[str(root)] = {"stat": key, "result": result}
+    try:
+        os.makedirs(os.path.dirname(_cache_path()), exist_ok=True)
+        tmp = f"{_cache_path()}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(cache, fh)
+        os.replace(tmp, _cache_path())
+    except OSError:
+        pass                                    # the cache only saves time
+
+def check(root: Path = REPO, staged: bool = False, use_cache: bool = True, store: bool = True) -> dict:
+    """
+    {ok, have, want, drift: [markers] | None, cached}; raises SopHashError when qtlog.sh is unusable.
+    store=False still answers from the cache but leaves it as it is (no file is written).
+    """
+    key = None if staged or not use_cache else _stat_key(root)
+    if key:
+        hit = _cache_load().get(str(root))
+        if hit and hit.get("stat") == key:
+            return {**hit["result"], "cached": True}
+    data = _read(root, SOURCE, staged)
+    if data is None:
+        raise SopHashError(f"missing {SOURCE}")
+    have, regs = digest(data)
+    want = (_read(root, HASH_FILE, staged) or b"").decode().strip()
+    manifest = None
+    raw = _read(root, MANIFEST_FILE, staged)
+    if raw:
+        try:
+            manifest = json.loads(raw)
+        except ValueError:
+            manifest = None
+    result = {"ok": have == want, "have": have, "want": want, "drift": None}
+    if not result["ok"] and manifest and manifest.get("sop_hash") == want:
+        changed = drift(manifest, regs)
+        result["drift"] = [r for r in regs if r["marker"] in changed]
+    if key and store:
+        _cache_store(root, key, result)
+    return {**result, "cached": False}
+
+def write(root: Path = REPO) -> str:
+    have, regs = digest((root / SOURCE).read_bytes())
+    (root / HASH_FILE).write_text(have + "\n", encoding="utf-8")
+    manifest = {"file": SOURCE, "sop_hash": have, "regions": regs}
+    (root / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return have
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="sop_hash.py", description="SOP hash of qtlog.sh's critical regions")
+    ap.add_argument("cmd", nargs="?", choices=("print", "write", "check"), default="print")
+    ap.add_argument("--staged", action="store_true", help="check the index copies (pre-commit)")
+    ap.add_argument("--no-cache-write", dest="store", action="store_false",
+                    help="check: read the stat cache but never write it (read-only callers)")
+    ap.add_argument("--root", default=str(REPO))
+    a = ap.parse_args(argv)
+    root = Path(a.root)
+    try:
+        if a.cmd == "print":
+            print(digest((root / SOURCE).read_bytes())[0])
+            return 0
+        if a.cmd == "write":
+            print(f"SOP_HASH_WRITTEN={write(root)}")
+            return 0
+        r = check(root, staged=a.staged, store=a.store)
+    except (SopHashError, OSError) as e:
+        print(f"SOP_HASH_FAIL: {e}", file=sys.stderr)
+        return 1
+    if r["ok"]:
+        print(f"SOP_HASH_OK={r['have']}")
+        return 0
+    print(f"SOP_HASH_FAIL: {HASH_FILE} is stale (recorded {r['want'] or 'NONE'}, current {r['have']})")
+    if r["drift"] is None:
+        print(f"SOP_HASH_DRIFT: unknown ({MANIFEST_FILE} missing or not written with {HASH_FILE})")
+    for d in r["drift"] or []:
+        print(f"SOP_HASH_DRIFT: {d['marker']} lines {d['lines'][0]}-{d['lines'][1]}")
+    print("SOP_HASH_FIX: python3 tools/sop_hash.py write")
+    return 1
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 from pathlib import Path
-import os, sys, json, re, datetime, shutil, subprocess, textwrap, urllib.request
+import os, sys, json, re, datetime, shutil, subprocess, textwrap
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import data_room_manifest
+from notion_api import Snapshot, SNAPSHOT_ENV_KEYS, client_for, flush_recording
+from qt_trace import span
 
 REPO = Path(".").resolve()
+DRIFT_DEPTH = 4  # the drift check only looks this deep under Big Picture
 
 def now_ts():
     return datetime.datetime.now().strftime("%Y-%m-%d %H%M ET")
@@ -43,7 +50,7 @@ _Last updated: {now_ts()}_
 
 This is an **investor-safe alias** that points to the canonical source of truth:
 
-- Canonical: `{canonical_path.as_posix()}`
+- Canonical: `{canonical_path.resolve().relative_to(REPO).as_posix()}`
 - Link: [{canonical_path.name}]({rel_link(alias_path, canonical_path)})
 
 Governance note:
@@ -85,6 +92,9 @@ def ensure_root_readme_pointer(fix: bool):
     return True
 
 def verify_data_room(fix: bool) -> bool:
+    # Existence, alias links and README references all come from the docs manifest
+    # (tools/data_room_manifest.py): only files changed since the last run are read.
+    manifest = data_room_manifest.current(REPO)
     required = [
         "docs/Data_Room/README.md",
         "docs/Data_Room/01_Execution_Track_Record/Project_Management_Methodology/README.md",
@@ -96,7 +106,7 @@ def verify_data_room(fix: bool) -> bool:
         "qtlog.sh",
         "CHANGELOG.md",
     ]
-    missing = [p for p in required if not (REPO / p).exists()]
+    missing = [p for p in required if not manifest.exists(p)]
     if missing:
         for m in missing:
             warn(f"missing required: {m}")
@@ -104,31 +114,31 @@ def verify_data_room(fix: bool) -> bool:
 
     ok("required files: all present")
 
-    # Ensure Data Room "alias" docs exist in the methodology folder
-    dr_dir = REPO / "docs/Data_Room/01_Execution_Track_Record/Project_Management_Methodology"
+    # Ensure Data Room "alias" docs exist in the methodology folder and link to their canonical doc
+    dr_rel = "docs/Data_Room/01_Execution_Track_Record/Project_Management_Methodology"
+    dr_dir = REPO / dr_rel
     aliases = [
-        ("WBS_MASTER_FORMAT.md", REPO/"docs/WBS_MASTER_FORMAT.md", "WBS Master Format"),
-        ("ARCHITECTURE.md",      REPO/"ARCHITECTURE.md",         "Architecture"),
-        ("SOP_NOTION_LOG_ORDERING.md", REPO/"docs/SOP_NOTION_LOG_ORDERING.md", "Notion Log Ordering SOP"),
-        ("EXEC_SUMMARY.md",      REPO/"docs/EXEC_SUMMARY.md",    "Executive Summary (Non-Technical)"),
+        ("WBS_MASTER_FORMAT.md", "docs/WBS_MASTER_FORMAT.md", "WBS Master Format"),
+        ("ARCHITECTURE.md",      "ARCHITECTURE.md",           "Architecture"),
+        ("SOP_NOTION_LOG_ORDERING.md", "docs/SOP_NOTION_LOG_ORDERING.md", "Notion Log Ordering SOP"),
+        ("EXEC_SUMMARY.md",      "docs/EXEC_SUMMARY.md",      "Executive Summary (Non-Technical)"),
     ]
 
     ok_all = True
     for fname, canonical, title in aliases:
-        alias_path = dr_dir / fname
-        if alias_path.exists():
+        alias_rel, alias_path = f"{dr_rel}/{fname}", dr_dir / fname
+        if manifest.links_to(alias_rel, canonical):
             ok(f"alias present: {alias_path}")
-        else:
-            ok_all = False
-            warn(f"alias missing: {alias_path}")
-            if fix:
-                make_alias_md(alias_path, canonical, title)
+            continue
+        ok_all = False
+        warn(f"alias {'does not link to ' + canonical if manifest.exists(alias_rel) else 'missing'}: {alias_path}")
+        if fix:
+            make_alias_md(alias_path, REPO / canonical, title)
 
     # sanity: verify methodology README references canonical items
-    pm_readme = dr_dir / "README.md"
-    src = read(pm_readme)
+    pm_readme = f"{dr_rel}/README.md"
     for s in ["docs/WBS_MASTER_FORMAT.md", "qtlog.sh", "CHANGELOG.md", "docs/EXEC_SUMMARY.md", "docs/SOP_NOTION_LOG_ORDERING.md", "ARCHITECTURE.md"]:
-        if s not in src:
+        if not manifest.references(pm_readme, s):
             ok_all = False
             warn(f"PM README missing reference: {s}")
 
@@ -139,13 +149,9 @@ def verify_data_room(fix: bool) -> bool:
     return ok_all
 
 def notion_get_children(block_id: str, api_key: str, page_size: int = 200):
-    url = f"https://api.notion.com/v1/blocks/{block_id}/children?page_size={page_size}"
-    req = urllib.request.Request(url, headers={
-        "Authorization": f"Bearer {api_key}",
-        "Notion-Version": "2022-06-28",
-    })
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return json.loads(r.read().decode("utf-8", errors="replace"))
+    # Shared keep-alive client; follows next_cursor so nothing past one page is dropped.
+    limit = page_size if page_size < 100 else None
+    return {"results": client_for(api_key).children(block_id, limit=limit)}
 
 def notion_text_snippets_from_blocks(results):
     """
@@ -177,7 +183,7 @@ def notion_text_snippets_from_blocks(results):
             snippets.append(txt)
 
     return snippets
-def verify_notion_github_drift() -> bool:
+def verify_notion_github_drift(blocks=None) -> bool:
     api_key = os.getenv("NOTION_API_KEY","").strip()
     big_picture_id = os.getenv("QT_BIG_PICTURE_PAGE_ID","").strip()
 
@@ -211,7 +217,10 @@ def verify_notion_github_drift() -> bool:
 
     # Notion structure presence (titles under Big Picture page)
     try:
-        payload_blocks = notion_walk_block_tree(big_picture_id, api_key, max_depth=4)
+        if blocks is None:
+            blocks = notion_walk_block_tree(big_picture_id, api_key, max_depth=DRIFT_DEPTH)
+        # The shared crawl goes deeper (hub links); titles below DRIFT_DEPTH do not count.
+        payload_blocks = [b for b in blocks if b.get("_depth", 0) <= DRIFT_DEPTH]
         snippets = notion_text_snippets_from_blocks(payload_blocks)
     except Exception as e:
         warn(f"Notion drift: FAIL to read Big Picture children ({e})")
@@ -246,25 +255,32 @@ def verify_notion_github_drift() -> bool:
     warn("Notion<->GitHub drift: needs attention (missing items detected)")
     return False
 
-def notion_walk_block_tree(root_block_id: str, api_key: str, max_depth: int = 4):
+def notion_walk_block_tree(root_block_id: str, api_key: str, max_depth: int = 4, concurrency: int | None = None):
     """
-    BFS crawl of Notion block tree starting at root_block_id, returning a flat list of blocks.
-    Includes nested blocks (toggles, callouts, synced sections, etc.) up to max_depth.
+    Level-parallel BFS crawl of Notion block tree starting at root_block_id, returning a flat list of blocks.
+    Includes nested blocks (toggles, callouts, synced sections, etc.) up to max_depth; each
+    block is a copy carrying its level as "_depth" (0 = children of root_block_id).
+    Each level's children are fetched concurrently (QT_NOTION_CONCURRENCY workers, default 3; the
+    client's rate limiter keeps the total near Notion's ~3 req/s) but results are kept in serial
+    BFS order, so "last marker" slicing in verify_big_picture_hub_links is unaffected.
     """
+    if concurrency is None:
+        concurrency = int(os.getenv("QT_NOTION_CONCURRENCY", "3") or 1)
     all_blocks = []
     seen = set([root_block_id])
-    q = [(root_block_id, 0)]
-    while q:
-        bid, depth = q.pop(0)
-        if depth > max_depth:
-            continue
-        payload = notion_get_children(bid, api_key)
-        blocks = payload.get("results", []) or []
-        all_blocks.extend(blocks)
-        for b in blocks:
-            if b.get("has_children") and b.get("id") and b["id"] not in seen:
-                seen.add(b["id"])
-                q.append((b["id"], depth + 1))
+    q = deque([root_block_id])
+    depth = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while q and depth <= max_depth:
+            level = [q.popleft() for _ in range(len(q))]
+            for payload in pool.map(lambda bid: notion_get_children(bid, api_key), level):
+                blocks = payload.get("results", []) or []
+                all_blocks.extend(dict(b, _depth=depth) for b in blocks)
+                for b in blocks:
+                    if b.get("has_children") and b.get("id") and b["id"] not in seen:
+                        seen.add(b["id"])
+                        q.append(b["id"])
+            depth += 1
     return all_blocks
 
 def verify_expected_page_ids():
@@ -286,7 +302,7 @@ def verify_expected_page_ids():
 
 
 
-def verify_big_picture_hub_links(big_picture_id: str, api_key: str) -> bool:
+def verify_big_picture_hub_links(big_picture_id: str, api_key: str, blocks=None) -> bool:
     """
     STRICT: Validate ONLY the newest navigation hub section in QT - Big Picture.
 
@@ -364,7 +380,8 @@ def verify_big_picture_hub_links(big_picture_id: str, api_key: str) -> bool:
 
         return linked
 
-    blocks = notion_walk_block_tree(big_picture_id, api_key, max_depth=8)
+    if blocks is None:
+        blocks = notion_walk_block_tree(big_picture_id, api_key, max_depth=8)
 
     # STRICT marker slicing: last "New Navigation Block"
     marker = "new navigation block"
@@ -399,17 +416,66 @@ def verify_big_picture_hub_links(big_picture_id: str, api_key: str) -> bool:
     return False
 
 
+def arg_value(flag: str) -> str:
+    if flag in sys.argv:
+        i = sys.argv.index(flag)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        die(f"{flag} requires a FILE")
+    return ""
+
+def use_snapshot(snapshot_out: str, from_snapshot: str):
+    """
+    --snapshot-out FILE: record every Notion listing fetched into FILE (merged; qtlog.sh --verify-all
+                         --snapshot-out FILE adds the Log/ToDo pages to the same file).
+    --from-snapshot FILE: replay from FILE with zero network I/O; page ids missing from the
+                          environment are taken from the snapshot.
+    """
+    if from_snapshot:
+        snap = Snapshot.load(from_snapshot)
+        os.environ["QT_NOTION_SNAPSHOT"] = from_snapshot
+        os.environ.setdefault("NOTION_API_KEY", "snapshot")
+        for k in SNAPSHOT_ENV_KEYS:
+            if snap.env.get(k) and not os.getenv(k, "").strip():
+                os.environ[k] = snap.env[k]
+        ok(f"replaying Notion from snapshot: {from_snapshot} (day={snap.day})")
+    elif snapshot_out:
+        os.environ["QT_NOTION_RECORD"] = snapshot_out
+
 def main():
     fix = "--fix" in sys.argv
+    from_snapshot = arg_value("--from-snapshot")
+    if "--from-mirror" in sys.argv:
+        from notion_mirror import mirror_path
+        from_snapshot = mirror_path()
+    use_snapshot(arg_value("--snapshot-out"), from_snapshot)
     # repo sanity
     if not (REPO / ".git").exists():
         die("not a git repo (run from repo root)")
 
     ok(f"verify start: {now_ts()} (fix={fix})")
 
-    pass1 = verify_data_room(fix)
-    pass2 = ensure_root_readme_pointer(fix)
-    pass3 = verify_notion_github_drift() and verify_expected_page_ids() and verify_big_picture_hub_links(os.getenv('QT_BIG_PICTURE_PAGE_ID','').strip(), os.getenv('NOTION_API_KEY','').strip())
+    with span("verify.data_room") as s:
+        pass1 = s["ok"] = verify_data_room(fix)
+    with span("verify.readme_pointer") as s:
+        pass2 = s["ok"] = ensure_root_readme_pointer(fix)
+    # One Big Picture crawl (depth 8) shared by every Notion check; the drift check keeps its DRIFT_DEPTH levels.
+    big_picture_id = os.getenv('QT_BIG_PICTURE_PAGE_ID','').strip()
+    api_key = os.getenv('NOTION_API_KEY','').strip()
+    blocks = None
+    if big_picture_id and api_key:
+        with span("verify.notion_crawl") as s:
+            try:
+                blocks = notion_walk_block_tree(big_picture_id, api_key, max_depth=8)
+                s["blocks"] = len(blocks)
+            except Exception as e:
+                warn(f"Notion crawl: FAIL to read Big Picture tree ({e})")
+                blocks = None
+    with span("verify.notion_checks") as s:
+        pass3 = s["ok"] = verify_notion_github_drift(blocks) and verify_expected_page_ids() and verify_big_picture_hub_links(big_picture_id, api_key, blocks)
+    flush_recording()
+    if os.getenv("QT_NOTION_RECORD", "").strip():
+        ok(f"Notion snapshot written: {os.environ['QT_NOTION_RECORD']}")
 
     if pass1 and pass2 and pass3:
         ok("ALL CHECKS PASSED")
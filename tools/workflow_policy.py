@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Policy checks for every .github/workflows/*.yml (Compliance preflight,
+tools/governance_verify.sh, CI).
+
+The rules below are declarative, one per expectation, each scoped to the
+workflow files it applies to (fnmatch on the file name): required triggers,
+permissions, secret references, status contexts and step gates. Every workflow
+is parsed once per run, the cache misses on a thread pool, and the parsed
+document is cached by the sha256 of the file content, so an unchanged workflow
+is never parsed again. Checks read the parsed structure only (secret references
+and step gates are looked up in the string values, not in the raw text).
+
+    workflow_policy.py [--dir .github/workflows] [--only FILE ...] [--json] [--strict] [--no-cache]
+
+Rule kinds:
+  exists      the workflow file must be present
+  parse       the file is a YAML mapping with `on` and a `jobs` mapping whose jobs have runs-on and steps
+  name        top-level name equals `value`
+  trigger     on.<path> is present; `value` items must all be listed under it
+  permission  permissions.<path> (top level) equals `value`
+  secret      `${{ secrets.<value> }}` is referenced somewhere
+  context     status context `value` is a job id / job name or is posted or checked by a step
+  step        a step's run or if text matches the regex `value`
+  ref         every on.workflow_run.workflows entry names a workflow in the directory (a file
+              that does not parse still names one through its plain top-level `name:` line)
+
+Findings are GitHub warning annotations (`::warning file=...`), or one JSON
+object per line with --json; exit 0 (warn-only) unless --strict (1 on findings).
+Needs PyYAML (preinstalled on ubuntu-latest runners); without it the run warns
+and exits 0. Cache: ~/.cache/qt/workflow_policy.sqlite (QT_WORKFLOW_CACHE).
+"""
+from __future__ import annotations
+import argparse, fnmatch, hashlib, json, os, re, sqlite3, sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+WORKFLOW_DIR = ".github/workflows"
+CACHE_TABLE = "parsed_v2"    # new name whenever parse() results change shape
+_TOP_NAME = re.compile(r"""^name:[ \t]*(["']?)(.*?)\1[ \t]*(?:#.*)?$""", re.M)
+TITLE = "Workflow Policy"
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    scope: str           # fnmatch glob on the workflow file name
+    kind: str
+    message: str
+    path: str = ""       # dotted key for trigger/permission
+    value: object = None
+
+RULES = (
+    Rule("parse", "*", "parse", "not a valid workflow"),
+    Rule("workflow-run-ref", "*", "ref", "on.workflow_run.workflows names an unknown workflow"),
+    # Emergency auto-approve (docs/GOVERNANCE_EMERGENCY_MODE.md)
+    Rule("emergency-present", "emergency-auto-approve.yml", "exists",
+         "missing: the emergency auto-approve safeguard is gone"),
+    Rule("emergency-trigger", "emergency-auto-approve.yml", "trigger", "must run on pull_request",
+         "pull_request"),
+    Rule("emergency-pr-write", "emergency-auto-approve.yml", "permission",
+         "permissions.pull-requests should be 'write'", "pull-requests", "write"),
+    Rule("emergency-token", "emergency-auto-approve.yml", "secret",
+         "QT_EMERGENCY_REVIEW_TOKEN is not referenced", value="QT_EMERGENCY_REVIEW_TOKEN"),
+    Rule("emergency-marker", "emergency-auto-approve.yml", "step", "EMERGENCY-MODE: gate is not present",
+         value=r"EMERGENCY-MODE:"),
+    Rule("emergency-context", "emergency-auto-approve.yml", "context",
+         "does not check the required status context 'verify'", value="verify"),
+    # Producers of the required status context `verify`
+    Rule("compliance-name", "compliance.yml", "name", "name must stay 'Compliance' (workflow_run references it)",
+         value="Compliance"),
+    Rule("compliance-pr", "compliance.yml", "trigger", "must run on pull_request", "pull_request"),
+    Rule("compliance-context", "compliance.yml", "context", "has no 'verify' job", value="verify"),
+    Rule("compliance-notion", "compliance.yml", "secret", "NOTION_API_KEY is not referenced",
+         value="NOTION_API_KEY"),
+    Rule("qtlog-verify-name", "qtlog-verify.yml", "name",
+         "name must stay 'qtlog verify' (workflow_run and the emergency gate reference it)", value="qtlog verify"),
+    Rule("qtlog-verify-pr", "qtlog-verify.yml", "trigger", "must run on pull_request", "pull_request"),
+    Rule("qtlog-verify-context", "qtlog-verify.yml", "context", "has no 'verify' job", value="verify"),
+    Rule("bridge-trigger", "verify-status-bridge.yml", "trigger",
+         "must run on workflow_run of 'qtlog verify' and 'Compliance'", "workflow_run.workflows",
+         ("qtlog verify", "Compliance")),
+    Rule("bridge-completed", "verify-status-bridge.yml", "trigger", "workflow_run.types must include 'completed'",
+         "workflow_run.types", ("completed",)),
+    Rule("bridge-statuses", "verify-status-bridge.yml", "permission", "permissions.statuses should be 'write'",
+         "statuses", "write"),
+    Rule("bridge-context", "verify-status-bridge.yml", "context", "does not post status context 'verify'",
+         value="verify"),
+    # SOP gate and snapshots
+    Rule("ci-push", "ci.yml", "trigger", "must run on push", "push"),
+    Rule("ci-sop-verify", "ci.yml", "step", "no `qtlog.sh --sop-verify` step", value=r"qtlog\.sh --sop-verify"),
+    Rule("ci-sop-hash", "ci.yml", "step", "no `sop_hash.py check` step", value=r"sop_hash\.py check"),
+    Rule("snapshot-write", "governance-snapshot-*.yml", "permission", "permissions.contents should be 'write'",
+         "contents", "write"),
+    Rule("snapshot-token", "governance-snapshot-*.yml", "secret", "QT_EMERGENCY_REVIEW_TOKEN is not referenced",
+         value="QT_EMERGENCY_REVIEW_TOKEN"),
+    Rule("release-write", "release-pdf.yml", "permission", "permissions.contents should be 'write'",
+         "contents", "write"),
+)
+
+_SECRET = re.compile(r"\$\{\{\s*secrets\.([A-Za-z0-9_]+)\s*\}\}")
+
+# -- parse + cache -------------------------------------------------------------
+def _plain(v):
+    """Parsed YAML as plain JSON: YAML 1.1 reads the key `on` as True, dates become strings."""
+    if isinstance(v, dict):
+        return {("on" if k is True else str(k)): _plain(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_plain(x) for x in v]
+    return v if v is None or isinstance(v, (str, int, float, bool)) else str(v)
+
+def parse(text: str) -> dict:
+    """{"doc": <parsed>} or {"error": <message>, "name": <top-level name: line, if any>}."""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        return {"doc": _plain(yaml.load(text, Loader=loader))}
+    except yaml.YAMLError as e:
+        m = _TOP_NAME.search(text)
+        return {"error": " ".join(str(e).split()), "name": m.group(2) if m else None}
+
+class Cache:
+    def __init__(self, path: str | None):
+        self.db = None
+        if not path:
+            return
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.db = sqlite3.connect(path)
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (sha TEXT PRIMARY KEY, result TEXT)")
+        except sqlite3.Error:
+            self.db = None                   # a broken cache only costs speed
+
+    def get(self, shas: list[str]) -> dict:
+        if not self.db or not shas:
+            return {}
+        rows = self.db.execute(f"SELECT sha, result FROM {CACHE_TABLE} WHERE sha IN ({','.join('?' * len(shas))})", shas)
+        return {sha: json.loads(res) for sha, res in rows}
+
+    def put(self, rows: dict):
+        if not self.db or not rows:
+            return
+        try:
+            self.db.executemany(f"INSERT OR REPLACE INTO {CACHE_TABLE} VALUES (?, ?)",
+                                [(sha, json.dumps(res)) for sha, res in rows.items()])
+            self.db.commit()
+        except sqlite3.Error:
+            pass
+
+def _default_cache() -> str:
+    cache = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.getenv("QT_WORKFLOW_CACHE") or os.path.join(cache, "qt", "workflow_policy.sqlite")
+
+def load_all(wf_dir: str, cache: Cache, workers: int | None = None) -> tuple[dict, dict]:
+    """file name -> parse result for every *.yml/*.yaml in wf_dir; plus {"parsed": n, "cached": n}."""
+    texts = {}
+    for name in sorted(os.listdir(wf_dir)) if os.path.isdir(wf_dir) else []:
+        if name.endswith((".yml", ".yaml")):
+            with open(os.path.join(wf_dir, name), "rb") as fh:
+                texts[name] = fh.read()
+    shas = {name: hashlib.sha256(data).hexdigest() for name, data in texts.items()}
+    known = cache.get(sorted(set(shas.values())))
+    todo = sorted({sha: name for name, sha in shas.items() if sha not in known}.items())
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(todo) or 1)) as pool:
+        fresh = dict(zip((sha for sha, _ in todo),
+                         pool.map(lambda t: parse(texts[t[1]].decode("utf-8", "replace")), todo)))
+    cache.put(fresh)
+    known.update(fresh)
+    return {name: known[sha] for name, sha in shas.items()}, {"parsed": len(fresh), "cached": len(texts) - len(todo)}
+
+# -- checks --------------------------------------------------------------------
+def _get(d, path: str):
+    for k in path.split("."):
+        if not isinstance(d, dict) or k not in d:
+            return None
+        d = d[k]
+    return d
+
+def _strings(v):
+    if isinstance(v, str):
+        yield v
+    elif isinstance(v, dict):
+        for x in v.values():
+            yield from _strings(x)
+    elif isinstance(v, list):
+        for x in v:
+            yield from _strings(x)
+
+def _jobs(doc: dict) -> dict:
+    jobs = doc.get("jobs")
+    return jobs if isinstance(jobs, dict) else {}
+
+def _steps(doc: dict):
+    for job in _jobs(doc).values():
+        for step in (job.get("steps") or []) if isinstance(job, dict) else []:
+            if isinstance(step, dict):
+                yield step
+
+def _workflow_problem(doc) -> str:
+    if not isinstance(doc, dict):
+        return "YAML root is not a mapping"
+    if doc.get("on") in (None, ""):
+        return "missing 'on'"
+    if not _jobs(doc):
+        return "missing 'jobs' mapping"
+    for jid, job in _jobs(doc).items():
+        if not isinstance(job, dict) or "runs-on" not in job:
+            return f"job '{jid}' has no runs-on"
+        if "uses" not in job and not isinstance(job.get("steps"), list):
+            return f"job '{jid}' has no steps list"
+    return ""
+
+def _check(rule: Rule, doc: dict, names: set) -> str:
+    """Why `doc` breaks `rule` ("" when it holds)."""
+    if rule.kind == "name":
+        return "" if doc.get("name") == rule.value else f"name is {doc.get('name')!r}"
+    if rule.kind == "trigger":
+        on = doc.get("on")
+        on = {e: None for e in ([on] if isinstance(on, str) else on)} if isinstance(on, (str, list)) else on
+        head, _, rest = rule.path.partition(".")
+        if not isinstance(on, dict) or head not in on:
+            return f"no on.{head}"
+        have = _get(on[head], rest) if rest else on[head]
+        wanted = rule.value or ()
+        have = [have] if isinstance(have, str) else have or []
+        missing = [v for v in wanted if v not in have]
+        return f"on.{rule.path} lacks {', '.join(missing)}" if missing else ""
+    if rule.kind == "permission":
+        got = _get(doc.get("permissions"), rule.path)
+        return "" if got == rule.value else f"permissions.{rule.path} is {got!r}"
+    if rule.kind == "secret":
+        return "" if any(rule.value in _SECRET.findall(s) for s in _strings(doc)) else "not referenced"
+    if rule.kind == "context":
+        ctx = re.compile(r"""context\s*={1,2}\s*["']%s["']""" % re.escape(rule.value))
+        if rule.value in _jobs(doc) or any(isinstance(j, dict) and j.get("name") == rule.value
+                                           for j in _jobs(doc).values()):
+            return ""
+        return "" if any(ctx.search(s) for st in _steps(doc) for s in _strings(st)) else "not found"
+    if rule.kind == "step":
+        rx = re.compile(rule.value)
+        return "" if any(rx.search(str(st.get(k) or "")) for st in _steps(doc) for k in ("run", "if")) else "not found"
+    if rule.kind == "ref":
+        refs = _get(doc.get("on"), "workflow_run.workflows") or []
+        unknown = [r for r in ([refs] if isinstance(refs, str) else refs) if r not in names]
+        return ", ".join(unknown)
+    raise ValueError(f"unknown rule kind {rule.kind}")
+
+def evaluate(results: dict, only: list[str] | None = None) -> list[dict]:
+    """Findings for the parsed workflows `results` (name -> parse result)."""
+    # Workflow names for `ref`; a file that does not parse keeps the name of its `name:` line.
+    names = {r["doc"].get("name") if isinstance(r.get("doc"), dict) else r.get("name") for r in results.values()}
+    names.discard(None)
+    findings = []
+    for rule in RULES:
+        if rule.kind == "exists":
+            if rule.scope not in results and (not only or rule.scope in only):
+                findings.append(_finding(rule, rule.scope, ""))
+            continue
+        for name in sorted(fnmatch.filter(results, rule.scope)):
+            if only and name not in only:
+                continue
+            res = results[name]
+            if rule.kind == "parse":
+                why = res.get("error") or _workflow_problem(res.get("doc"))
+            elif "error" in res or _workflow_problem(res.get("doc")):
+                continue                     # reported once by the parse rule
+            else:
+                why = _check(rule, res["doc"], names)
+            if why:
+                findings.append(_finding(rule, name, why))
+    return sorted(findings, key=lambda f: (f["file"], f["rule"]))
+
+def _finding(rule: Rule, name: str, why: str) -> dict:
+    return {"rule": rule.id, "file": f"{WORKFLOW_DIR}/{name}", "message": rule.message,
+            "detail": why}
+
+def check(wf_dir: str = WORKFLOW_DIR, only: list[str] | None = None, cache: Cache | None = None) -> tuple[list[dict], dict]:
+    results, stats = load_all(wf_dir, cache or Cache(None))
+    return evaluate(results, only), dict(stats, workflows=len(results))
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="workflow_policy.py", description="Policy checks for .github/workflows")
+    ap.add_argument("--dir", default=WORKFLOW_DIR)
+    ap.add_argument("--only", nargs="+", metavar="FILE", help="report these workflow files only")
+    ap.add_argument("--json", action="store_true", help="one JSON finding per line")
+    ap.add_argument("--strict", action="store_true", help="exit 1 on findings (default: warn-only)")
+    ap.add_argument("--no-cache", action="store_true", help="parse everything, do not read or write the cache")
+    ap.add_argument("--title", default=TITLE, help=argparse.SUPPRESS)
+    a = ap.parse_args(argv)
+    try:
+        import yaml  # noqa: F401
+    except ImportError:
+        print(f"::warning title={a.title}::PyYAML not available; workflows not checked.")
+        return 0
+    findings, stats = check(a.dir, a.only, Cache(None if a.no_cache else _default_cache()))
+    for f in findings:
+        if a.json:
+            print(json.dumps(f))
+        else:
+            detail = f" ({f['detail']})" if f["detail"] else ""
+            print(f"::warning file={f['file']},title={a.title}::{f['file']}: {f['message']}{detail}")
+    print(f"[workflow-policy] workflows={stats['workflows']} parsed={stats['parsed']} cached={stats['cached']} "
+          f"findings={len(findings)}{'' if a.strict else ' (warn-only)'}", file=sys.stderr if a.json else sys.stdout)
+    return 1 if findings and a.strict else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))